@@ -0,0 +1,115 @@
+"""
+Register van site adapters, per host of ATS platform.
+
+De generieke keyword heuristiek (extraction.extract_vacancy_links) levert
+op grote sites veel ruis op. Voor sites en platforms waarvan de structuur
+bekend is leest een adapter de vacatures precies, bij ATS platforms direct
+uit hun JSON of XML feed: één request voor alle vacatures mét beschrijving en
+datum, zonder HTML te parsen of elke detailpagina op te halen.
+
+Het register bevat alleen namen: de module van een adapter wordt pas
+geïmporteerd als een vacancy_url voor het eerst bij die adapter hoort.
+Heeft een URL geen adapter, of vindt de adapter niets, dan valt de crawl
+terug op de generieke heuristiek.
+
+Een nieuwe adapter: een SiteAdapter subklasse in een module in dit pakket,
+plus een AdapterSpec hieronder. Een host patroon is een exacte host (zonder
+"www.") of "*.domein" voor alle subdomeinen.
+"""
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.adapters.base import SiteAdapter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AdapterSpec:
+    """Een adapter in het register: naam, host patronen en "module:Klasse" (lazy geïmporteerd)"""
+    name: str
+    hosts: Tuple[str, ...]
+    target: str
+
+
+ADAPTERS: Tuple[AdapterSpec, ...] = (
+    # ATS platforms met een publieke feed
+    AdapterSpec("recruitee", ("*.recruitee.com",), "app.adapters.ats:RecruiteeAdapter"),
+    AdapterSpec("greenhouse", ("boards.greenhouse.io", "job-boards.greenhouse.io"), "app.adapters.ats:GreenhouseAdapter"),
+    AdapterSpec("lever", ("jobs.lever.co",), "app.adapters.ats:LeverAdapter"),
+    AdapterSpec("smartrecruiters", ("jobs.smartrecruiters.com", "careers.smartrecruiters.com"),
+                "app.adapters.ats:SmartRecruitersAdapter"),
+    AdapterSpec("workable", ("apply.workable.com",), "app.adapters.ats:WorkableAdapter"),
+    AdapterSpec("personio", ("*.jobs.personio.de", "*.jobs.personio.com"), "app.adapters.ats:PersonioAdapter"),
+    # Regionale vacaturesites van samenwerkende gemeenten
+    AdapterSpec("regional", (
+        "werkeningelderland.nl",
+        "werkeninfriesland.nl",
+        "werkeninmiddenbrabant.nl",
+        "werkeninwestbrabant.nl",
+        "werkenbijdrechtsteden.nl",
+    ), "app.adapters.regional:RegionalBoardAdapter"),
+    # Losse gemeenten
+    AdapterSpec("amsterdam", ("amsterdam.nl",), "app.adapters.amsterdam:AmsterdamAdapter"),
+)
+
+
+def _host(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class AdapterRegistry:
+    """Zoekt de adapter bij een URL; importeert en instantieert elke adapter hoogstens één keer"""
+
+    def __init__(self, specs: Tuple[AdapterSpec, ...] = ADAPTERS):
+        self.specs = specs
+        self._exact: Dict[str, AdapterSpec] = {}
+        self._suffixes: List[Tuple[str, AdapterSpec]] = []
+        for spec in specs:
+            for pattern in spec.hosts:
+                if pattern.startswith("*."):
+                    self._suffixes.append((pattern[1:], spec))
+                else:
+                    self._exact[pattern] = spec
+        self._loaded: Dict[str, Optional[SiteAdapter]] = {}
+        self._lock = threading.Lock()
+
+    def spec_for(self, url: str) -> Optional[AdapterSpec]:
+        host = _host(url)
+        spec = self._exact.get(host)
+        if spec is None:
+            spec = next((spec for suffix, spec in self._suffixes if host.endswith(suffix)), None)
+        return spec
+
+    def _load(self, spec: AdapterSpec) -> Optional[SiteAdapter]:
+        with self._lock:
+            if spec.name not in self._loaded:
+                module_name, class_name = spec.target.split(":")
+                try:
+                    adapter = getattr(importlib.import_module(module_name), class_name)()
+                    logger.info(f"Site adapter {spec.name} geladen")
+                except Exception as e:
+                    # Een kapotte adapter mag de crawl niet breken: generieke heuristiek
+                    logger.error(f"Site adapter {spec.name} kon niet geladen worden: {str(e)}")
+                    adapter = None
+                self._loaded[spec.name] = adapter
+            return self._loaded[spec.name]
+
+    def for_url(self, url: Optional[str]) -> Optional[SiteAdapter]:
+        """De adapter voor een vacancy_url, of None voor de generieke heuristiek"""
+        if not url:
+            return None
+        spec = self.spec_for(url)
+        return self._load(spec) if spec is not None else None
+
+    @property
+    def loaded(self) -> List[str]:
+        return [name for name, adapter in self._loaded.items() if adapter is not None]
+
+
+adapters = AdapterRegistry()
@@ -0,0 +1,37 @@
+"""
+Adapter voor de vacaturepagina van de gemeente Amsterdam.
+
+Voorheen scraper/amsterdam_scraper.py: een losse, synchrone requests
+scraper die nergens aangeroepen werd en de velden die hij niet kon lezen met
+dummy waarden vulde. Nu leest hij alleen de vacature blokken (titel, link en
+korte beschrijving); datum, categorie en opleidingsniveau komen van de
+detailpagina. Vindt hij geen blokken (de HTML structuur is veranderd), dan
+valt de crawl terug op de generieke heuristiek.
+"""
+from typing import Any, Dict
+
+from app.adapters.base import SiteAdapter, links, vacancy
+from app.pagination import find_next_pages
+from app.parsers import get_parser, make_soup
+
+
+class AmsterdamAdapter(SiteAdapter):
+    name = "amsterdam"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        soup = make_soup(text)
+        found = []
+        for element in soup.find_all('div', class_='vacancy-item'):
+            title = element.find('h2')
+            link = element.find('a', href=True)
+            description = element.find('div', class_='description')
+            found.append(vacancy(
+                link['href'] if link else None,
+                title.get_text(strip=True) if title else None,
+                url,
+                description=description.get_text(" ", strip=True) if description else None,
+            ))
+        return {
+            "vacancy_links": links(found),
+            "next_pages": find_next_pages(text, url, get_parser().extract_links(text)),
+        }
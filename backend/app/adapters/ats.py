@@ -0,0 +1,169 @@
+"""
+Adapters voor ATS platforms met een publieke feed van alle vacatures.
+
+Eén request per gemeente in plaats van een HTML pagina plus een detailpagina
+per vacature. Feeds met beschrijving en datum zetten provides_details, zodat
+de detail stage voor deze vacatures niets meer hoeft op te halen.
+"""
+import html
+import json
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from app.adapters.base import SiteAdapter, links, path_segment, subdomain, vacancy
+from app.details import education_level, function_category, html_to_text, parse_date
+
+
+def _name(value: Any) -> Any:
+    return value.get("name") or value.get("label") if isinstance(value, dict) else value
+
+
+class RecruiteeAdapter(SiteAdapter):
+    """<bedrijf>.recruitee.com: /api/offers/ met alle gepubliceerde vacatures"""
+    name = "recruitee"
+    provides_details = True
+
+    def feed_url(self, url: str) -> str:
+        return f"https://{subdomain(url)}.recruitee.com/api/offers/"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        offers = json.loads(text).get("offers", [])
+        return {"vacancy_links": links(
+            vacancy(
+                offer.get("careers_url"), offer.get("title"),
+                description=html_to_text(offer.get("description") or "") or None,
+                publication_date=parse_date(offer.get("published_at")),
+                function_category=function_category(offer.get("department") or offer.get("category_code")),
+                education_level=education_level(offer.get("education_code")),
+            )
+            for offer in offers
+        )}
+
+
+class GreenhouseAdapter(SiteAdapter):
+    """boards.greenhouse.io/<board>: de Job Board API met content"""
+    name = "greenhouse"
+    provides_details = True
+
+    def feed_url(self, url: str) -> str:
+        return f"https://boards-api.greenhouse.io/v1/boards/{path_segment(url)}/jobs?content=true"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        jobs = json.loads(text).get("jobs", [])
+        return {"vacancy_links": links(
+            vacancy(
+                job.get("absolute_url"), job.get("title"),
+                # content is ge-escapete HTML
+                description=html_to_text(html.unescape(job.get("content") or "")) or None,
+                publication_date=parse_date(job.get("first_published") or job.get("updated_at")),
+                function_category=function_category(_name((job.get("departments") or [None])[0])),
+            )
+            for job in jobs
+        )}
+
+
+class LeverAdapter(SiteAdapter):
+    """jobs.lever.co/<bedrijf>: de Postings API"""
+    name = "lever"
+    provides_details = True
+
+    def feed_url(self, url: str) -> str:
+        return f"https://api.lever.co/v0/postings/{path_segment(url)}?mode=json"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        postings = json.loads(text)
+        return {"vacancy_links": links(
+            vacancy(
+                posting.get("hostedUrl"), posting.get("text"),
+                description=posting.get("descriptionPlain") or None,
+                # createdAt is in milliseconden sinds epoch
+                publication_date=datetime.fromtimestamp(posting["createdAt"] / 1000, timezone.utc)
+                .replace(tzinfo=None).isoformat(sep=" ", timespec="seconds") if posting.get("createdAt") else None,
+                function_category=function_category(
+                    (posting.get("categories") or {}).get("team") or (posting.get("categories") or {}).get("department")
+                ),
+            )
+            for posting in postings if isinstance(posting, dict)
+        )}
+
+
+class SmartRecruitersAdapter(SiteAdapter):
+    """jobs.smartrecruiters.com/<bedrijf>: de Posting API, gepagineerd met offset"""
+    name = "smartrecruiters"
+    limit = 100
+
+    def feed_url(self, url: str) -> str:
+        return f"https://api.smartrecruiters.com/v1/companies/{path_segment(url)}/postings?limit={self.limit}&offset=0"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        data = json.loads(text)
+        company = path_segment(url, 2)  # /v1/companies/<bedrijf>/postings
+        postings = data.get("content", [])
+        next_pages = []
+        offset = data.get("offset", 0) + len(postings)
+        if postings and offset < data.get("totalFound", 0):
+            parts = urlsplit(url)
+            query = dict(parse_qsl(parts.query), offset=str(offset))
+            next_pages.append(parts._replace(query=urlencode(query)).geturl())
+        # Geen beschrijving in de lijst: die komt van de detailpagina (JobPosting JSON-LD)
+        return {"vacancy_links": links(
+            vacancy(
+                f"https://jobs.smartrecruiters.com/{company}/{posting.get('id')}" if posting.get("id") else None,
+                posting.get("name"),
+                publication_date=parse_date(posting.get("releasedDate")),
+                function_category=function_category(_name(posting.get("function"))),
+            )
+            for posting in postings
+        ), "next_pages": next_pages}
+
+
+class WorkableAdapter(SiteAdapter):
+    """apply.workable.com/<account>: de widget API"""
+    name = "workable"
+
+    def feed_url(self, url: str) -> str:
+        return f"https://apply.workable.com/api/v1/widget/accounts/{path_segment(url)}"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        jobs = json.loads(text).get("jobs", [])
+        return {"vacancy_links": links(
+            vacancy(
+                job.get("url") or job.get("shortlink"), job.get("title"),
+                publication_date=parse_date(job.get("published_on") or job.get("created_at")),
+                function_category=function_category(job.get("function") or job.get("department")),
+                education_level=education_level(job.get("education")),
+            )
+            for job in jobs
+        )}
+
+
+class PersonioAdapter(SiteAdapter):
+    """<bedrijf>.jobs.personio.de: de XML feed met alle posities"""
+    name = "personio"
+    provides_details = True
+
+    def feed_url(self, url: str) -> str:
+        host = urlsplit(url).hostname
+        return f"https://{subdomain(url)}.{host.split('.', 1)[1]}/xml?language=nl"
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        root = ElementTree.fromstring(text.encode())
+        base = f"https://{urlsplit(url).hostname}"
+        found = []
+        for position in root.iter("position"):
+            descriptions = [
+                html_to_text(value.text or "")
+                for value in position.iter("value") if value.text
+            ]
+            found.append(vacancy(
+                f"{base}/job/{position.findtext('id')}" if position.findtext("id") else None,
+                position.findtext("name"),
+                description="\n\n".join(descriptions) or None,
+                publication_date=parse_date(position.findtext("createdAt")),
+                function_category=function_category(
+                    position.findtext("department") or position.findtext("occupationCategory")
+                ),
+            ))
+        return {"vacancy_links": links(found)}
@@ -0,0 +1,62 @@
+"""
+Basisklasse voor site adapters.
+
+Een adapter weet hoe de vacatures van één site of ATS platform gelezen
+worden: welke URL opgehaald moet worden (`feed_url`, vaak een JSON feed in
+plaats van de HTML pagina) en hoe die body omgezet wordt in vacature links
+(`parse`). Het ophalen zelf (gedeelde client, politeness, conditional
+requests, paginering) blijft bij de crawl; `parse` draait in de parse pool,
+dus een adapter moet picklable zijn en geen eigen state bijhouden.
+"""
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+
+class SiteAdapter:
+    """Basisklasse: de generieke heuristiek is de terugval als een adapter niets vindt"""
+    name = ""
+    # True: de feed bevat alle velden van de detailpagina, die hoeft dan niet opgehaald te worden
+    provides_details = False
+
+    def feed_url(self, url: str) -> str:
+        """De URL die voor een vacancy_url opgehaald wordt; ValueError als de URL niet bruikbaar is"""
+        return url
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        """{"vacancy_links": [...], "next_pages": [...]} uit de opgehaalde body"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+def vacancy(url: Optional[str], title: Optional[str], base_url: str = "", **fields) -> Optional[Dict[str, Any]]:
+    """Eén vacature link in het formaat van extract_vacancy_links, met eventuele detail velden"""
+    if not url or not title:
+        return None
+    url = urljoin(base_url, url.strip()) if base_url else url.strip()
+    if not url.startswith(("http://", "https://")):
+        return None
+    return {"url": url, "title": " ".join(title.split()), **{k: v for k, v in fields.items() if v is not None}}
+
+
+def links(items) -> List[Dict[str, Any]]:
+    """Filter de lege resultaten van vacancy() weg"""
+    return [item for item in items if item]
+
+
+def path_segment(url: str, index: int = 0) -> str:
+    """Een segment van het pad (bv. het account in boards.greenhouse.io/<account>); ValueError als het ontbreekt"""
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    if len(segments) <= index:
+        raise ValueError(f"geen account in {url}")
+    return segments[index]
+
+
+def subdomain(url: str) -> str:
+    """Het eerste label van de host (bv. het bedrijf in <bedrijf>.recruitee.com)"""
+    host = urlsplit(url).hostname or ""
+    label = host.split(".", 1)[0]
+    if not label or label == "www":
+        raise ValueError(f"geen account in {url}")
+    return label
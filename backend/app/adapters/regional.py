@@ -0,0 +1,63 @@
+"""
+Adapter voor de regionale vacaturesites van samenwerkende gemeenten
+(werkeningelderland.nl, werkeninfriesland.nl, ...).
+
+De generieke heuristiek pakt op deze sites elke link met "vacature" erin,
+ook menu's, vacature alerts en filters. Deze adapter neemt de vacatures uit
+de schema.org JSON-LD van de pagina (JobPosting of een ItemList) als die er
+is, en anders alleen links naar één vacature (/vacature/<slug> of
+/vacatures/<slug>) op dezelfde site. De vacancy_url van een gemeente is
+meestal al de pagina van die organisatie, dus er hoeft niet op gemeente
+gefilterd te worden.
+"""
+import re
+from typing import Any, Dict, List
+from urllib.parse import urljoin, urlsplit
+
+from app.adapters.base import SiteAdapter, links, vacancy
+from app.details import is_job_posting, job_posting_fields, json_ld_items
+from app.pagination import find_next_pages
+from app.parsers import get_parser
+
+# Een enkele vacature, geen overzicht of filter (?page=2, /vacatures/alert)
+_VACANCY_PATH = re.compile(r'/vacatures?/(?!alert|zoeken|overzicht)[^/?#]+/?$', re.IGNORECASE)
+
+
+class RegionalBoardAdapter(SiteAdapter):
+    name = "regional"
+
+    def _from_json_ld(self, items: List[dict], url: str) -> List[Dict[str, Any]]:
+        found = []
+        for item in items:
+            if is_job_posting(item):
+                found.append(vacancy(item.get("url"), item.get("title"), url, **job_posting_fields(item)))
+            elif item.get("@type") == "ItemList":
+                for element in item.get("itemListElement") or []:
+                    if not isinstance(element, dict):
+                        continue
+                    nested = element.get("item") if isinstance(element.get("item"), dict) else {}
+                    if is_job_posting(nested):
+                        found.append(vacancy(
+                            nested.get("url") or element.get("url"), nested.get("title"), url, **job_posting_fields(nested)
+                        ))
+                    else:
+                        found.append(vacancy(
+                            element.get("url") or nested.get("url"), element.get("name") or nested.get("name"), url
+                        ))
+        return links(found)
+
+    def parse(self, text: str, url: str) -> Dict[str, Any]:
+        page_links = get_parser().extract_links(text)
+        next_pages = find_next_pages(text, url, page_links)
+
+        found = self._from_json_ld(json_ld_items(text), url)
+        if found:
+            return {"vacancy_links": found, "next_pages": next_pages}
+
+        host = urlsplit(url).hostname
+        unique = {}
+        for href, title in page_links:
+            href = urljoin(url, href.strip())
+            if urlsplit(href).hostname == host and _VACANCY_PATH.search(urlsplit(href).path):
+                unique.setdefault(href, vacancy(href, title or None))
+        return {"vacancy_links": links(unique.values()), "next_pages": next_pages}
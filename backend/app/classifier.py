@@ -0,0 +1,52 @@
+"""
+Voorgebouwde keyword matcher voor het herkennen van vacature links en tekst.
+
+De oude aanpak, `any(keyword in href.lower() for keyword in [...])`, bouwde de
+lijst per link opnieuw op en lowercasede de string opnieuw voor elk keyword.
+De matcher lowercaset de tekst één keer en loopt daarna een vaste tuple van
+(gededupliceerde, lowercase) keywords af. In CPython is `str.__contains__` op
+één lowercase kopie sneller dan een case-insensitive regex alternation; zie
+benchmarks/bench_classifier.py. Matchers worden per keyword-set één keer
+gebouwd en daarna gedeeld.
+"""
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+
+class KeywordMatcher:
+    """Zoekt of een tekst één van de keywords bevat (hoofdletterongevoelig)"""
+
+    def __init__(self, keywords: Iterable[str]):
+        unique = dict.fromkeys(k.lower() for k in keywords if k)
+        # Een keyword dat een ander keyword bevat is overbodig ('werkenbij' vs 'werkenbijde')
+        self.keywords = tuple(
+            k for k in unique
+            if not any(other != k and other in k for other in unique)
+        )
+
+    def matches(self, text: str) -> bool:
+        lowered = text.lower()
+        for keyword in self.keywords:
+            if keyword in lowered:
+                return True
+        return False
+
+    def __repr__(self):
+        return f"KeywordMatcher({list(self.keywords)!r})"
+
+
+@lru_cache(maxsize=64)
+def get_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Gedeelde, gecachte matcher per keyword-set"""
+    return KeywordMatcher(keywords)
+
+
+def parse_keywords(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse een komma-gescheiden keyword lijst (zoals opgeslagen in
+    municipalities.vacancy_keywords). Geeft None terug als er niets ingesteld is.
+    """
+    if not value:
+        return None
+    keywords = tuple(sorted({k.strip().lower() for k in value.split(",") if k.strip()}))
+    return keywords or None
@@ -0,0 +1,107 @@
+"""
+Configuratie van de scraper, in te stellen via environment variables (of .env).
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    """Lees een integer uit de environment, met fallback naar de default"""
+    value = os.getenv(name)
+    try:
+        return int(value) if value not in (None, "") else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Lees een float uit de environment, met fallback naar de default"""
+    value = os.getenv(name)
+    try:
+        return float(value) if value not in (None, "") else default
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Lees een boolean (1/0, true/false) uit de environment"""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Maximaal aantal gemeenten dat tegelijk gescraped wordt
+CRAWL_CONCURRENCY = _env_int("CRAWL_CONCURRENCY", 10)
+
+# HTTP client instellingen (één gedeelde client per crawl run)
+HTTP_TIMEOUT = _env_float("HTTP_TIMEOUT", 30.0)
+HTTP_MAX_CONNECTIONS = _env_int("HTTP_MAX_CONNECTIONS", 100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+HTTP_KEEPALIVE_EXPIRY = _env_float("HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", True)
+USER_AGENT = os.getenv(
+    "USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+)
+
+# Beleefdheid per host: token bucket en maximaal aantal gelijktijdige requests
+HOST_RATE_LIMIT = _env_float("HOST_RATE_LIMIT", 1.0)  # requests per seconde per host
+HOST_BURST = _env_int("HOST_BURST", 2)
+HOST_CONCURRENCY = _env_int("HOST_CONCURRENCY", 2)
+HOST_MAX_RETRY_AFTER = _env_float("HOST_MAX_RETRY_AFTER", 120.0)  # langer wachten we niet op Retry-After
+HOST_THROTTLE_BACKOFF = _env_float("HOST_THROTTLE_BACKOFF", 30.0)  # pauze na 429/503 zonder Retry-After
+HOST_MAX_RETRIES = _env_int("HOST_MAX_RETRIES", 1)
+RESPECT_ROBOTS_TXT = _env_bool("RESPECT_ROBOTS_TXT", True)
+
+# HTML parser backend: auto, stream, html.parser, lxml of selectolax (zie parsers.py)
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+# Aantal processen voor parsen/extractie (0 = in de event loop zelf parsen)
+PARSE_WORKERS = _env_int("PARSE_WORKERS", os.cpu_count() or 1)
+
+# Group commit van de database writer: commit na zoveel rijen of zoveel seconden
+WRITE_BATCH_ROWS = _env_int("WRITE_BATCH_ROWS", 500)
+WRITE_BATCH_SECONDS = _env_float("WRITE_BATCH_SECONDS", 2.0)
+
+# SQLite instellingen: alle connecties draaien in WAL mode, zodat API reads
+# nooit op de writes van een crawl hoeven te wachten
+DB_READ_POOL_SIZE = _env_int("DB_READ_POOL_SIZE", 4)
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE_KB = _env_int("DB_CACHE_SIZE_KB", 20000)
+DB_MMAP_SIZE = _env_int("DB_MMAP_SIZE", 256 * 1024 * 1024)
+DB_BUSY_TIMEOUT_MS = _env_int("DB_BUSY_TIMEOUT_MS", 5000)
+
+# Paginering van /api/vacancies
+API_PAGE_SIZE = _env_int("API_PAGE_SIZE", 50)
+API_MAX_PAGE_SIZE = _env_int("API_MAX_PAGE_SIZE", 500)
+
+# Export: rijen per fetchmany batch (= per chunk naar de client)
+EXPORT_FETCH_ROWS = _env_int("EXPORT_FETCH_ROWS", 1000)
+
+# Response cache van de lees-endpoints (geleegd na elke crawl commit)
+RESPONSE_CACHE_TTL = _env_float("RESPONSE_CACHE_TTL", 300.0)
+RESPONSE_CACHE_MAX_ENTRIES = _env_int("RESPONSE_CACHE_MAX_ENTRIES", 256)
+
+# Server-push van de crawl voortgang (/api/admin/events): keepalive interval
+# en het maximum aantal openstaande events per client
+PROGRESS_KEEPALIVE_SECONDS = _env_float("PROGRESS_KEEPALIVE_SECONDS", 15.0)
+PROGRESS_QUEUE_SIZE = _env_int("PROGRESS_QUEUE_SIZE", 256)
+
+# Hoe vaak (s) het gemeenten register controleert of data/municipalities.csv
+# gewijzigd is (0 = bij elke lookup, negatief = nooit herladen)
+MUNICIPALITY_RELOAD_SECONDS = _env_float("MUNICIPALITY_RELOAD_SECONDS", 5.0)
+
+# Detailpagina's van vacatures (zie details.py): aantal workers naast de crawl
+# van de vacaturepagina's (0 = uit), maximum aantal detailpagina's per run
+# (0 = onbeperkt) en na hoeveel dagen een al opgehaalde pagina opnieuw gecontroleerd wordt
+DETAIL_CONCURRENCY = _env_int("DETAIL_CONCURRENCY", 4)
+DETAIL_MAX_PAGES = _env_int("DETAIL_MAX_PAGES", 500)
+DETAIL_REFRESH_DAYS = _env_float("DETAIL_REFRESH_DAYS", 7.0)
+
+# Paginering van vacaturepagina's (zie pagination.py): maximum aantal pagina's
+# (inclusief de eerste; 1 = niet volgen) en bytes per vacaturepagina
+PAGINATION_MAX_PAGES = _env_int("PAGINATION_MAX_PAGES", 10)
+PAGINATION_MAX_BYTES = _env_int("PAGINATION_MAX_BYTES", 5 * 1024 * 1024)
@@ -0,0 +1,206 @@
+"""
+Crawl scheduler: verdeelt gemeenten over een vaste pool van workers.
+
+In plaats van vaste batches (waarbij één trage site de hele batch ophoudt)
+pakt elke worker direct de volgende taak uit de wachtrij zodra hij klaar is.
+Gemeenten met dezelfde (genormaliseerde) vacancy_url worden door de planner
+gegroepeerd, zodat die pagina maar één keer opgehaald en geparsed wordt.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.classifier import parse_keywords
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliseer een URL voor deduplicatie: lowercase scheme en host, zonder
+    'www.', standaardpoort, fragment en trailing slash, met gesorteerde query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+@dataclass
+class CrawlGroup:
+    """Gemeenten die dezelfde vacaturepagina (en keyword configuratie) delen"""
+    url: Optional[str]
+    municipalities: List[dict] = field(default_factory=list)
+    keywords: Optional[Tuple[str, ...]] = None
+
+
+def plan_crawl(municipalities: Iterable[dict]) -> List[CrawlGroup]:
+    """
+    Groepeer gemeenten op genormaliseerde vacancy_url (volgorde van eerste
+    voorkomen blijft behouden). Gemeenten zonder vacancy_url krijgen elk een
+    eigen groep. Gemeenten met eigen vacancy_keywords worden alleen gegroepeerd
+    met gemeenten die dezelfde keywords gebruiken.
+    """
+    groups: Dict[Tuple[str, Optional[Tuple[str, ...]]], CrawlGroup] = {}
+    plan: List[CrawlGroup] = []
+    for municipality in municipalities:
+        url = municipality.get("vacancy_url")
+        if not url:
+            plan.append(CrawlGroup(url=None, municipalities=[municipality]))
+            continue
+        keywords = parse_keywords(municipality.get("vacancy_keywords"))
+        key = (normalize_url(url), keywords)
+        if key not in groups:
+            groups[key] = CrawlGroup(url=key[0], keywords=keywords)
+            plan.append(groups[key])
+        groups[key].municipalities.append(municipality)
+    return plan
+
+
+@dataclass
+class CrawlStats:
+    """Statistieken van één crawl run"""
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    municipalities_done: int = 0
+    pages_fetched: int = 0
+    fetches_avoided: int = 0
+    # Tijd die taken in de wachtrij stonden voordat een worker ze oppakte
+    queue_wait_seconds: float = 0.0
+    max_queue_wait_seconds: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 1e-9)
+
+    @property
+    def municipalities_per_second(self) -> float:
+        return self.municipalities_done / self.elapsed
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_fetched / self.elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed_seconds": round(self.elapsed, 2),
+            "municipalities_done": self.municipalities_done,
+            "pages_fetched": self.pages_fetched,
+            "fetches_avoided": self.fetches_avoided,
+            "municipalities_per_second": round(self.municipalities_per_second, 3),
+            "pages_per_second": round(self.pages_per_second, 3),
+            "queue_wait_seconds": round(self.queue_wait_seconds, 3),
+            "max_queue_wait_seconds": round(self.max_queue_wait_seconds, 3),
+        }
+
+
+@dataclass
+class CrawlTimings:
+    """Opgetelde tijd per fase van een crawl run (fetch en parse per pagina)"""
+    fetches: int = 0
+    fetch_seconds: float = 0.0
+    parses: int = 0
+    parse_seconds: float = 0.0
+
+    def record_fetch(self, seconds: float):
+        self.fetches += 1
+        self.fetch_seconds += seconds
+
+    def record_parse(self, seconds: float):
+        self.parses += 1
+        self.parse_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fetches": self.fetches,
+            "fetch_seconds": round(self.fetch_seconds, 3),
+            "parses": self.parses,
+            "parse_seconds": round(self.parse_seconds, 3),
+        }
+
+
+class CrawlScheduler:
+    """
+    Work-queue scheduler met een begrensde pool van workers.
+
+    `worker` is een coroutine functie die één item verwerkt en een result dict
+    (of een lijst daarvan, bij een CrawlGroup) teruggeeft. `on_result` wordt
+    per result dict aangeroepen (bijv. om de voortgang bij te werken).
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[Any], Awaitable[Union[dict, List[dict]]]],
+        concurrency: int,
+        on_result: Optional[Callable[[dict], None]] = None,
+    ):
+        self.worker = worker
+        self.concurrency = max(1, concurrency)
+        self.on_result = on_result
+        self.stats = CrawlStats()
+
+    async def _run_worker(self, queue: asyncio.Queue, results: List[dict]):
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            # Alle taken staan vanaf de start van de run in de wachtrij
+            waited = time.monotonic() - self.stats.started_at
+            self.stats.queue_wait_seconds += waited
+            self.stats.max_queue_wait_seconds = max(self.stats.max_queue_wait_seconds, waited)
+
+            try:
+                item_results = await self.worker(item)
+            except Exception as e:
+                logger.error(f"Fout tijdens scrapen van {item}: {str(e)}")
+                item_results = {"success": False, "error": str(e)}
+            finally:
+                queue.task_done()
+
+            if isinstance(item_results, dict):
+                item_results = [item_results]
+
+            for result in item_results:
+                self.stats.municipalities_done += 1
+                self.stats.pages_fetched += result.get("pages_fetched", 0)
+                if result.get("fetch_shared"):
+                    self.stats.fetches_avoided += 1
+                results.append(result)
+
+                if self.on_result:
+                    self.on_result(result)
+
+    async def run(self, items: Iterable[Any]) -> List[dict]:
+        """Verwerk alle items en geef de resultaten terug (in volgorde van afronding)"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        results: List[dict] = []
+        self.stats = CrawlStats()
+        workers = [
+            asyncio.create_task(self._run_worker(queue, results))
+            for _ in range(min(self.concurrency, queue.qsize()))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            self.stats.finished_at = time.monotonic()
+
+        return results
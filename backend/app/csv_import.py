@@ -0,0 +1,149 @@
+"""
+Incrementele import van data/municipalities.csv.
+
+Bij elke startup werd het hele CSV bestand opnieuw met INSERT OR REPLACE
+geïmporteerd, waarbij enabled, vacancy_url, last_scraped en andere door de
+beheerder of de crawl beheerde kolommen terug naar de standaard gingen.
+Nu wordt de SHA-256, mtime en grootte van het bestand in import_state
+bewaard: is het bestand ongewijzigd, dan gebeurt er niets. Is het gewijzigd,
+dan worden alleen nieuwe gemeenten en gewijzigde CSV kolommen (naam en
+coördinaten, en website/vacancy_url waar die nog leeg zijn) in één
+transactie bijgewerkt. Het bestand wordt gelezen met
+dezelfde parser als het gemeenten register (app/municipalities.py).
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.municipalities import MunicipalityInfo, parse_municipalities
+from app.queries import REFRESH_MUNICIPALITY_TOTALS_SQL
+
+IMPORT_STATE_SQL = 'SELECT sha256, mtime, size FROM import_state WHERE source = ?'
+
+
+@dataclass
+class ImportResult:
+    """Uitkomst van een CSV import"""
+    skipped: bool = False
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    missing: int = 0
+
+    def __str__(self) -> str:
+        if self.skipped:
+            return "CSV ongewijzigd, import overgeslagen"
+        return (
+            f"{self.rows} rijen: {self.inserted} nieuw, {self.updated} bijgewerkt, "
+            f"{self.missing} gemeenten niet (meer) in de CSV"
+        )
+
+
+def _parse_rows(content: bytes) -> Dict[str, MunicipalityInfo]:
+    """gemeente_code -> gemeente; ValueError bij een ongeldige rij of dubbele code"""
+    rows = {}
+    for municipality in parse_municipalities(content):
+        if municipality.id in rows:
+            raise ValueError(f"dubbele gemeente_code {municipality.id} in gemeenten CSV")
+        rows[municipality.id] = municipality
+    return rows
+
+
+async def _state(db, source: str) -> Optional[Tuple[str, float, int]]:
+    async with db.execute(IMPORT_STATE_SQL, (source,)) as cursor:
+        return await cursor.fetchone()
+
+
+async def import_municipalities(db, csv_path: str, force: bool = False) -> ImportResult:
+    """
+    Importeer de gemeenten uit `csv_path` als het bestand sinds de vorige
+    import veranderd is (of met force=True). Bestaande gemeenten houden hun
+    website en vacancy_url (lege kolommen worden uit de CSV gevuld), enabled
+    en crawl status; gemeenten die uit de CSV verdwenen zijn blijven staan.
+    """
+    source = os.path.basename(csv_path)
+    stat = os.stat(csv_path)
+    state = await _state(db, source)
+    # Zelfde mtime en grootte: niet eens lezen
+    if not force and state and state[1] == stat.st_mtime and state[2] == stat.st_size:
+        return ImportResult(skipped=True)
+
+    with open(csv_path, 'rb') as f:
+        content = f.read()
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    # BEGIN IMMEDIATE: bij meerdere workers importeert er één, de rest wacht
+    # en ziet daarna de nieuwe hash
+    await db.execute('BEGIN IMMEDIATE')
+    try:
+        state = await _state(db, source)
+        if not force and state and state[0] == sha256:
+            result = ImportResult(skipped=True)
+        else:
+            result = await _apply(db, _parse_rows(content))
+        if result.skipped:
+            # Alleen aangeraakt (nieuwe mtime, zelfde inhoud)
+            await db.execute(
+                'UPDATE import_state SET mtime = ?, size = ? WHERE source = ?',
+                (stat.st_mtime, stat.st_size, source)
+            )
+        else:
+            await db.execute('''
+                INSERT OR REPLACE INTO import_state (source, sha256, mtime, size, rows, imported_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (source, sha256, stat.st_mtime, stat.st_size, result.rows))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
+
+
+def _changed(current: tuple, municipality: MunicipalityInfo) -> bool:
+    """Andere naam of coördinaten, of een URL uit de CSV voor een lege kolom"""
+    name, latitude, longitude, website, vacancy_url = current
+    return (
+        (name, latitude, longitude) != (municipality.name, municipality.latitude, municipality.longitude)
+        or (website is None and municipality.website is not None)
+        or (vacancy_url is None and municipality.vacancy_url is not None)
+    )
+
+
+async def _apply(db, rows: Dict[str, MunicipalityInfo]) -> ImportResult:
+    """Bulk upsert van alleen de nieuwe en gewijzigde rijen"""
+    async with db.execute('SELECT id, name, latitude, longitude, website, vacancy_url FROM municipalities') as cursor:
+        existing = {row[0]: tuple(row[1:]) for row in await cursor.fetchall()}
+
+    new = [
+        (m.id, m.name, m.latitude, m.longitude, m.website, m.vacancy_url)
+        for code, m in rows.items()
+        if code not in existing
+    ]
+    changed = [
+        (m.name, m.latitude, m.longitude, m.website, m.vacancy_url, code)
+        for code, m in rows.items()
+        if code in existing and _changed(existing[code], m)
+    ]
+
+    await db.executemany('''
+        INSERT INTO municipalities (id, name, latitude, longitude, website, vacancy_url, enabled)
+        VALUES (?, ?, ?, ?, ?, ?, 1)
+    ''', new)
+    # Alleen de kolommen die uit de CSV komen; de rest is van de beheerder en de crawl.
+    # website en vacancy_url uit de CSV vullen alleen lege kolommen (bijv. van de
+    # oude import), een door de beheerder ingestelde URL blijft staan
+    await db.executemany('''
+        UPDATE municipalities SET name = ?, latitude = ?, longitude = ?,
+            website = COALESCE(website, ?), vacancy_url = COALESCE(vacancy_url, ?)
+        WHERE id = ?
+    ''', changed)
+    if new:
+        await db.execute(REFRESH_MUNICIPALITY_TOTALS_SQL)
+
+    return ImportResult(
+        rows=len(rows),
+        inserted=len(new),
+        updated=len(changed),
+        missing=len(existing.keys() - rows.keys()),
+    )
@@ -0,0 +1,154 @@
+"""
+SQLite connecties: getunede pragmas en een pool van lees-connecties.
+
+De database draait in WAL mode, zodat lezers een consistente snapshot zien
+terwijl de crawl schrijft; reads blokkeren dus niet op writes (en andersom).
+De API handlers lenen een connectie uit een vaste pool die bij startup
+geopend wordt, in plaats van per request een nieuwe aiosqlite connectie (en
+thread) op te zetten.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import aiosqlite
+
+from app.config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_READ_POOL_SIZE,
+    DB_SYNCHRONOUS,
+)
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
+
+
+async def apply_pragmas(db, read_only: bool = False):
+    """Zet de per-connectie pragmas (journal_mode=WAL is persistent in het bestand)"""
+    if not read_only:
+        await db.execute('PRAGMA journal_mode=WAL')
+    await db.execute(f'PRAGMA synchronous={DB_SYNCHRONOUS}')
+    # Negatieve cache_size is in KiB in plaats van pagina's
+    await db.execute(f'PRAGMA cache_size=-{DB_CACHE_SIZE_KB}')
+    await db.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+    await db.execute('PRAGMA temp_store=MEMORY')
+    await db.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}')
+    if read_only:
+        await db.execute('PRAGMA query_only=1')
+
+
+async def connect(read_only: bool = False):
+    """Open een nieuwe connectie met de getunede pragmas"""
+    db = await aiosqlite.connect(DB_PATH)
+    await apply_pragmas(db, read_only)
+    return db
+
+
+@dataclass
+class PoolStats:
+    """Tellers van de lees-pool"""
+    size: int = 0
+    acquisitions: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+    in_use: int = 0
+    max_in_use: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+        }
+
+
+class ReadPool:
+    """Vaste set read-only connecties die door de API handlers geleend worden"""
+
+    def __init__(self, size: int = DB_READ_POOL_SIZE):
+        self.size = max(1, size)
+        self.stats = PoolStats(size=self.size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._connections: List[Any] = []
+
+    async def open(self):
+        for _ in range(self.size):
+            db = await connect(read_only=True)
+            self._connections.append(db)
+            self._idle.put_nowait(db)
+        logger.info(f"Database lees-pool geopend met {self.size} connecties")
+
+    async def close(self):
+        for db in self._connections:
+            try:
+                await db.close()
+            except Exception as e:
+                logger.error(f"Fout bij sluiten database connectie: {str(e)}")
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.stats.acquisitions += 1
+        if self._idle.empty():
+            self.stats.waits += 1
+            started = time.monotonic()
+            db = await self._idle.get()
+            self.stats.wait_seconds += time.monotonic() - started
+        else:
+            db = self._idle.get_nowait()
+        self.stats.in_use += 1
+        self.stats.max_in_use = max(self.stats.max_in_use, self.stats.in_use)
+        try:
+            yield db
+        finally:
+            self.stats.in_use -= 1
+            self._idle.put_nowait(db)
+
+
+_read_pool: Optional[ReadPool] = None
+
+
+async def open_read_pool(size: int = DB_READ_POOL_SIZE) -> ReadPool:
+    """Open de lees-pool (no-op als hij al open is)"""
+    global _read_pool
+    if _read_pool is None:
+        # Eerst registreren: gelijktijdige aanroepen wachten op de idle queue
+        # tot de connecties open zijn, in plaats van een tweede pool te openen
+        pool = _read_pool = ReadPool(size)
+        try:
+            await pool.open()
+        except Exception:
+            _read_pool = None
+            await pool.close()
+            raise
+    return _read_pool
+
+
+async def close_read_pool():
+    global _read_pool
+    if _read_pool is not None:
+        await _read_pool.close()
+        _read_pool = None
+
+
+def read_pool_stats() -> Optional[Dict[str, Any]]:
+    return _read_pool.stats.as_dict() if _read_pool is not None else None
+
+
+@asynccontextmanager
+async def read_db():
+    """Leen een read-only connectie uit de pool (opent de pool als dat nog niet gebeurd is)"""
+    pool = await open_read_pool()
+    async with pool.acquire() as db:
+        yield db
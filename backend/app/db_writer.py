@@ -0,0 +1,235 @@
+"""
+Eén schrijvende taak voor de database tijdens een crawl.
+
+Alle scraper workers sturen hun writes (vacatures, gemeente status, scrape
+resultaten, HTTP cache) als commando's naar een queue. Eén writer taak bezit
+de enige schrijvende connectie en voert de commando's uit in gegroepeerde
+transacties (group commit): een commit zodra er WRITE_BATCH_ROWS rijen
+verzameld zijn of de oudste write WRITE_BATCH_SECONDS wacht. Zo concurreren
+de workers niet meer om de SQLite write lock en wordt er veel minder vaak
+gefsynct.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.config import WRITE_BATCH_ROWS, WRITE_BATCH_SECONDS
+from app.crawler import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Upsert op de natuurlijke sleutel (gemeente, genormaliseerde URL): een
+# vacature die opnieuw gevonden wordt krijgt alleen een nieuwe last_seen
+VACANCY_UPSERT_SQL = '''
+    INSERT INTO vacancies
+    (municipality_id, title, url, url_key, found_date, first_seen, last_seen)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    ON CONFLICT (municipality_id, url_key) DO UPDATE SET
+        title = excluded.title,
+        url = excluded.url,
+        last_seen = excluded.last_seen
+'''
+
+
+def vacancy_key(url: Optional[str]) -> Optional[str]:
+    """De url_key van een vacature (genormaliseerde URL, None zonder URL)"""
+    return normalize_url(url) if url else None
+
+
+@dataclass
+class _Command:
+    sql: Optional[str]
+    rows: List[Sequence[Any]] = field(default_factory=list)
+    many: bool = False
+    barrier: Optional[asyncio.Future] = None
+
+
+_STOP = object()
+
+
+@dataclass
+class WriterStats:
+    """Tellers en latencies van de writer"""
+    started_at: float = field(default_factory=time.monotonic)
+    commands: int = 0
+    failed_commands: int = 0
+    rows_written: int = 0
+    commits: int = 0
+    commit_seconds: float = 0.0
+    max_commit_seconds: float = 0.0
+    last_commit_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "commands": self.commands,
+            "failed_commands": self.failed_commands,
+            "rows_written": self.rows_written,
+            "rows_per_second": round(self.rows_written / elapsed, 1),
+            "commits": self.commits,
+            "avg_commit_ms": round(self.commit_seconds / self.commits * 1000, 2) if self.commits else 0.0,
+            "max_commit_ms": round(self.max_commit_seconds * 1000, 2),
+            "last_commit_ms": round(self.last_commit_seconds * 1000, 2),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class DatabaseWriter:
+    """
+    Single-writer actor rond één database connectie.
+
+    `submit` en `submit_many` zetten een write in de queue en keren direct
+    terug; `flush` wacht tot alles wat tot dan toe ingediend is gecommit is.
+    Gebruik als async context manager (start de taak, en flusht en sluit bij
+    het verlaten). `on_commit` wordt aangeroepen na elke geslaagde commit met
+    nieuwe data (bijvoorbeeld om caches te legen).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Any]],
+        max_rows: int = WRITE_BATCH_ROWS,
+        max_seconds: float = WRITE_BATCH_SECONDS,
+        on_commit: Optional[Callable[[], None]] = None,
+    ):
+        self.connect = connect
+        self.on_commit = on_commit
+        self.max_rows = max(1, max_rows)
+        self.max_seconds = max_seconds
+        self.stats = WriterStats()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._db = None
+
+    def _put(self, command):
+        self._queue.put_nowait(command)
+        self.stats.queue_depth = self._queue.qsize()
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+
+    def submit(self, sql: str, params: Sequence[Any] = ()):
+        """Voer één statement uit in de volgende group commit"""
+        self._put(_Command(sql, [params]))
+
+    def submit_many(self, sql: str, rows: Sequence[Sequence[Any]]):
+        """Voer een statement uit voor alle rijen (executemany) in de volgende group commit"""
+        if rows:
+            self._put(_Command(sql, list(rows), many=True))
+
+    async def flush(self):
+        """Wacht tot alle tot nu toe ingediende writes gecommit zijn"""
+        barrier = asyncio.get_running_loop().create_future()
+        self._put(_Command(None, barrier=barrier))
+        await barrier
+
+    async def start(self):
+        self.stats = WriterStats()
+        self._db = await self.connect()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+        self._task = None
+        await self._db.close()
+        self._db = None
+
+    async def __aenter__(self) -> "DatabaseWriter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _next_batch(self):
+        """Verzamel commando's tot de rij- of tijdsdrempel, een flush of een stop"""
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        rows = len(first.rows)
+        deadline = time.monotonic() + self.max_seconds
+        while rows < self.max_rows and batch[-1].barrier is None:
+            try:
+                command = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    command = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if command is _STOP:
+                return batch, True
+            batch.append(command)
+            rows += len(command.rows)
+        return batch, False
+
+    async def _commit(self, batch: List[_Command]):
+        self.stats.queue_depth = self._queue.qsize()
+        if all(command.sql is None for command in batch):
+            # Alleen flush barriers: niets te committen
+            self._resolve(batch, None)
+            return
+
+        started = time.monotonic()
+        error = None
+        for command in batch:
+            if command.sql is None:
+                continue
+            self.stats.commands += 1
+            try:
+                if command.many:
+                    await self._db.executemany(command.sql, command.rows)
+                else:
+                    await self._db.execute(command.sql, command.rows[0])
+                self.stats.rows_written += len(command.rows)
+            except Exception as e:
+                # Eén fout statement mag de rest van de batch niet tegenhouden
+                self.stats.failed_commands += 1
+                logger.error(f"Fout bij database write: {str(e)}")
+
+        try:
+            await self._db.commit()
+        except Exception as e:
+            logger.error(f"Fout bij commit van {len(batch)} writes: {str(e)}")
+            error = e
+            await self._db.rollback()
+
+        if error is None and self.on_commit is not None:
+            try:
+                self.on_commit()
+            except Exception as e:
+                logger.error(f"Fout in on_commit callback: {str(e)}")
+
+        elapsed = time.monotonic() - started
+        self.stats.commits += 1
+        self.stats.commit_seconds += elapsed
+        self.stats.last_commit_seconds = elapsed
+        self.stats.max_commit_seconds = max(self.stats.max_commit_seconds, elapsed)
+        self._resolve(batch, error)
+
+    @staticmethod
+    def _resolve(batch: List[_Command], error: Optional[Exception]):
+        for command in batch:
+            if command.barrier is not None and not command.barrier.done():
+                if error is not None:
+                    command.barrier.set_exception(error)
+                else:
+                    command.barrier.set_result(None)
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._commit(batch)
+            if stopping:
+                return
@@ -0,0 +1,525 @@
+"""
+Tweede crawl stage: de detailpagina's van gevonden vacatures.
+
+De vacaturepagina van een gemeente levert alleen links (URL en linktekst) op;
+beschrijving, publicatiedatum, functiecategorie en opleidingsniveau staan op
+de detailpagina van elke vacature. De DetailStage draait naast de crawl van
+de vacaturepagina's met een eigen pool van DETAIL_CONCURRENCY workers: elke
+link die store_vacancies opslaat wordt aangeboden, en alleen vacatures die
+nieuw zijn, een andere titel hebben gekregen of langer dan
+DETAIL_REFRESH_DAYS geleden opgehaald zijn worden (conditional) opgehaald.
+Dezelfde URL bij meerdere gemeenten wordt één keer opgehaald.
+
+Velden komen bij voorkeur uit schema.org JobPosting JSON-LD; zonder JSON-LD
+vallen beschrijving en datum terug op de meta tags van de pagina.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+from app.config import DETAIL_CONCURRENCY, DETAIL_MAX_PAGES, DETAIL_REFRESH_DAYS
+from app.db_writer import DatabaseWriter, vacancy_key
+from app.extraction import run_in_parse_pool
+from app.http_cache import ValidatorCache, content_hash
+from app.http_client import CrawlHttpClient
+from app.parsers import get_parser
+
+logger = logging.getLogger(__name__)
+
+# (municipality_id, url_key) -> (titel, detail_fetched_at)
+DETAIL_STATE_SQL = '''
+    SELECT municipality_id, url, url_key, title, detail_fetched_at
+    FROM vacancies WHERE url_key IS NOT NULL
+'''
+
+# Alleen gevonden velden overschrijven; detail_fetched_at alleen als de velden
+# volledig zijn (een opgehaalde detailpagina, of een site adapter met een
+# volledige feed), anders volgt de detailpagina nog
+DETAIL_UPDATE_SQL = '''
+    UPDATE vacancies SET
+        description = COALESCE(?, description),
+        publication_date = COALESCE(?, publication_date),
+        function_category = COALESCE(?, function_category),
+        education_level = COALESCE(?, education_level),
+        detail_fetched_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE detail_fetched_at END
+    WHERE municipality_id = ? AND url_key = ?
+'''
+
+DETAIL_FIELDS = ("description", "publication_date", "function_category", "education_level")
+
+# Opleidingsniveaus van laag naar hoog; "hbo/wo" betekent minimaal hbo
+_EDUCATION_LEVELS = (
+    ("MBO", re.compile(r'\bmbo\b|\bassociate\b|high school|secondary', re.IGNORECASE)),
+    ("HBO", re.compile(r'\bhbo\b|bachelor|professional certificate', re.IGNORECASE)),
+    ("WO", re.compile(r'\bwo\b|universit|master|postgraduate|doctora', re.IGNORECASE)),
+)
+_META_DESCRIPTION = ("og:description", "description", "twitter:description")
+_META_DATE = ("article:published_time", "datepublished", "date", "dcterms.date")
+_MAX_CATEGORY_LENGTH = 100
+_SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([.,;:!?)])')
+_SPACE_AFTER_PAREN = re.compile(r'\(\s+')
+# "Z", " UTC" of " GMT" achter een tijd
+_UTC_SUFFIX = re.compile(r'(?<=\d)\s*(?:Z|UTC|GMT)$', re.IGNORECASE)
+
+
+class _DetailCollector(HTMLParser):
+    """Verzamelt de JSON-LD blokken en meta tags van een detailpagina"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self._in_json_ld = False
+        self._data: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and (attrs.get("type") or "").strip().lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._data = []
+        elif tag == "meta" and attrs.get("content"):
+            name = (attrs.get("property") or attrs.get("name") or attrs.get("itemprop") or "").strip().lower()
+            if name:
+                self.meta.setdefault(name, attrs["content"].strip())
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self.json_ld.append("".join(self._data))
+            self._in_json_ld = False
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._data.append(data)
+
+
+def _json_ld_items(blocks: List[str]) -> Iterator[dict]:
+    """Alle objecten uit de JSON-LD blokken, inclusief lijsten en @graph"""
+    for block in blocks:
+        try:
+            data = json.loads(block.strip().removeprefix("<!--").removesuffix("-->"))
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                yield item
+                if isinstance(item.get("@graph"), list):
+                    stack.extend(reversed(item["@graph"]))
+
+
+def is_job_posting(item: dict) -> bool:
+    types = item.get("@type")
+    return "JobPosting" in (types if isinstance(types, list) else [types])
+
+
+def _text(value: Any) -> Optional[str]:
+    """Eerste bruikbare tekst uit een JSON-LD waarde (string, lijst of object met name)"""
+    if isinstance(value, list):
+        for item in value:
+            text = _text(item)
+            if text:
+                return text
+        return None
+    if isinstance(value, dict):
+        return _text(value.get("name") or value.get("credentialCategory") or value.get("@value"))
+    if isinstance(value, (str, int, float)):
+        text = str(value).strip()
+        return text or None
+    return None
+
+
+def html_to_text(html: str) -> str:
+    """JobPosting.description is meestal HTML; bewaar alleen de tekst"""
+    if "<" not in html:
+        return html.strip()
+    text = " ".join(get_parser().extract_strings(html))
+    # Tekst na een inline tag ("<em>x</em>.") zonder spatie voor het leesteken
+    return _SPACE_AFTER_PAREN.sub("(", _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text))
+
+
+def parse_date(value: Optional[str]) -> Optional[str]:
+    """
+    ISO datum (met of zonder tijd/zone, ook "... UTC" zoals Recruitee) of
+    dd-mm-jjjj naar het formaat van de database, None als onleesbaar
+    """
+    if not value:
+        return None
+    value = _UTC_SUFFIX.sub("+00:00", value.strip())
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        match = re.match(r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})', value)
+        if not match:
+            return None
+        try:
+            parsed = datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(sep=" ", timespec="seconds")
+
+
+def education_level(text: Optional[str]) -> Optional[str]:
+    """MBO, HBO of WO uit een opleidingseis; het laagst genoemde niveau telt"""
+    if not text:
+        return None
+    for level, pattern in _EDUCATION_LEVELS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def function_category(value: Optional[str]) -> Optional[str]:
+    return value.strip()[:_MAX_CATEGORY_LENGTH] if value and value.strip() else None
+
+
+def job_posting_fields(posting: dict) -> Dict[str, Any]:
+    """De vacature velden uit een schema.org JobPosting object"""
+    description = _text(posting.get("description"))
+    return {
+        "description": html_to_text(description) if description else None,
+        "publication_date": parse_date(_text(posting.get("datePosted"))),
+        "function_category": function_category(
+            _text(posting.get("occupationalCategory")) or _text(posting.get("industry"))
+        ),
+        "education_level": education_level(
+            _text(posting.get("educationRequirements")) or _text(posting.get("qualifications"))
+        ),
+    }
+
+
+def _collect(html: str) -> _DetailCollector:
+    collector = _DetailCollector()
+    collector.feed(html)
+    collector.close()
+    return collector
+
+
+def json_ld_items(html: str) -> List[dict]:
+    """Alle JSON-LD objecten van een pagina (ook die in lijsten en @graph)"""
+    return list(_json_ld_items(_collect(html).json_ld))
+
+
+def extract_job_posting(html: str) -> Dict[str, Any]:
+    """
+    De velden van een vacature detailpagina. Met schema.org JobPosting JSON-LD
+    komen alle velden daaruit; anders alleen beschrijving en datum uit de meta
+    tags, en het opleidingsniveau uit de beschrijving.
+    """
+    collector = _collect(html)
+    posting = next((item for item in _json_ld_items(collector.json_ld) if is_job_posting(item)), None)
+    fields: Dict[str, Any] = dict.fromkeys(DETAIL_FIELDS)
+    fields["json_ld"] = posting is not None
+    if posting is not None:
+        fields.update(job_posting_fields(posting))
+
+    meta = collector.meta
+    if not fields["description"]:
+        fields["description"] = next((meta[name] for name in _META_DESCRIPTION if meta.get(name)), None)
+    if not fields["publication_date"]:
+        fields["publication_date"] = next(
+            (parse_date(meta[name]) for name in _META_DATE if parse_date(meta.get(name))), None
+        )
+    if not fields["education_level"]:
+        fields["education_level"] = education_level(fields["description"])
+    return fields
+
+
+def process_detail_page(body: bytes, encoding: Optional[str], previous_hash: Optional[str] = None) -> dict:
+    """
+    Hash de body en haal de vacature velden eruit; bij dezelfde hash als
+    `previous_hash` wordt niet geparsed. Draait in de parse pool.
+    """
+    page_hash = content_hash(body)
+    if previous_hash is not None and page_hash == previous_hash:
+        return {"content_hash": page_hash, "unchanged": True}
+    html = body.decode(encoding or 'utf-8', errors='replace')
+    return {"content_hash": page_hash, "fields": extract_job_posting(html)}
+
+
+def listing_detail_rows(municipality_id: str, vacancy_links: List[dict], complete: bool) -> List[tuple]:
+    """
+    DETAIL_UPDATE_SQL rijen voor links die hun velden al van de vacaturepagina
+    of feed meekregen (zie app/adapters). Met complete=True hoeft de
+    detailpagina niet meer opgehaald te worden.
+    """
+    rows = []
+    for vacancy in vacancy_links:
+        values = tuple(vacancy.get(name) for name in DETAIL_FIELDS)
+        if any(value is not None for value in values) or complete:
+            rows.append((*values, complete, municipality_id, vacancy_key(vacancy['url'])))
+    return rows
+
+
+@dataclass
+class DetailStats:
+    """Tellers van de detail stage van één crawl run"""
+    offered: int = 0
+    queued: int = 0
+    fetched: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    json_ld: int = 0
+    failed: int = 0
+    over_budget: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "offered": self.offered,
+            "queued": self.queued,
+            "fetched": self.fetched,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "json_ld": self.json_ld,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "fetch_seconds": round(self.fetch_seconds, 3),
+            "parse_seconds": round(self.parse_seconds, 3),
+        }
+
+
+@dataclass
+class _DetailTask:
+    url: str
+    url_key: str
+    municipality_ids: Set[str] = field(default_factory=set)
+    # Met validators en vorige hash; niet als een van de vacatures nog nooit velden kreeg
+    conditional: bool = True
+
+
+@dataclass
+class _KnownVacancy:
+    title: Optional[str]
+    fetched_at: Optional[str]
+
+
+class DetailStage:
+    """
+    Haalt detailpagina's op met een eigen pool van workers, naast de crawl
+    van de vacaturepagina's. Gebruik als async context manager: bij het
+    verlaten wordt gewacht tot alle aangeboden pagina's verwerkt zijn.
+    """
+
+    def __init__(
+        self,
+        client: CrawlHttpClient,
+        writer: DatabaseWriter,
+        cache: Optional[ValidatorCache] = None,
+        known: Optional[Dict[Tuple[str, str], _KnownVacancy]] = None,
+        pending: Optional[List[Tuple[str, str, str]]] = None,
+        concurrency: int = DETAIL_CONCURRENCY,
+        max_pages: int = DETAIL_MAX_PAGES,
+        refresh_days: float = DETAIL_REFRESH_DAYS,
+    ):
+        self.client = client
+        self.writer = writer
+        self.cache = cache
+        self.known = known or {}
+        self.concurrency = max(0, concurrency)
+        self.max_pages = max_pages
+        # Zelfde formaat en tijdzone (UTC) als CURRENT_TIMESTAMP in SQLite
+        refresh_before = datetime.now(timezone.utc) - timedelta(days=refresh_days)
+        self.refresh_before = refresh_before.replace(tzinfo=None).isoformat(sep=" ", timespec="seconds")
+        self.stats = DetailStats()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: Dict[str, _DetailTask] = {}
+        self._results: Dict[str, Optional[dict]] = {}
+        self._failed: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._pending = pending or []
+
+    @classmethod
+    async def load(cls, db, client: CrawlHttpClient, writer: DatabaseWriter,
+                   cache: Optional[ValidatorCache] = None, **kwargs) -> "DetailStage":
+        """
+        Laad per vacature de titel en detail_fetched_at. Vacatures waarvan de
+        detailpagina nog nooit opgehaald is (bijv. omdat het budget van de
+        vorige run op was) staan direct in de wachtrij.
+        """
+        known = {}
+        pending = []
+        async with db.execute(DETAIL_STATE_SQL) as cursor:
+            async for municipality_id, url, url_key, title, fetched_at in cursor:
+                known[(municipality_id, url_key)] = _KnownVacancy(title, fetched_at)
+                if fetched_at is None and url:
+                    pending.append((municipality_id, url, url_key))
+        return cls(client, writer, cache, known, pending, **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0
+
+    def _never_fetched(self, municipality_id: str, url_key: str) -> bool:
+        known = self.known.get((municipality_id, url_key))
+        return known is None or known.fetched_at is None
+
+    def _needs_fetch(self, municipality_id: str, url_key: str, title: Optional[str]) -> bool:
+        """Nieuw, andere titel dan bij de vorige run, of te lang geleden opgehaald"""
+        if self._never_fetched(municipality_id, url_key):
+            return True
+        known = self.known[(municipality_id, url_key)]
+        return known.title != title or known.fetched_at < self.refresh_before
+
+    def submit(self, municipality_id: str, vacancy_links: List[dict], listing_url: Optional[str] = None):
+        """
+        Bied de links van een vacaturepagina aan (met de titel zoals ze
+        opgeslagen worden). Links naar de vacaturepagina zelf worden overgeslagen.
+        """
+        if not self.enabled:
+            return
+        listing_key = vacancy_key(listing_url)
+        for vacancy in vacancy_links:
+            url = vacancy.get('url')
+            url_key = vacancy_key(url)
+            if not url_key or url_key == listing_key:
+                continue
+            self.stats.offered += 1
+            if self._needs_fetch(municipality_id, url_key, vacancy.get('title')):
+                self._enqueue(municipality_id, url, url_key)
+
+    def _enqueue(self, municipality_id: str, url: str, url_key: str):
+        if url_key in self._results:
+            fields = self._results[url_key]
+            if fields is not None or not self._never_fetched(municipality_id, url_key):
+                # Al opgehaald in deze run (voor een andere gemeente): alleen de velden schrijven
+                self._write(fields, [municipality_id], url_key)
+                return
+            # Een 304 of ongewijzigde hash zegt niets over een vacature die nog nooit
+            # velden kreeg: opnieuw ophalen, zonder validators
+            del self._results[url_key]
+        if url_key in self._failed:
+            return
+        task = self._tasks.get(url_key)
+        if task is not None:
+            task.municipality_ids.add(municipality_id)
+            if self._never_fetched(municipality_id, url_key):
+                # Nog niet opgehaald: vanaf nu zonder validators; anders krijgt
+                # deze gemeente na afloop een nieuwe taak
+                task.conditional = False
+            return
+        if self.max_pages and self.stats.queued >= self.max_pages:
+            # Blijft zonder detail_fetched_at staan en komt de volgende run aan de beurt
+            self.stats.over_budget += 1
+            return
+        task = _DetailTask(url, url_key, {municipality_id}, not self._never_fetched(municipality_id, url_key))
+        self._tasks[url_key] = task
+        self.stats.queued += 1
+        self._queue.put_nowait(task)
+
+    def _write(self, fields: Optional[dict], municipality_ids, url_key: str):
+        """Velden (of alleen detail_fetched_at bij lege velden) voor elke gemeente met deze URL"""
+        values = tuple((fields or {}).get(name) for name in DETAIL_FIELDS)
+        self.writer.submit_many(DETAIL_UPDATE_SQL, [
+            (*values, True, municipality_id, url_key) for municipality_id in sorted(municipality_ids)
+        ])
+
+    async def _fetch(self, task: _DetailTask) -> Optional[dict]:
+        """
+        Haal één detailpagina op. None als de pagina sinds de vorige keer niet
+        veranderd is (304 of dezelfde hash), lege velden als er niets uit te
+        halen valt.
+        """
+        cache = self.cache
+        conditional = cache is not None and task.conditional
+        started = time.monotonic()
+        response = await self.client.get(task.url, headers=cache.request_headers(task.url) if conditional else {})
+        fetch_seconds = time.monotonic() - started
+        self.stats.fetch_seconds += fetch_seconds
+        self.stats.fetched += 1
+
+        if response.status_code == 304 and conditional:
+            cache.record_not_modified(task.url, fetch_seconds)
+            self.stats.not_modified += 1
+            return None
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            # Bijv. een PDF: geen velden, wel als opgehaald markeren
+            return {}
+
+        started = time.monotonic()
+        page = await run_in_parse_pool(
+            process_detail_page, response.content, response.encoding,
+            cache.previous_hash(task.url) if conditional else None
+        )
+        self.stats.parse_seconds += time.monotonic() - started
+        if cache:
+            cache.record_response(task.url, response, fetch_seconds, page["content_hash"])
+        if page.get("unchanged"):
+            self.stats.unchanged += 1
+            return None
+        if page["fields"].get("json_ld"):
+            self.stats.json_ld += 1
+        return page["fields"]
+
+    async def _run_worker(self):
+        while True:
+            task = await self._queue.get()
+            try:
+                fields = await self._fetch(task)
+            except Exception as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (404, 410):
+                    # De vacature is weg; niet elke run opnieuw proberen
+                    logger.info(f"Detailpagina {task.url} niet beschikbaar: {e.response.status_code}")
+                    self.stats.failed += 1
+                    fields = {}
+                else:
+                    # Netwerkfout, 429 of 5xx: zonder detail_fetched_at, dus de volgende run opnieuw
+                    logger.warning(f"Kon detailpagina {task.url} niet ophalen: {str(e)}")
+                    self.stats.failed += 1
+                    self._failed.add(task.url_key)
+                    self._tasks.pop(task.url_key, None)
+                    self._queue.task_done()
+                    continue
+            # Gemeenten die tijdens het ophalen nog bij de taak kwamen krijgen dezelfde velden
+            self._results[task.url_key] = fields
+            self._tasks.pop(task.url_key, None)
+            municipality_ids = task.municipality_ids
+            if fields is None:
+                # Niets nieuws: alleen voor vacatures die de velden al eerder kregen;
+                # wie er tijdens het ophalen bij kwam en nog niets heeft krijgt een nieuwe taak
+                retry = {m for m in municipality_ids if self._never_fetched(m, task.url_key)}
+                municipality_ids = municipality_ids - retry
+                for municipality_id in sorted(retry):
+                    self._enqueue(municipality_id, task.url, task.url_key)
+            self._write(fields, municipality_ids, task.url_key)
+            self._queue.task_done()
+
+    async def start(self):
+        if not self.enabled:
+            return
+        for municipality_id, url, url_key in self._pending:
+            self._enqueue(municipality_id, url, url_key)
+        self._pending = []
+        self._workers = [asyncio.create_task(self._run_worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain: bool = True):
+        """Wacht tot de wachtrij leeg is (of breek af met drain=False) en stop de workers"""
+        try:
+            if drain and self._workers:
+                await self._queue.join()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+
+    async def __aenter__(self) -> "DetailStage":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, *exc_info):
+        await self.stop(drain=exc_type is None)
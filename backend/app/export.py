@@ -0,0 +1,67 @@
+"""
+Streaming export van alle vacatures als NDJSON of CSV, optioneel gzip.
+
+De rijen komen in batches van EXPORT_FETCH_ROWS via `fetchmany` uit een
+SQLite cursor en worden direct gecodeerd en doorgestuurd; er staat nooit
+meer dan één batch in het geheugen, hoe groot de tabel ook is. De export
+gebruikt een eigen read-only connectie, zodat een lange export geen
+connectie uit de lees-pool van de API bezet houdt.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Optional, Sequence
+
+from app.config import EXPORT_FETCH_ROWS
+from app.database import connect
+from app.queries import VACANCY_COLUMNS, vacancy_export_query
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _encode_ndjson(rows: Iterable[Sequence]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(VACANCY_COLUMNS, row)), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def _encode_csv(rows: Iterable[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_vacancies(fmt: str, since: Optional[str] = None, compress: bool = False,
+                           fetch_rows: int = EXPORT_FETCH_ROWS) -> AsyncIterator[bytes]:
+    """Async generator met de export in chunks (één chunk per fetchmany batch)"""
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    sql, params = vacancy_export_query(since)
+    db = await connect(read_only=True)
+    try:
+        if fmt == "csv":
+            header = emit(_encode_csv([VACANCY_COLUMNS]))
+            if header:
+                yield header
+        cursor = await db.execute(sql, params)
+        while True:
+            rows = await cursor.fetchmany(fetch_rows)
+            if not rows:
+                break
+            chunk = emit(encode(rows))
+            if chunk:
+                yield chunk
+        await cursor.close()
+        if compressor:
+            yield compressor.flush()
+    finally:
+        await db.close()
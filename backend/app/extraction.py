@@ -0,0 +1,196 @@
+"""
+Extractie van vacature links uit een opgehaalde pagina.
+
+Parsen is CPU-werk en blokkeert de event loop (en daarmee de API) als het in
+een coroutine gebeurt. `process_page` doet hashen, decoderen en extractie in
+één functie die in een ProcessPoolExecutor draait; het ophalen blijft in asyncio.
+Naast de vacature links levert `process_page` de vervolgpagina's van de lijst
+(zie pagination.py); JSON listing endpoints worden als JSON gelezen. Met een
+site adapter (zie app/adapters) parst de adapter de pagina of feed.
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+from urllib.parse import urljoin
+
+from app.adapters.base import SiteAdapter
+from app.classifier import get_matcher
+from app.config import PARSE_WORKERS
+from app.http_cache import content_hash
+from app.pagination import find_json_next_pages, find_next_pages
+from app.parsers import Link, get_parser
+
+logger = logging.getLogger(__name__)
+
+VACANCY_LINK_KEYWORDS = ('vacature', 'vacancy', 'werken-bij', 'werkenbij', 'jobs', 'careers')
+VACANCY_TEXT_KEYWORDS = ('vacature', 'vacancy', 'sollicitatie', 'werken bij')
+
+# Sleutels van een vacature object in een JSON listing
+_JSON_URL_KEYS = ('url', 'link', 'href', 'permalink', 'detailUrl', 'detail_url', 'vacancyUrl', 'jobUrl')
+_JSON_TITLE_KEYS = ('title', 'name', 'titel', 'functie', 'jobTitle', 'job_title')
+
+
+def extract_vacancy_links(html: str, current_url: str, keywords: Optional[Sequence[str]] = None,
+                          links: Optional[List[Link]] = None) -> List[dict]:
+    """
+    Zoek vacature links in een HTML pagina.
+    Titels kunnen leeg zijn; die worden per gemeente ingevuld bij het opslaan.
+    Met `keywords` (per gemeente instelbaar) worden de standaard keywords voor
+    zowel links als tekst vervangen. `links` zijn de al geparste links van de
+    pagina (anders parst deze functie ze zelf).
+    """
+    parser = get_parser()
+    link_matcher = get_matcher(tuple(keywords or VACANCY_LINK_KEYWORDS))
+    text_matcher = get_matcher(tuple(keywords or VACANCY_TEXT_KEYWORDS))
+    vacancy_links = []
+
+    # Zoek naar links die mogelijk naar vacatures verwijzen
+    for href, title in (parser.extract_links(html) if links is None else links):
+        # Maak relatieve URLs absoluut (ten opzichte van de pagina, niet van de host)
+        href = urljoin(current_url, href.strip())
+        if not href.startswith(('http://', 'https://')):
+            continue
+
+        # Check of de link waarschijnlijk naar een vacature verwijst
+        if link_matcher.matches(href):
+            vacancy_links.append({
+                'url': href,
+                'title': title
+            })
+
+    # Als we geen vacatures vinden, probeer dieper te zoeken
+    if not vacancy_links:
+        for text in parser.extract_strings(html):
+            if text_matcher.matches(text):
+                title = text[:100]  # Neem eerste 100 karakters als titel
+                vacancy_links.append({
+                    'url': current_url,
+                    'title': title
+                })
+
+    return vacancy_links
+
+
+def _json_text(value: Any) -> Optional[str]:
+    # WordPress REST geeft bijv. {"title": {"rendered": "..."}}
+    if isinstance(value, dict):
+        value = value.get('rendered') or value.get('name')
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def extract_json_vacancy_links(data: Any, current_url: str) -> List[dict]:
+    """
+    Vacatures uit een JSON listing endpoint: elk object met een URL en een
+    titel. Het endpoint hoort bij een vacaturelijst, dus geen keyword filter.
+    """
+    vacancy_links = []
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(item))
+        elif isinstance(item, dict):
+            url = next((_json_text(item.get(key)) for key in _JSON_URL_KEYS if _json_text(item.get(key))), None)
+            title = next((_json_text(item.get(key)) for key in _JSON_TITLE_KEYS if _json_text(item.get(key))), None)
+            if url and title:
+                url = urljoin(current_url, url)
+                if url.startswith(('http://', 'https://')):
+                    vacancy_links.append({'url': url, 'title': title})
+                    continue
+            stack.extend(reversed([value for value in item.values() if isinstance(value, (dict, list))]))
+    return vacancy_links
+
+
+def _is_json(content_type: Optional[str], text: str) -> bool:
+    if content_type:
+        return 'json' in content_type.lower()
+    return text.lstrip()[:1] in ('{', '[')
+
+
+def process_page(body: bytes, encoding: Optional[str], current_url: str, previous_hash: Optional[str] = None,
+                 keywords: Optional[Sequence[str]] = None, content_type: Optional[str] = None,
+                 adapter: Optional[SiteAdapter] = None) -> dict:
+    """
+    Hash de body en extraheer de vacature links en vervolgpagina's. Is de
+    hash gelijk aan `previous_hash`, dan wordt er niet geparsed en bevat het
+    resultaat "unchanged": True. Met een `adapter` doet die de extractie
+    (zonder keyword filter). Draait in een worker proces, dus alleen
+    picklable in/uit.
+    """
+    page_hash = content_hash(body)
+    if previous_hash is not None and page_hash == previous_hash:
+        return {"content_hash": page_hash, "unchanged": True}
+
+    text = body.decode(encoding or 'utf-8', errors='replace')
+    if adapter is not None:
+        page = adapter.parse(text, current_url)
+        return {
+            "content_hash": page_hash,
+            "vacancy_links": page.get("vacancy_links", []),
+            "next_pages": page.get("next_pages", []),
+            "complete": adapter.provides_details,
+        }
+    if _is_json(content_type, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        return {
+            "content_hash": page_hash,
+            "vacancy_links": extract_json_vacancy_links(data, current_url),
+            "next_pages": find_json_next_pages(data, current_url),
+        }
+
+    links = get_parser().extract_links(text)
+    return {
+        "content_hash": page_hash,
+        "vacancy_links": extract_vacancy_links(text, current_url, keywords, links),
+        "next_pages": find_next_pages(text, current_url, links),
+    }
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def start_parse_pool(workers: int = PARSE_WORKERS):
+    """Start de process pool voor parsen (no-op bij workers=0 of als hij al draait)"""
+    global _executor
+    if _executor is None and workers > 0:
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"Parse pool gestart met {workers} processen")
+
+
+def shutdown_parse_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_parse_pool(func: Callable[..., Any], *args) -> Any:
+    """Voer een (picklable) parse functie uit in de process pool (of inline als die uit staat)"""
+    start_parse_pool()
+    if _executor is None:
+        return func(*args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, func, *args)
+    except BrokenProcessPool:
+        # Een worker is gecrasht (bijv. door geheugengebrek); start een nieuwe pool
+        logger.error("Parse pool kapot, wordt opnieuw gestart")
+        shutdown_parse_pool()
+        start_parse_pool()
+        return await loop.run_in_executor(_executor, func, *args)
+
+
+async def run_process_page(body: bytes, encoding: Optional[str], current_url: str, previous_hash: Optional[str] = None,
+                           keywords: Optional[Sequence[str]] = None, content_type: Optional[str] = None,
+                           adapter: Optional[SiteAdapter] = None) -> dict:
+    """Voer process_page uit in de process pool (of inline als die uit staat)"""
+    return await run_in_parse_pool(
+        process_page, body, encoding, current_url, previous_hash, keywords, content_type, adapter
+    )
@@ -0,0 +1,145 @@
+"""
+Cache van HTTP validators (ETag / Last-Modified) en content hashes per URL.
+
+De validators worden aan het begin van een crawl run in één keer uit de
+`http_cache` tabel geladen en aan het eind in één transactie teruggeschreven.
+Met If-None-Match / If-Modified-Since kan een server 304 Not Modified
+antwoorden, waarna parsen en opslaan overgeslagen worden.
+
+Veel servers sturen geen bruikbare validators. Daarom wordt ook een hash van
+de genormaliseerde body bewaard: is die gelijk aan de vorige run, dan is de
+pagina ongewijzigd en hoeft er ook niet geparsed te worden.
+"""
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Onderdelen die per request verschillen zonder dat de inhoud verandert
+_VOLATILE_PATTERNS = re.compile(
+    rb'(nonce|csrf[-_]?token|__requestverificationtoken|data-timestamp)(["\']?\s*[=:]\s*)["\'][^"\']*["\']',
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(rb'\s+')
+
+
+def content_hash(body: bytes) -> str:
+    """Snelle hash van een genormaliseerde response body"""
+    body = _VOLATILE_PATTERNS.sub(rb'\1\2""', body)
+    body = _WHITESPACE.sub(b' ', body)
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: int = 0
+    fetch_seconds: float = 0.0
+    content_hash: Optional[str] = None
+
+
+@dataclass
+class ConditionalStats:
+    """Tellers voor conditional requests en ongewijzigde pagina's"""
+    conditional_requests: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    bytes_saved: int = 0
+    seconds_saved: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "conditional_requests": self.conditional_requests,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "bytes_saved": self.bytes_saved,
+            "seconds_saved": round(self.seconds_saved, 2),
+        }
+
+
+class ValidatorCache:
+    """In-memory kopie van de http_cache tabel voor de duur van een crawl run"""
+
+    def __init__(self, entries: Optional[Dict[str, CacheEntry]] = None):
+        self.entries: Dict[str, CacheEntry] = entries or {}
+        self.stats = ConditionalStats()
+        self._dirty: Dict[str, CacheEntry] = {}
+
+    @classmethod
+    async def load(cls, db) -> "ValidatorCache":
+        """Laad alle validators uit de database"""
+        entries = {}
+        async with db.execute(
+            'SELECT url, etag, last_modified, content_length, fetch_seconds, content_hash FROM http_cache'
+        ) as cursor:
+            async for row in cursor:
+                entries[row[0]] = CacheEntry(
+                    etag=row[1],
+                    last_modified=row[2],
+                    content_length=row[3] or 0,
+                    fetch_seconds=row[4] or 0.0,
+                    content_hash=row[5],
+                )
+        return cls(entries)
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers voor een URL (leeg als er niets bekend is)"""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        if headers:
+            self.stats.conditional_requests += 1
+        return headers
+
+    def record_not_modified(self, url: str, fetch_seconds: float):
+        """Registreer een 304; de besparing is gebaseerd op de laatste volledige response"""
+        entry = self.entries.get(url)
+        self.stats.not_modified += 1
+        if entry:
+            self.stats.bytes_saved += entry.content_length
+            self.stats.seconds_saved += max(entry.fetch_seconds - fetch_seconds, 0.0)
+
+    def previous_hash(self, url: str) -> Optional[str]:
+        """Content hash van de vorige run (None als onbekend)"""
+        entry = self.entries.get(url)
+        return entry.content_hash if entry else None
+
+    def record_response(self, url: str, response, fetch_seconds: float, page_hash: str):
+        """Onthoud de validators en content hash van een volledige (200) response"""
+        previous = self.entries.get(url)
+        if previous is not None and previous.content_hash == page_hash:
+            self.stats.unchanged += 1
+
+        entry = CacheEntry(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_length=response.num_bytes_downloaded,
+            fetch_seconds=fetch_seconds,
+            content_hash=page_hash,
+        )
+        self.entries[url] = entry
+        self._dirty[url] = entry
+
+    def save(self, writer):
+        """Stuur gewijzigde validators als één executemany naar de DatabaseWriter"""
+        if not self._dirty:
+            return
+        upserts = [
+            (url, e.etag, e.last_modified, e.content_length, e.fetch_seconds, e.content_hash)
+            for url, e in self._dirty.items()
+        ]
+        writer.submit_many('''
+            INSERT OR REPLACE INTO http_cache
+            (url, etag, last_modified, content_length, fetch_seconds, content_hash, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', upserts)
+        logger.info(f"HTTP cache opgeslagen: {len(upserts)} URLs bijgewerkt")
+        self._dirty.clear()
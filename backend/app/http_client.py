@@ -0,0 +1,121 @@
+"""
+Gedeelde HTTP client voor een crawl run.
+
+Eén langlevende httpx.AsyncClient met connection pooling (en HTTP/2 als het
+`h2` pakket beschikbaar is), zodat gemeenten op dezelfde host de TCP/TLS
+verbinding kunnen hergebruiken. Houdt bij hoeveel verbindingen er nieuw
+opgezet zijn en hoeveel requests een bestaande verbinding hergebruikten.
+Alle requests lopen via een HostLimiter (zie politeness.py).
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import (
+    HTTP2_ENABLED,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+    HOST_MAX_RETRIES,
+    USER_AGENT,
+)
+from app.politeness import HostLimiter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class ConnectionStats:
+    """Tellers voor verbindingshergebruik"""
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    http2_responses: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(self.requests - self.new_connections, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": self.reused_connections,
+            "http2_responses": self.http2_responses,
+        }
+
+
+class CrawlHttpClient:
+    """
+    Wrapper rond een gedeelde httpx.AsyncClient.
+
+    Gebruik als async context manager; de client blijft open voor de hele
+    crawl run en wordt daarna netjes gesloten.
+    """
+
+    def __init__(self, **client_kwargs):
+        self.stats = ConnectionStats()
+        self.http2 = HTTP2_ENABLED and HTTP2_AVAILABLE
+        if HTTP2_ENABLED and not HTTP2_AVAILABLE:
+            logger.info("HTTP/2 niet beschikbaar (pakket 'h2' ontbreekt), gebruik HTTP/1.1")
+
+        options = {
+            "timeout": HTTP_TIMEOUT,
+            "follow_redirects": True,
+            "http2": self.http2,
+            "headers": {"User-Agent": USER_AGENT},
+            "limits": httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        }
+        options.update(client_kwargs)
+        self._client = httpx.AsyncClient(**options)
+        self.limiter = HostLimiter(fetch_text=self._fetch_robots)
+
+    async def _fetch_robots(self, url: str) -> Optional[str]:
+        self.stats.requests += 1
+        response = await self._client.get(url, timeout=10.0, extensions={"trace": self._trace})
+        return response.text if response.status_code == 200 else None
+
+    async def _trace(self, event_name: str, info: dict):
+        # httpcore trace events; alleen nieuwe verbindingen en handshakes tellen
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.stats.tls_handshakes += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET request via de gedeelde connection pool, met rate limiting per host"""
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = self._trace
+        for attempt in range(HOST_MAX_RETRIES + 1):
+            async with self.limiter.slot(url):
+                self.stats.requests += 1
+                response = await self._client.get(url, extensions=extensions, **kwargs)
+            if response.http_version == "HTTP/2":
+                self.stats.http2_responses += 1
+            # Bij 429/503 met Retry-After wacht de volgende poging vanzelf in slot()
+            if self.limiter.record_response(url, response) is None or attempt == HOST_MAX_RETRIES:
+                break
+        return response
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "CrawlHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -1,15 +1,14 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi import Request
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pydantic import BaseModel
 import httpx
 import asyncio
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import logging
-from bs4 import BeautifulSoup
 import re
 import json
 import sqlite3
@@ -17,6 +16,8 @@ import os
 import sys
 import aiosqlite
 import csv
+import time
+from contextlib import nullcontext
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
 
@@ -26,6 +27,41 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Laad environment variables
 load_dotenv()
 
+from app.config import API_MAX_PAGE_SIZE, API_PAGE_SIZE, CRAWL_CONCURRENCY
+from app.adapters import adapters
+from app.adapters.base import SiteAdapter
+from app.classifier import parse_keywords
+from app.crawler import CrawlGroup, CrawlScheduler, CrawlTimings, plan_crawl
+from app.csv_import import import_municipalities
+from app.details import DETAIL_UPDATE_SQL, DetailStage, listing_detail_rows
+from app.database import close_read_pool, connect, open_read_pool, read_db, read_pool_stats
+from app.db_writer import VACANCY_UPSERT_SQL, DatabaseWriter, vacancy_key
+from app.http_cache import ValidatorCache
+from app.http_client import CrawlHttpClient
+from app.export import EXPORT_FORMATS, export_vacancies
+from app.extraction import run_process_page, shutdown_parse_pool, start_parse_pool
+from app.migrations import create_base_tables, migrate
+from app.pagination import ListingCrawl
+from app.municipalities import registry
+from app.progress import progress_events
+from app.queries import (
+    EDUCATION_LEVELS_SQL,
+    FUNCTION_CATEGORIES_SQL,
+    GLOBAL_STATS_SQL,
+    LOGS_SQL,
+    REFRESH_MUNICIPALITY_TOTALS_SQL,
+    RESET_RUN_COUNTS_SQL,
+    SUCCESS_RATE_SQL,
+    VACANCIES_SQL,
+    VACANCY_COLUMNS,
+    VACANCY_COUNTS_SQL,
+    decode_cursor,
+    encode_cursor,
+    vacancy_page_query,
+)
+from app.response_cache import response_cache
+from app.runs import CrawlRun, RunActiveError, crawl_runs
+
 # Logging configuratie
 logging.basicConfig(
     level=logging.INFO,
@@ -77,6 +113,7 @@ class Municipality(BaseModel):
     last_scraped: Optional[datetime] = None
     success_rate: float = 0
     last_success: Optional[datetime] = None
+    vacancy_keywords: Optional[str] = None  # Komma-gescheiden, vervangt de standaard keywords
 
 class ScrapeResult(BaseModel):
     """Model voor scrape resultaten per gemeente"""
@@ -96,16 +133,9 @@ class AdminStats(BaseModel):
     error_count: int = 0
     success_count: int = 0
 
-# Voeg deze variabelen toe bovenaan het bestand, na de andere imports
-scraping_progress = {
-    "total": 0,
-    "current": 0,
-    "status": "idle"  # idle, running, completed
-}
-
 # Voeg deze functie toe na de andere import functies
-async def import_municipalities_from_csv():
-    """Importeer alle gemeenten uit het CSV bestand"""
+async def import_municipalities_from_csv(force: bool = False):
+    """Importeer de gemeenten uit het CSV bestand als dat sinds de vorige import gewijzigd is"""
     csv_path = os.path.join(os.path.dirname(__file__), 'data', 'municipalities.csv')
     
     try:
@@ -115,26 +145,9 @@ async def import_municipalities_from_csv():
         # Open database connectie
         db = await get_db()
         
-        # Lees het CSV bestand
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Voeg elke gemeente toe aan de database
-                await db.execute('''
-                    INSERT OR REPLACE INTO municipalities 
-                    (id, name, latitude, longitude, website, vacancy_url, enabled)
-                    VALUES (?, ?, ?, ?, ?, ?, 1)
-                ''', (
-                    row['gemeente_code'],
-                    row['gemeente_naam'],
-                    float(row['latitude']) if row['latitude'] else None,
-                    float(row['longitude']) if row['longitude'] else None,
-                    f"https://www.{row['gemeente_naam'].lower().replace(' ', '')}.nl",
-                    None,  # vacancy_url wordt later handmatig toegevoegd
-                ))
-        
-        await db.commit()
-        logger.info("Alle gemeenten succesvol geïmporteerd uit CSV")
+        result = await import_municipalities(db, csv_path, force=force)
+        logger.info(f"Gemeenten CSV: {result}")
+        return result
         
     except Exception as e:
         logger.error(f"Fout bij importeren gemeenten uit CSV: {e}")
@@ -143,206 +156,21 @@ async def import_municipalities_from_csv():
         if 'db' in locals():
             await db.close()
 
-# Update de MUNICIPALITIES lijst met meer gemeenten
-MUNICIPALITIES = [
-    {
-        "id": "GM0363",
-        "name": "Amsterdam",
-        "latitude": 52.3676,
-        "longitude": 4.9041,
-        "website": "https://www.amsterdam.nl",
-        "vacancy_url": "https://www.amsterdam.nl/werk-en-ondernemen/werken-bij-gemeente/",
-        "enabled": True
-    },
-    {
-        "id": "GM0599",
-        "name": "Rotterdam",
-        "latitude": 51.9225,
-        "longitude": 4.4792,
-        "website": "https://www.rotterdam.nl",
-        "vacancy_url": "https://www.rotterdam.nl/werken-leren/vacatures/",
-        "enabled": True
-    },
-    {
-        "id": "GM0518",
-        "name": "'s-Gravenhage",  # Den Haag in GeoJSON
-        "latitude": 52.0705,
-        "longitude": 4.3007,
-        "website": "https://www.denhaag.nl",
-        "vacancy_url": "https://www.werkenbijdenhaag.nl",
-        "enabled": True
-    },
-    {
-        "id": "GM0344",
-        "name": "Utrecht",
-        "latitude": 52.0907,
-        "longitude": 5.1214,
-        "website": "https://www.utrecht.nl",
-        "vacancy_url": "https://www.utrecht.nl/werk-en-ondernemen/werken-bij-de-gemeente/",
-        "enabled": True
-    },
-    {
-        "id": "GM0772",
-        "name": "Eindhoven",
-        "latitude": 51.4416,
-        "longitude": 5.4697,
-        "website": "https://www.eindhoven.nl",
-        "vacancy_url": "https://www.eindhoven.nl/vacatures",
-        "enabled": True
-    },
-    {
-        "id": "GM0014",
-        "name": "Groningen",
-        "latitude": 53.2194,
-        "longitude": 6.5665,
-        "website": "https://gemeente.groningen.nl",
-        "vacancy_url": "https://gemeente.groningen.nl/vacatures",
-        "enabled": True
-    },
-    {
-        "id": "GM0855",
-        "name": "Tilburg",
-        "latitude": 51.5719,
-        "longitude": 5.0672,
-        "website": "https://www.tilburg.nl",
-        "vacancy_url": "https://www.werkeninmiddenbrabant.nl",
-        "enabled": True
-    },
-    {
-        "id": "GM0034",
-        "name": "Almere",
-        "latitude": 52.3508,
-        "longitude": 5.2647,
-        "website": "https://www.almere.nl",
-        "vacancy_url": "https://www.almere.nl/werken/vacatures",
-        "enabled": True
-    },
-    {
-        "id": "GM0758",
-        "name": "Breda",
-        "latitude": 51.5719,
-        "longitude": 4.7683,
-        "website": "https://www.breda.nl",
-        "vacancy_url": "https://www.werkeninwestbrabant.nl",
-        "enabled": True
-    },
-    {
-        "id": "GM0268",
-        "name": "Nijmegen",
-        "latitude": 51.8425,
-        "longitude": 5.8372,
-        "website": "https://www.nijmegen.nl",
-        "vacancy_url": "https://www.nijmegen.nl/over-de-gemeente/werken-bij-gemeente-nijmegen/",
-        "enabled": True
-    },
-    {
-        "id": "GM0153",
-        "name": "Enschede",
-        "latitude": 52.2215,
-        "longitude": 6.8937,
-        "website": "https://www.enschede.nl",
-        "vacancy_url": "https://www.enschede.nl/werken-bij-de-gemeente",
-        "enabled": True
-    },
-    {
-        "id": "GM0141",
-        "name": "Almelo",
-        "latitude": 52.3570,
-        "longitude": 6.6684,
-        "website": "https://www.almelo.nl",
-        "vacancy_url": "https://www.almelo.nl/werken-bij-de-gemeente",
-        "enabled": True
-    },
-    {
-        "id": "GM0307",
-        "name": "Amersfoort",
-        "latitude": 52.1561,
-        "longitude": 5.3878,
-        "website": "https://www.amersfoort.nl",
-        "vacancy_url": "https://www.amersfoort.nl/werken-bij",
-        "enabled": True
-    },
-    {
-        "id": "GM0375",
-        "name": "Beverwijk",
-        "latitude": 52.4851,
-        "longitude": 4.6572,
-        "website": "https://www.beverwijk.nl",
-        "vacancy_url": "https://www.beverwijk.nl/werken-bij-de-gemeente",
-        "enabled": True
-    },
-    {
-        "id": "GM0200",
-        "name": "Apeldoorn",
-        "latitude": 52.2112,
-        "longitude": 5.9699,
-        "website": "https://www.apeldoorn.nl",
-        "vacancy_url": "https://www.apeldoorn.nl/werken-bij-de-gemeente",
-        "enabled": True
-    }
-]
-
-def get_all_municipalities():
-    """Return all municipalities"""
-    return MUNICIPALITIES
-
 # Database functies
 async def get_db():
-    """Get database connection"""
-    db_path = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
-    return await aiosqlite.connect(db_path)
+    """Open een schrijvende connectie (WAL mode, getunede pragmas); API reads gebruiken read_db()"""
+    return await connect()
 
 async def init_db():
     """Initialize database tables"""
     try:
         db = await get_db()
         
-        # Maak municipalities tabel
-        await db.execute('''
-        CREATE TABLE IF NOT EXISTS municipalities (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            latitude REAL,
-            longitude REAL,
-            website TEXT,
-            vacancy_url TEXT,
-            enabled INTEGER DEFAULT 1,
-            last_scraped TIMESTAMP,
-            success_rate REAL DEFAULT 0,
-            last_success TIMESTAMP
-        )
-        ''')
-        
-        # Maak vacancies tabel
-        await db.execute('''
-        CREATE TABLE IF NOT EXISTS vacancies (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            municipality_id TEXT NOT NULL,
-            description TEXT,
-            function_category TEXT,
-            education_level TEXT,
-            url TEXT,
-            publication_date TIMESTAMP,
-            found_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (municipality_id) REFERENCES municipalities (id)
-        )
-        ''')
-        
-        # Maak scrape_results tabel
-        await db.execute('''
-        CREATE TABLE IF NOT EXISTS scrape_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            municipality_name TEXT NOT NULL,
-            success INTEGER NOT NULL,
-            error_message TEXT,
-            urls_found TEXT,
-            last_scraped TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            total_vacancies INTEGER DEFAULT 0
-        )
-        ''')
-        
+        await create_base_tables(db)
         await db.commit()
+        
+        # Versioned migraties (indexes, schema fixes) bovenop de basis tabellen
+        await migrate(db)
         logger.info("Database tabellen succesvol aangemaakt")
         
     except Exception as e:
@@ -367,12 +195,25 @@ async def startup_event():
         
         # Importeer gemeenten uit CSV
         await import_municipalities_from_csv()
-        logger.info("Gemeenten geïmporteerd uit CSV")
+        
+        # Open de lees-connecties voor de API handlers
+        await open_read_pool()
+        
+        # Start de process pool voor het parsen van pagina's
+        start_parse_pool()
         
     except Exception as e:
         logger.error(f"Fout bij startup: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop de parse pool en sluit de lees-connecties"""
+    await crawl_runs.shutdown()
+    shutdown_parse_pool()
+    progress_events.close()
+    await close_read_pool()
+
 def load_municipalities():
     """Laad gemeenten uit de database"""
     db_path = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
@@ -395,475 +236,716 @@ def load_municipalities():
         last_success=datetime.fromisoformat(row[9]) if row[9] else None
     ) for row in rows]
 
+def save_municipalities(municipalities: List[Municipality]):
+    """Sla gemeenten in bulk op (één connectie, één transactie)"""
+    db_path = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO municipalities 
+                (id, name, latitude, longitude, website, vacancy_url, enabled, last_scraped)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                municipality.id,
+                municipality.name,
+                municipality.latitude,
+                municipality.longitude,
+                municipality.website,
+                municipality.vacancy_url,
+                municipality.enabled,
+                municipality.last_scraped.isoformat() if municipality.last_scraped else None
+            ) for municipality in municipalities])
+            conn.execute(REFRESH_MUNICIPALITY_TOTALS_SQL)
+    finally:
+        conn.close()
+
 def save_municipality(municipality: Municipality):
     """Sla een gemeente op in de database"""
+    save_municipalities([municipality])
+
+def save_vacancies(vacancies: List[Vacancy]):
+    """Sla vacatures in bulk op (één connectie, één transactie)"""
     db_path = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
     conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('''
-        INSERT OR REPLACE INTO municipalities 
-        (id, name, latitude, longitude, website, vacancy_url, enabled, last_scraped)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        municipality.id,
-        municipality.name,
-        municipality.latitude,
-        municipality.longitude,
-        municipality.website,
-        municipality.vacancy_url,
-        municipality.enabled,
-        municipality.last_scraped.isoformat() if municipality.last_scraped else None
-    ))
-    conn.commit()
-    conn.close()
+    try:
+        with conn:
+            conn.executemany('''
+                INSERT INTO vacancies 
+                (title, municipality_id, description, function_category, education_level, url, url_key, publication_date,
+                 first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT (municipality_id, url_key) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    function_category = excluded.function_category,
+                    education_level = excluded.education_level,
+                    url = excluded.url,
+                    publication_date = excluded.publication_date,
+                    last_seen = excluded.last_seen
+            ''', [(
+                vacancy.title,
+                vacancy.municipality_id,
+                vacancy.description,
+                vacancy.function_category,
+                vacancy.education_level,
+                vacancy.url,
+                vacancy_key(vacancy.url),
+                vacancy.publication_date.isoformat() if vacancy.publication_date else None
+            ) for vacancy in vacancies])
+    finally:
+        conn.close()
 
 def save_vacancy(vacancy: Vacancy):
     """Sla een vacature op in de database"""
-    db_path = os.path.join(os.path.dirname(__file__), 'data', 'scraper.db')
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('''
-        INSERT OR REPLACE INTO vacancies 
-        (title, municipality_id, description, function_category, education_level, url, publication_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        vacancy.title,
-        vacancy.municipality_id,
-        vacancy.description,
-        vacancy.function_category,
-        vacancy.education_level,
-        vacancy.url,
-        vacancy.publication_date.isoformat() if vacancy.publication_date else None
-    ))
-    conn.commit()
-    conn.close()
+    save_vacancies([vacancy])
 
-async def save_scrape_result(db, municipality_id: int, success: bool, error_message: str = None, urls_found: int = 0):
-    """Sla een scrape resultaat op in de database"""
+def save_scrape_result(writer: DatabaseWriter, municipality_id: int, success: bool, error_message: str = None, urls_found: int = 0):
+    """Sla een scrape resultaat op via de writer (gecommit in de volgende group commit)"""
     # Sla het resultaat op
-    await db.execute('''
+    writer.submit('''
         INSERT INTO scrape_results (municipality_id, success, error_message, urls_found)
         VALUES (?, ?, ?, ?)
     ''', (municipality_id, success, error_message, urls_found))
     
-    # Update de gemeente statistieken
-    if success:
-        await db.execute('''
-            UPDATE municipalities 
-            SET last_success = CURRENT_TIMESTAMP,
-                success_rate = (
-                    SELECT CAST(SUM(CASE WHEN success THEN 1 ELSE 0 END) AS FLOAT) / COUNT(*) * 100
-                    FROM scrape_results
-                    WHERE municipality_id = ?
-                )
-            WHERE id = ?
-        ''', (municipality_id, municipality_id))
-    
-    await db.commit()
+    # De trigger op scrape_results heeft de tellers in municipality_stats al
+    # bijgewerkt; success_rate volgt daaruit zonder de historie te aggregeren
+    writer.submit(SUCCESS_RATE_SQL, (municipality_id, municipality_id))
 
 # Voeg deze functie toe om de database te vullen met meer gemeenten
 async def add_more_municipalities(db):
-    """Voeg meer gemeenten toe aan de database"""
-    # Hier kunnen we later meer gemeenten toevoegen
-    # Voor nu gebruiken we de bestaande lijst
-    for municipality in MUNICIPALITIES:
+    """Voeg de gemeenten uit het register toe aan de database"""
+    for municipality in registry.all():
         await db.execute('''
             INSERT OR REPLACE INTO municipalities 
             (id, name, latitude, longitude, website, vacancy_url, enabled)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
-            municipality["id"],
-            municipality["name"],
-            municipality["latitude"],
-            municipality["longitude"],
-            municipality["website"],
-            municipality["vacancy_url"],
-            municipality["enabled"]
+            municipality.id,
+            municipality.name,
+            municipality.latitude,
+            municipality.longitude,
+            municipality.website,
+            municipality.vacancy_url,
+            True
         ))
+    await db.execute(REFRESH_MUNICIPALITY_TOTALS_SQL)
     await db.commit()
 
-# Globale variabelen voor statistieken
-scrape_results: List[ScrapeResult] = []
-last_scrape_time: Optional[datetime] = None
-
 # Voeg deze functie toe na de andere load/save functies
 def load_vacancies():
     """Laad vacatures uit de database"""
     conn = sqlite3.connect('scraper.db')
     c = conn.cursor()
-    c.execute('''SELECT v.*, m.name as municipality_name 
-                 FROM vacancies v 
-                 JOIN municipalities m ON v.municipality_id = m.id''')
+    c.execute(VACANCIES_SQL)
     rows = c.fetchall()
     conn.close()
     
-    vacancies = []
-    for row in rows:
-        vacancies.append({
-            "id": row[0],
-            "municipality_id": row[1],
-            "title": row[2],
-            "description": row[3],
-            "function_category": row[4],
-            "education_level": row[5],
-            "url": row[6],
-            "publication_date": row[7],
-            "found_date": row[8],
-            "created_at": row[9],
-            "municipality_name": row[10]
-        })
-    return vacancies
+    return [dict(zip(VACANCY_COLUMNS, row)) for row in rows]
 
 # Scraping functies
-async def scrape_municipality(municipality_id: int) -> dict:
+async def fetch_vacancy_page(client: CrawlHttpClient, url: str, cache: Optional[ValidatorCache] = None, full: bool = False,
+                             keywords: Optional[Tuple[str, ...]] = None, timings: Optional[CrawlTimings] = None,
+                             adapter: Optional[SiteAdapter] = None) -> dict:
     """
-    Scrape vacatures voor een specifieke gemeente
-    Returns dict met resultaten
+    Haal een vacaturepagina op en zoek de vacature links.
+    Met een ValidatorCache wordt een conditional request gedaan; bij een 304
+    wordt niet geparsed en bevat het resultaat alleen "not_modified": True.
+    Is de body gelijk aan die van de vorige run, dan wordt ook niet geparsed
+    en bevat het resultaat "unchanged": True. Met full=True wordt de pagina
+    altijd volledig opgehaald en geparsed. `keywords` vervangt de standaard
+    vacature keywords (zie municipalities.vacancy_keywords). Met `timings`
+    wordt de fetch- en parsetijd bij de run opgeteld. Met een site `adapter`
+    parst die de pagina of feed in plaats van de generieke heuristiek.
+    """
+    headers = cache.request_headers(url) if cache and not full else {}
+    started = time.monotonic()
+    response = await client.get(url, headers=headers)
+    fetch_seconds = time.monotonic() - started
+    if timings:
+        timings.record_fetch(fetch_seconds)
+    
+    if response.status_code == 304 and cache:
+        cache.record_not_modified(url, fetch_seconds)
+        return {"current_url": str(response.url), "not_modified": True}
+    
+    response.raise_for_status()
+    current_url = str(response.url)
+    
+    # Hashen en parsen gebeurt in de process pool, zodat de event loop vrij blijft
+    previous_hash = cache.previous_hash(url) if cache and not full else None
+    started = time.monotonic()
+    page = await run_process_page(
+        response.content, response.encoding, current_url, previous_hash, keywords,
+        response.headers.get("Content-Type"), adapter
+    )
+    if timings:
+        timings.record_parse(time.monotonic() - started)
+    if cache:
+        cache.record_response(url, response, fetch_seconds, page["content_hash"])
+    if page.get("unchanged"):
+        return {"current_url": current_url, "unchanged": True}
+    
+    for vacancy in page["vacancy_links"]:
+        logger.debug(f"Gevonden vacature link op {current_url}: {vacancy['title']} ({vacancy['url']})")
+    logger.info(f"{len(page['vacancy_links'])} vacature links gevonden op {current_url}")
+    return {
+        "current_url": current_url,
+        "vacancy_links": page["vacancy_links"],
+        "next_pages": page.get("next_pages", []),
+        "complete": page.get("complete", False),
+        "bytes": len(response.content)
+    }
+
+async def fetch_vacancy_listing(client: CrawlHttpClient, url: str, cache: Optional[ValidatorCache] = None, full: bool = False,
+                                keywords: Optional[Tuple[str, ...]] = None, timings: Optional[CrawlTimings] = None) -> dict:
+    """
+    Haal de vacatures van een vacancy_url op. Heeft de host een site adapter
+    (zie app/adapters), dan leest die de site of de feed van het ATS
+    platform; faalt de adapter of vindt hij niets, dan volgt de generieke
+    heuristiek op de vacancy_url zelf.
+    """
+    adapter = adapters.for_url(url)
+    if adapter is not None:
+        try:
+            feed_url = adapter.feed_url(url)
+            listing = await _fetch_listing(client, feed_url, cache, full, keywords, timings, adapter)
+            if listing.get("not_modified") or listing.get("unchanged") or listing["vacancy_links"]:
+                listing["adapter"] = adapter.name
+                return listing
+            logger.info(f"Site adapter {adapter.name} vond geen vacatures op {feed_url}, gebruik de generieke heuristiek")
+        except Exception as e:
+            feed_url = None
+            logger.warning(f"Site adapter {adapter.name} mislukt voor {url}: {str(e)}, gebruik de generieke heuristiek")
+        # Heeft de adapter dezelfde URL al opgehaald, dan zou een conditional request nu "ongewijzigd" zeggen
+        full = full or feed_url == url
+    return await _fetch_listing(client, url, cache, full, keywords, timings)
+
+async def _fetch_listing(client: CrawlHttpClient, url: str, cache: Optional[ValidatorCache], full: bool,
+                         keywords: Optional[Tuple[str, ...]], timings: Optional[CrawlTimings],
+                         adapter: Optional[SiteAdapter] = None) -> dict:
+    """
+    Haal een vacaturepagina op en volg de paginering (rel=next, genummerde
+    pagina's, "meer laden" en JSON endpoints) binnen het budget per pagina.
+    De vervolgpagina's van één golf worden tegelijk opgehaald. Is de eerste
+    pagina ongewijzigd (304 of dezelfde hash), dan worden de vervolgpagina's
+    niet opgehaald; anders altijd volledig, zodat een ongewijzigde tussenpagina
+    de rest van de lijst niet verbergt.
+    """
+    first = await fetch_vacancy_page(client, url, cache, full=full, keywords=keywords, timings=timings, adapter=adapter)
+    if first.get("not_modified") or first.get("unchanged"):
+        return first
+    
+    listing = ListingCrawl(url, first)
+    while True:
+        batch = listing.next_batch()
+        if not batch:
+            break
+        pages = await asyncio.gather(*(
+            fetch_vacancy_page(client, next_url, full=True, keywords=keywords, timings=timings, adapter=adapter)
+            for next_url in batch
+        ), return_exceptions=True)
+        for next_url, page in zip(batch, pages):
+            if isinstance(page, Exception):
+                logger.warning(f"Kon vervolgpagina {next_url} niet ophalen: {str(page)}")
+            listing.add(page)
+    
+    result = listing.result()
+    if listing.pages > 1:
+        logger.info(
+            f"{len(result['vacancy_links'])} vacature links op {listing.pages} pagina's van {url} "
+            f"({listing.bytes} bytes, {listing.over_budget} pagina's buiten het budget)"
+        )
+    return result
+
+def store_vacancies(writer: DatabaseWriter, municipality_id, name: str, vacancy_links: List[dict],
+                    details: Optional[DetailStage] = None, listing_url: Optional[str] = None, complete: bool = False):
+    """
+    Sla gevonden vacatures op en werk de status van de gemeente bij.
+    Alles gaat als commando's naar de writer, die ze samen met de writes van
+    andere workers in één transactie commit. Met een DetailStage worden de
+    links ook aangeboden voor het ophalen van hun detailpagina, behalve als
+    een site adapter de velden al volledig uit een feed haalde (`complete`).
     """
-    db = None
+    rows = [
+        (municipality_id, vacancy['title'] or "Vacature bij " + name, vacancy['url'], vacancy_key(vacancy['url']))
+        for vacancy in vacancy_links
+    ]
+    writer.submit_many(VACANCY_UPSERT_SQL, rows)
+    writer.submit_many(DETAIL_UPDATE_SQL, listing_detail_rows(municipality_id, vacancy_links, complete))
+    if details is not None and not complete:
+        details.submit(municipality_id, [{"url": row[2], "title": row[1]} for row in rows], listing_url)
+    
+    # Update gemeente status
+    writer.submit('''
+        UPDATE municipalities 
+        SET last_scraped = CURRENT_TIMESTAMP,
+            last_success = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (municipality_id,))
+    
+    # Sla scrape resultaat op
+    save_scrape_result(writer, municipality_id, True, urls_found=len(vacancy_links))
+
+async def _scrape_group_member(writer: DatabaseWriter, client: CrawlHttpClient, municipality: dict, page: Optional[dict],
+                               fetch_error: Optional[Exception], cache: Optional[ValidatorCache] = None,
+                               timings: Optional[CrawlTimings] = None, details: Optional[DetailStage] = None) -> dict:
+    """
+    Verwerk één gemeente uit een CrawlGroup. `page` is de gedeelde, al geparste
+    vacaturepagina; als die niet opgehaald kon worden valt de gemeente terug op
+    haar eigen website.
+    """
+    municipality_id = municipality['id']
+    name = municipality['name']
+    website = municipality.get('website')
+    pages_fetched = 0
+    
     try:
-        db = await get_db()
-        
-        # Haal gemeente informatie op
-        async with db.execute('SELECT name, website, vacancy_url FROM municipalities WHERE id = ?', (municipality_id,)) as cursor:
-            result = await cursor.fetchone()
-            if not result:
-                return {"success": False, "error": f"Gemeente met ID {municipality_id} niet gevonden"}
-            
-        name, website, vacancy_url = result
-        
-        if not vacancy_url:
+        if not municipality.get('vacancy_url'):
             error_msg = f"Geen vacancy_url geconfigureerd voor {name}"
             logger.error(error_msg)
-            await save_scrape_result(db, municipality_id, False, error_msg)
-            return {"success": False, "error": error_msg}
+            save_scrape_result(writer, municipality_id, False, error_msg)
+            return {"success": False, "error": error_msg, "pages_fetched": pages_fetched}
         
-        logger.info(f"Start scraping voor {name} ({vacancy_url})")
+        if page is None:
+            logger.warning(f"Kon vacancy_url niet bereiken voor {name}: {str(fetch_error)}")
+            if website:
+                try:
+                    logger.info(f"Probeer algemene website voor {name}: {website}")
+                    pages_fetched += 1
+                    page = await fetch_vacancy_page(
+                        client, website, cache,
+                        full=not municipality.get('last_scraped'),
+                        keywords=parse_keywords(municipality.get('vacancy_keywords')),
+                        timings=timings
+                    )
+                except Exception as e2:
+                    error_msg = f"Kon zowel vacancy_url als website niet bereiken voor {name}: {str(e2)}"
+                    logger.error(error_msg)
+                    save_scrape_result(writer, municipality_id, False, error_msg)
+                    return {"success": False, "error": error_msg, "pages_fetched": pages_fetched}
+            else:
+                error_msg = f"Kon vacancy_url niet bereiken en geen alternatieve website voor {name}: {str(fetch_error)}"
+                logger.error(error_msg)
+                save_scrape_result(writer, municipality_id, False, error_msg)
+                return {"success": False, "error": error_msg, "pages_fetched": pages_fetched}
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        if page.get('not_modified'):
+            # 304: pagina ongewijzigd sinds de vorige run, niets te parsen of op te slaan
+            logger.info(f"Vacaturepagina van {name} ongewijzigd (304)")
+            return {
+                "success": True,
+                "municipality": name,
+                "not_modified": True,
+                "vacancies_found": 0,
+                "pages_fetched": pages_fetched
             }
-            
-            # Probeer eerst de vacancy_url
-            try:
-                response = await client.get(vacancy_url, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                current_url = str(response.url)
-            except Exception as e:
-                logger.warning(f"Kon vacancy_url niet bereiken voor {name}: {str(e)}")
-                if website:
-                    try:
-                        logger.info(f"Probeer algemene website voor {name}: {website}")
-                        response = await client.get(website, headers=headers, timeout=30.0)
-                        response.raise_for_status()
-                        current_url = str(response.url)
-                    except Exception as e2:
-                        error_msg = f"Kon zowel vacancy_url als website niet bereiken voor {name}: {str(e2)}"
-                        logger.error(error_msg)
-                        await save_scrape_result(db, municipality_id, False, error_msg)
-                        return {"success": False, "error": error_msg}
-                else:
-                    error_msg = f"Kon vacancy_url niet bereiken en geen alternatieve website voor {name}: {str(e)}"
-                    logger.error(error_msg)
-                    await save_scrape_result(db, municipality_id, False, error_msg)
-                    return {"success": False, "error": error_msg}
-            
-            # Parse de HTML en zoek vacature links
-            soup = BeautifulSoup(response.text, 'html.parser')
-            vacancy_links = []
-            
-            # Zoek naar links die mogelijk naar vacatures verwijzen
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                # Maak relatieve URLs absoluut
-                if href.startswith('/'):
-                    href = current_url.rstrip('/') + '/' + href.lstrip('/')
-                elif not href.startswith(('http://', 'https://')):
-                    href = current_url.rstrip('/') + '/' + href.lstrip('/')
-                
-                # Check of de link waarschijnlijk naar een vacature verwijst
-                if any(keyword in href.lower() for keyword in ['vacature', 'vacancy', 'werken-bij', 'werkenbij', 'jobs', 'careers']):
-                    title = link.get_text(strip=True)
-                    if not title:
-                        title = "Vacature bij " + name
-                    
-                    logger.info(f"[{name}] Gevonden vacature link: {title} ({href})")
-                    vacancy_links.append({
-                        'url': href,
-                        'title': title
-                    })
-            
-            # Als we geen vacatures vinden, probeer dieper te zoeken
-            if not vacancy_links:
-                logger.info(f"Geen directe vacature links gevonden voor {name}, zoek in tekst")
-                for text in soup.stripped_strings:
-                    if any(keyword in text.lower() for keyword in ['vacature', 'vacancy', 'sollicitatie', 'werken bij']):
-                        title = text[:100]  # Neem eerste 100 karakters als titel
-                        vacancy_links.append({
-                            'url': current_url,
-                            'title': title
-                        })
-            
-            # Sla gevonden vacatures op
-            for vacancy in vacancy_links:
-                try:
-                    await db.execute('''
-                        INSERT OR REPLACE INTO vacancies 
-                        (municipality_id, title, url, found_date)
-                        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                    ''', (municipality_id, vacancy['title'], vacancy['url']))
-                except Exception as e:
-                    logger.error(f"Fout bij opslaan vacature voor {name}: {str(e)}")
-            
-            # Update gemeente status
-            await db.execute('''
-                UPDATE municipalities 
-                SET last_scraped = CURRENT_TIMESTAMP,
-                    last_success = CURRENT_TIMESTAMP
-                WHERE id = ?
+        
+        if page.get('unchanged'):
+            # Zelfde content hash als de vorige run: alleen last_scraped bijwerken
+            writer.submit('''
+                UPDATE municipalities SET last_scraped = CURRENT_TIMESTAMP WHERE id = ?
             ''', (municipality_id,))
-            
-            # Sla scrape resultaat op
-            await save_scrape_result(db, municipality_id, True, urls_found=len(vacancy_links))
-            await db.commit()
-            
-            logger.info(f"Scraping voltooid voor {name}: {len(vacancy_links)} vacatures gevonden")
+            logger.info(f"Vacaturepagina van {name} inhoudelijk ongewijzigd")
             return {
                 "success": True,
                 "municipality": name,
-                "vacancies_found": len(vacancy_links)
+                "unchanged": True,
+                "vacancies_found": 0,
+                "pages_fetched": pages_fetched
             }
-            
+        
+        vacancy_links = page['vacancy_links']
+        store_vacancies(writer, municipality_id, name, vacancy_links, details, page.get('current_url'), page.get('complete', False))
+        
+        logger.info(f"Scraping voltooid voor {name}: {len(vacancy_links)} vacatures gevonden")
+        return {
+            "success": True,
+            "municipality": name,
+            "vacancies_found": len(vacancy_links),
+            "pages_fetched": pages_fetched
+        }
+        
     except Exception as e:
         error_msg = f"Onverwachte fout bij scrapen van {name}: {str(e)}"
         logger.error(error_msg)
-        if db:
-            await save_scrape_result(db, municipality_id, False, error_msg)
-        return {"success": False, "error": error_msg}
-    
-    finally:
-        if db:
-            try:
-                await db.close()
-            except Exception as e:
-                logger.error(f"Fout bij sluiten database connectie: {str(e)}")
+        try:
+            save_scrape_result(writer, municipality_id, False, error_msg)
+        except Exception as e2:
+            logger.error(f"Fout bij opslaan scrape resultaat voor {name}: {str(e2)}")
+        return {"success": False, "error": error_msg, "pages_fetched": pages_fetched}
 
-@app.post("/api/scrape")
-async def start_scraping(background_tasks: BackgroundTasks):
-    """Start het scrapen van alle gemeenten"""
-    global scraping_progress
+async def scrape_group(group: CrawlGroup, client: CrawlHttpClient, writer: DatabaseWriter,
+                       cache: Optional[ValidatorCache] = None, timings: Optional[CrawlTimings] = None,
+                       details: Optional[DetailStage] = None) -> List[dict]:
+    """
+    Scrape een groep gemeenten die dezelfde vacancy_url delen: de pagina wordt
+    één keer opgehaald en geparsed en de resultaten gaan naar elke gemeente.
+    Nieuwe vacature links gaan naar de DetailStage (als die er is).
+    Returns een result dict per gemeente
+    """
+    page = None
+    fetch_error = None
+    pages_fetched = 0
     
-    # Reset voortgang
-    scraping_progress = {
-        "total": 0,
-        "current": 0,
-        "status": "starting"
-    }
+    if group.url:
+        vacancy_url = group.municipalities[0]['vacancy_url']
+        names = ", ".join(m['name'] for m in group.municipalities)
+        logger.info(f"Start scraping voor {names} ({vacancy_url})")
+        # Een gemeente die nog nooit gescraped is heeft de volledige pagina nodig
+        full = any(not m.get('last_scraped') for m in group.municipalities)
+        try:
+            pages_fetched += 1
+            page = await fetch_vacancy_listing(client, vacancy_url, cache, full=full, keywords=group.keywords, timings=timings)
+            pages_fetched += page.get("pages_fetched", 1) - 1
+        except Exception as e:
+            fetch_error = e
     
-    try:
-        # Start scraping in de achtergrond
-        background_tasks.add_task(scrape_all_municipalities)
-        return {"message": "Scraping started"}
-    except Exception as e:
-        logger.error(f"Fout bij starten scraping: {e}")
-        scraping_progress["status"] = "error"
-        return {"error": str(e)}
+    results = []
+    for index, municipality in enumerate(group.municipalities):
+        result = await _scrape_group_member(writer, client, municipality, page, fetch_error, cache, timings, details)
+        result.setdefault("municipality_id", municipality['id'])
+        result.setdefault("municipality", municipality['name'])
+        if index == 0:
+            result["pages_fetched"] += pages_fetched
+        elif page is not None:
+            # Deze gemeente hergebruikt de pagina van de eerste gemeente in de groep
+            result["fetch_shared"] = True
+        results.append(result)
+    return results
 
-async def scrape_all_municipalities():
+async def scrape_municipality(municipality_id: int, client: Optional[CrawlHttpClient] = None) -> dict:
     """
-    Start het scrapen van alle gemeenten
+    Scrape vacatures voor een specifieke gemeente
+    Returns dict met resultaten
     """
-    global scraping_progress
-    global last_scrape_time
+    async with read_db() as db:
+        async with db.execute('SELECT id, name, website, vacancy_url, vacancy_keywords FROM municipalities WHERE id = ?', (municipality_id,)) as cursor:
+            row = await cursor.fetchone()
     
+    if not row:
+        return {"success": False, "error": f"Gemeente met ID {municipality_id} niet gevonden"}
+    
+    municipality = {"id": row[0], "name": row[1], "website": row[2], "vacancy_url": row[3], "vacancy_keywords": row[4]}
+    group = plan_crawl([municipality])[0]
+    
+    # Gebruik de gedeelde client van de crawl run, of een eigen client bij losse aanroepen
+    async with (nullcontext(client) if client is not None else CrawlHttpClient()) as client, DatabaseWriter(get_db, on_commit=response_cache.invalidate) as writer:
+        return (await scrape_group(group, client, writer))[0]
+
+def start_crawl_run(trigger: str, queue: bool = False) -> CrawlRun:
+    """Start een crawl van alle gemeenten als run; 409 als er al een run actief is (tenzij queue)"""
     try:
-        # Reset voortgang
-        scraping_progress = {
-            "total": 0,
-            "current": 0,
-            "status": "starting"
-        }
-        
-        db = await get_db()
-        async with db.execute('SELECT id FROM municipalities WHERE enabled = 1') as cursor:
+        return crawl_runs.start(crawl_all_municipalities, trigger, queue=queue)
+    except RunActiveError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "run_id": e.run.id})
+
+@app.post("/api/scrape")
+async def start_scraping(queue: bool = False):
+    """Start het scrapen van alle gemeenten"""
+    run = start_crawl_run("api", queue)
+    return {
+        "message": "Scraping started" if run.status == "running" else "Scraping queued",
+        "run_id": run.id,
+        "status": run.status
+    }
+
+async def scrape_all_municipalities() -> dict:
+    """
+    Scrape alle gemeenten als crawl run en wacht tot die klaar is. Draait er
+    al een run, dan wordt deze erachter gezet. Returns de afgeronde run
+    """
+    run = crawl_runs.start(crawl_all_municipalities, "direct", queue=True)
+    await crawl_runs.wait(run)
+    return run.as_dict()
+
+async def crawl_all_municipalities(run: CrawlRun):
+    """
+    Scrape alle gemeenten binnen een crawl run (gestart via crawl_runs).
+    Voortgang en tijdsverdeling komen op het run object; fouten handelt de
+    run manager af.
+    """
+    async with read_db() as db:
+        async with db.execute('''
+            SELECT id, name, website, vacancy_url, last_scraped, vacancy_keywords
+            FROM municipalities WHERE enabled = 1
+        ''') as cursor:
             rows = await cursor.fetchall()
-            municipality_ids = [row[0] for row in rows]
-        await db.close()
-        
-        # Update voortgang
-        scraping_progress.update({
-            "total": len(municipality_ids),
-            "current": 0,
-            "status": "running"
+            municipalities = [
+                {"id": row[0], "name": row[1], "website": row[2], "vacancy_url": row[3],
+                 "last_scraped": row[4], "vacancy_keywords": row[5]}
+                for row in rows
+            ]
+        validator_cache = await ValidatorCache.load(db)
+    
+    # Update voortgang
+    run.update(total=len(municipalities), current=0, successful=0, failed=0, vacancies_found=0)
+    
+    logger.info(f"Start scraping voor {len(municipalities)} gemeenten (run {run.id})")
+    
+    # Verdeel de gemeenten over een vaste pool van workers; zodra een worker
+    # klaar is pakt hij direct de volgende gemeente op
+    def on_result(result: dict):
+        success = result.get('success', False)
+        progress = run.progress
+        progress["current"] += 1
+        progress["successful" if success else "failed"] += 1
+        progress["vacancies_found"] += result.get('vacancies_found', 0) if success else 0
+        progress["last_municipality"] = result.get('municipality')
+        progress["writer"] = writer.stats.as_dict()
+        progress["details"] = details.stats.as_dict()
+        progress_events.publish("municipality", {
+            "run_id": run.id,
+            "municipality_id": result.get('municipality_id'),
+            "municipality": result.get('municipality'),
+            "success": success,
+            "vacancies_found": result.get('vacancies_found', 0),
+            "not_modified": result.get('not_modified', False),
+            "unchanged": result.get('unchanged', False),
+            "error": result.get('error'),
         })
+        run.publish()
+    
+    # Gemeenten met dezelfde vacancy_url worden één keer opgehaald en geparsed
+    plan = plan_crawl(municipalities)
+    logger.info(f"Crawl plan: {len(plan)} unieke pagina's voor {len(municipalities)} gemeenten")
+    
+    # Eén gedeelde HTTP client voor de hele run, zodat verbindingen naar
+    # dezelfde host (regionale vacaturesites) hergebruikt worden. Alle writes
+    # gaan via één DatabaseWriter, de enige schrijvende connectie van de run.
+    timings = CrawlTimings()
+    async with CrawlHttpClient() as client, DatabaseWriter(get_db, on_commit=response_cache.invalidate) as writer:
+        # success_count/error_count in /api/stats gelden voor de laatste run
+        writer.submit(RESET_RUN_COUNTS_SQL)
+        async with read_db() as db:
+            details = await DetailStage.load(db, client, writer, validator_cache)
+        scheduler = CrawlScheduler(
+            lambda group: scrape_group(group, client, writer, validator_cache, timings, details),
+            CRAWL_CONCURRENCY,
+            on_result=on_result
+        )
+        # De detailpagina's worden met eigen workers opgehaald terwijl de
+        # vacaturepagina's nog lopen; bij het verlaten wordt de rest afgewerkt
+        async with details:
+            await scheduler.run(plan)
         
-        logger.info(f"Start scraping voor {len(municipality_ids)} gemeenten")
-        
-        # Maak batches van 5 gemeenten om tegelijk te scrapen
-        batch_size = 5
-        results = []
-        
-        for i in range(0, len(municipality_ids), batch_size):
-            batch = municipality_ids[i:i + batch_size]
-            batch_tasks = [scrape_municipality(mid) for mid in batch]
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # Filter en verwerk de resultaten
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Fout tijdens batch scraping: {str(result)}")
-                    results.append({"success": False, "error": str(result)})
-                else:
-                    results.append(result)
-            
-            # Update voortgang
-            scraping_progress["current"] = min(i + batch_size, len(municipality_ids))
-            
-            # Wacht kort tussen batches om servers niet te overbelasten
-            await asyncio.sleep(1)
-        
-        # Bereken statistieken
-        total = len(results)
-        successful = sum(1 for r in results if isinstance(r, dict) and r.get('success', False))
-        failed = total - successful
-        total_vacancies = sum(r.get('vacancies_found', 0) for r in results if isinstance(r, dict) and r.get('success', False))
-        
-        # Update voortgang naar voltooid
-        last_scrape_time = datetime.now()
-        scraping_progress = {
-            "status": "completed",
-            "total": total,
-            "current": total,
-            "successful_scrapes": successful,
-            "failed_scrapes": failed,
-            "total_vacancies": total_vacancies,
-            "last_scrape": last_scrape_time.isoformat()
-        }
-        
-        logger.info(f"Scraping voltooid: {successful} succesvol, {failed} gefaald, {total_vacancies} vacatures gevonden")
-        
-    except Exception as e:
-        logger.error(f"Fout tijdens scraping: {e}")
-        scraping_progress = {
-            "status": "error",
-            "error": str(e),
-            "total": len(municipality_ids) if 'municipality_ids' in locals() else 0,
-            "current": scraping_progress.get("current", 0)
-        }
-        raise
+        # Bewaar de ETag / Last-Modified validators voor de volgende run
+        validator_cache.save(writer)
+        await writer.flush()
+    
+    crawl_stats = scheduler.stats.as_dict()
+    crawl_stats["connections"] = client.stats.as_dict()
+    crawl_stats["politeness"] = client.limiter.stats.as_dict()
+    crawl_stats["conditional"] = validator_cache.stats.as_dict()
+    crawl_stats["writer"] = writer.stats.as_dict()
+    crawl_stats["details"] = details.stats.as_dict()
+    
+    # Tijdsverdeling van de run; fetch en parse tellen de tijd van alle workers op
+    run.timings = {
+        "elapsed_seconds": crawl_stats["elapsed_seconds"],
+        "queue_wait_seconds": crawl_stats["queue_wait_seconds"],
+        "max_queue_wait_seconds": crawl_stats["max_queue_wait_seconds"],
+        **timings.as_dict(),
+        "write_seconds": round(writer.stats.commit_seconds, 3),
+        "commits": writer.stats.commits,
+        "detail_fetch_seconds": crawl_stats["details"]["fetch_seconds"],
+        "detail_parse_seconds": crawl_stats["details"]["parse_seconds"],
+    }
+    
+    # Update voortgang naar voltooid
+    run.update(last_scrape=datetime.now().isoformat(), writer=crawl_stats["writer"], details=crawl_stats["details"],
+               throughput=crawl_stats)
+    progress = run.progress
+    
+    logger.info(
+        f"Scraping voltooid: {progress['successful']} succesvol, {progress['failed']} gefaald, "
+        f"{progress['vacancies_found']} vacatures gevonden"
+    )
+    logger.info(
+        f"Doorvoer: {crawl_stats['municipalities_per_second']} gemeenten/s, "
+        f"{crawl_stats['pages_per_second']} pagina's/s in {crawl_stats['elapsed_seconds']}s "
+        f"(concurrency {CRAWL_CONCURRENCY}), {crawl_stats['fetches_avoided']} fetches bespaard door deduplicatie"
+    )
+    logger.info(
+        f"Verbindingen: {crawl_stats['connections']['requests']} requests, "
+        f"{crawl_stats['connections']['new_connections']} nieuw, "
+        f"{crawl_stats['connections']['reused_connections']} hergebruikt"
+    )
+    logger.info(
+        f"Hosts: {crawl_stats['politeness']['hosts']}, "
+        f"{crawl_stats['politeness']['throttled_responses']} keer afgeremd (429/503), "
+        f"{crawl_stats['politeness']['wait_seconds']}s gewacht op rate limits"
+    )
+    logger.info(
+        f"Conditional requests: {crawl_stats['conditional']['not_modified']} keer 304, "
+        f"{crawl_stats['conditional']['unchanged']} pagina's met ongewijzigde inhoud, "
+        f"{crawl_stats['conditional']['bytes_saved']} bytes en "
+        f"{crawl_stats['conditional']['seconds_saved']}s bespaard"
+    )
+    logger.info(
+        f"Database: {crawl_stats['writer']['rows_written']} rijen in "
+        f"{crawl_stats['writer']['commits']} commits, {crawl_stats['writer']['rows_per_second']} rijen/s, "
+        f"commit latency gem. {crawl_stats['writer']['avg_commit_ms']}ms / max {crawl_stats['writer']['max_commit_ms']}ms, "
+        f"max queue diepte {crawl_stats['writer']['max_queue_depth']}"
+    )
+    logger.info(
+        f"Detailpagina's: {crawl_stats['details']['fetched']} opgehaald van {crawl_stats['details']['queued']} "
+        f"in de wachtrij ({crawl_stats['details']['offered']} links aangeboden), "
+        f"{crawl_stats['details']['json_ld']} met JobPosting JSON-LD, "
+        f"{crawl_stats['details']['not_modified']} keer 304, {crawl_stats['details']['unchanged']} ongewijzigd, "
+        f"{crawl_stats['details']['failed']} mislukt, {crawl_stats['details']['over_budget']} over het budget"
+    )
+    logger.info(
+        f"Tijdsverdeling: wachtrij {run.timings['queue_wait_seconds']}s, fetch {run.timings['fetch_seconds']}s, "
+        f"parse {run.timings['parse_seconds']}s, write {run.timings['write_seconds']}s "
+        f"(totaal {run.timings['elapsed_seconds']}s)"
+    )
 
 # API endpoints
 @app.get("/api/municipalities")
-async def get_municipalities():
+async def get_municipalities(request: Request):
     """Krijg alle gemeenten"""
-    db = await get_db()
-    try:
-        async with db.execute('SELECT * FROM municipalities') as cursor:
-            rows = await cursor.fetchall()
-            result = []
-            for row in rows:
-                result.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "latitude": row[2],
-                    "longitude": row[3],
-                    "website": row[4],
-                    "vacancy_url": row[5],
-                    "enabled": row[6],
-                    "last_scraped": row[7],
-                    "success_rate": row[8],
-                    "last_success": row[9]
-                })
-            return result
-    finally:
-        await db.close()
+    async def load():
+        async with read_db() as db:
+            async with db.execute('SELECT * FROM municipalities') as cursor:
+                rows = await cursor.fetchall()
+                result = []
+                for row in rows:
+                    result.append({
+                        "id": row[0],
+                        "name": row[1],
+                        "latitude": row[2],
+                        "longitude": row[3],
+                        "website": row[4],
+                        "vacancy_url": row[5],
+                        "enabled": row[6],
+                        "last_scraped": row[7],
+                        "success_rate": row[8],
+                        "last_success": row[9]
+                    })
+                return result
+    
+    return await response_cache.respond(request, load)
 
 @app.get("/api/vacancies")
-async def get_vacancies():
-    """Krijg alle vacatures"""
-    db = await get_db()
+async def get_vacancies(
+    request: Request,
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    municipality_id: Optional[str] = None,
+    function_category: Optional[str] = None,
+    education_level: Optional[str] = None,
+    found_from: Optional[date] = None,
+    found_to: Optional[date] = None,
+):
+    """
+    Krijg een pagina vacatures, nieuwste eerst. Geef `next_cursor` uit het
+    antwoord mee als `cursor` voor de volgende pagina; `null` betekent dat er
+    geen volgende pagina is. `found_from` en `found_to` zijn inclusief.
+    """
     try:
-        async with db.execute('''
-            SELECT v.*, m.name as municipality_name 
-            FROM vacancies v 
-            JOIN municipalities m ON v.municipality_id = m.id
-            ORDER BY v.found_date DESC
-        ''') as cursor:
-            rows = await cursor.fetchall()
-            
-        return [{
-            "id": row[0],
-            "municipality_id": row[1],
-            "title": row[2],
-            "description": row[3],
-            "function_category": row[4],
-            "education_level": row[5],
-            "url": row[6],
-            "publication_date": row[7],
-            "found_date": row[8],
-            "created_at": row[9],
-            "municipality_name": row[10]
-        } for row in rows]
-    finally:
-        await db.close()
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    sql, params = vacancy_page_query(
+        limit + 1,  # één extra rij om te weten of er nog een pagina is
+        cursor=after,
+        filters={
+            "municipality_id": municipality_id,
+            "function_category": function_category,
+            "education_level": education_level,
+        },
+        found_from=found_from.isoformat() if found_from else None,
+        found_before=(found_to + timedelta(days=1)).isoformat() if found_to else None,
+    )
+    
+    async def load():
+        async with read_db() as db:
+            async with db.execute(sql, params) as db_cursor:
+                rows = await db_cursor.fetchall()
+        
+        items = [dict(zip(VACANCY_COLUMNS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last["found_date"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+    
+    return await response_cache.respond(request, load)
+
+@app.get("/api/vacancies/export")
+async def export_all_vacancies(format: str = "ndjson", since: Optional[datetime] = None, gzip: bool = False):
+    """
+    Stream alle vacatures als NDJSON (standaard) of CSV, oplopend op
+    (last_seen, id). Met `since` alleen de vacatures die sindsdien gezien zijn;
+    gebruik voor een incrementele pull de hoogste last_seen van de vorige
+    export. Met `gzip=true` wordt de stream gecomprimeerd (Content-Encoding: gzip).
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Onbekend formaat: {format} (kies uit {', '.join(EXPORT_FORMATS)})")
+    
+    # SQLite timestamps zijn UTC in de vorm 'YYYY-MM-DD HH:MM:SS'
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    since_value = since.strftime('%Y-%m-%d %H:%M:%S') if since else None
+    
+    headers = {"Content-Disposition": f'attachment; filename="vacatures.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_vacancies(format, since_value, compress=gzip),
+        media_type=EXPORT_FORMATS[format],
+        headers=headers
+    )
+
+@app.get("/api/vacancies/summary")
+async def get_vacancy_summary(request: Request):
+    """Aantal vacatures per gemeente en de beschikbare filterwaarden"""
+    async def load():
+        async with read_db() as db:
+            async with db.execute(VACANCY_COUNTS_SQL) as cursor:
+                counts = {row[0]: row[1] for row in await cursor.fetchall()}
+            async with db.execute(FUNCTION_CATEGORIES_SQL) as cursor:
+                categories = [row[0] for row in await cursor.fetchall()]
+            async with db.execute(EDUCATION_LEVELS_SQL) as cursor:
+                education_levels = [row[0] for row in await cursor.fetchall()]
+    
+        return {
+            "counts": counts,
+            "function_categories": categories,
+            "education_levels": education_levels
+        }
+    
+    return await response_cache.respond(request, load)
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Krijg statistieken over scraping"""
-    db = await get_db()
-    try:
-        async with db.execute('''
-            SELECT 
-                COUNT(*) as total_municipalities,
-                SUM(CASE WHEN last_scraped IS NOT NULL THEN 1 ELSE 0 END) as scraped_count,
-                MAX(last_scraped) as last_scrape_time
-            FROM municipalities
-        ''') as cursor:
-            muni_stats = await cursor.fetchone()
-        
-        async with db.execute('SELECT COUNT(*) FROM vacancies') as cursor:
-            vacancy_count = (await cursor.fetchone())[0]
-            
-        async with db.execute('''
-            SELECT 
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as error_count
-            FROM scrape_results
-            WHERE scrape_date >= datetime('now', '-1 day')
-        ''') as cursor:
-            result_stats = await cursor.fetchone()
+    async def load():
+        # Eén rij uit global_stats; de crawl houdt die via triggers bij
+        async with read_db() as db:
+            async with db.execute(GLOBAL_STATS_SQL) as cursor:
+                row = await cursor.fetchone()
             
+        if row is None:
+            row = (0, 0, None, 0, 0, 0)
         return {
-            "total_municipalities": muni_stats[0],
-            "scraped_municipalities": muni_stats[1],
-            "last_scrape_time": muni_stats[2],
-            "total_vacancies": vacancy_count,
-            "success_count": result_stats[0] or 0,
-            "error_count": result_stats[1] or 0
+            "total_municipalities": row[0],
+            "scraped_municipalities": row[1],
+            "last_scrape_time": row[2],
+            "total_vacancies": row[3],
+            "success_count": row[4],
+            "error_count": row[5]
         }
-    finally:
-        await db.close()
+    
+    return await response_cache.respond(request, load)
 
 @app.get("/api/logs")
 async def get_logs():
     """Krijg de laatste scraping logs"""
-    db = await get_db()
-    try:
-        async with db.execute('''
-            SELECT 
-                sr.municipality_id,
-                m.name as municipality_name,
-                sr.success,
-                sr.error_message,
-                sr.urls_found,
-                sr.scrape_date
-            FROM scrape_results sr
-            JOIN municipalities m ON sr.municipality_id = m.id
-            ORDER BY sr.scrape_date DESC
-            LIMIT 50
-        ''') as cursor:
+    async with read_db() as db:
+        async with db.execute(LOGS_SQL) as cursor:
             rows = await cursor.fetchall()
             
         return [{
@@ -874,18 +956,12 @@ async def get_logs():
             "urls_found": row[4],
             "scrape_date": row[5]
         } for row in rows]
-    finally:
-        await db.close()
 
 @app.post("/admin/start-scraping")
-async def start_scraping(background_tasks: BackgroundTasks):
+async def start_scraping(queue: bool = False):
     """Start het scrapen van alle gemeenten"""
-    try:
-        # Start scraping in de achtergrond
-        background_tasks.add_task(scrape_all_municipalities)
-        return {"success": True}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    run = start_crawl_run("admin", queue)
+    return {"success": True, "run_id": run.id, "status": run.status}
 
 # Admin routes
 @app.get("/admin", response_class=HTMLResponse)
@@ -893,36 +969,52 @@ async def admin_page(request: Request):
     return templates.TemplateResponse("admin.html", {"request": request})
 
 @app.post("/api/admin/start-scraping")
-async def start_scraping():
-    try:
-        # Start het scrapen in de achtergrond
-        asyncio.create_task(scrape_all_municipalities())
-        return {"status": "success", "message": "Scraping gestart"}
-    except Exception as e:
-        logger.error(f"Fout bij starten scraping: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def start_scraping(queue: bool = False):
+    run = start_crawl_run("admin", queue)
+    return {
+        "status": "success",
+        "message": "Scraping gestart" if run.status == "running" else "Scraping in de wachtrij",
+        "run_id": run.id
+    }
 
 @app.get("/api/admin/status")
 async def get_scraping_status():
-    try:
-        async with aiosqlite.connect(DATABASE_URL) as db:
-            async with db.execute("SELECT COUNT(*) FROM vacancies") as cursor:
-                count = await cursor.fetchone()
-                return {
-                    "status": "running" if is_scraping else "idle",
-                    "total_vacancies": count[0] if count else 0,
-                    "current_municipality": current_municipality,
-                    "progress": (processed_municipalities / len(MUNICIPALITIES)) * 100 if MUNICIPALITIES else 0
-                }
-    except Exception as e:
-        logger.error(f"Fout bij ophalen status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """Status van de actieve (of laatste) crawl run"""
+    run = crawl_runs.current
+    progress = run.progress if run else {}
+    async with read_db() as db:
+        async with db.execute(GLOBAL_STATS_SQL) as cursor:
+            row = await cursor.fetchone()
+    total = progress.get("total") or 0
+    return {
+        "run_id": run.id if run else None,
+        "status": crawl_runs.active.status if crawl_runs.active else "idle",
+        "total_vacancies": row[3] if row else 0,
+        "current_municipality": progress.get("last_municipality"),
+        "progress": progress.get("current", 0) / total * 100 if total else 0
+    }
+
+@app.get("/api/admin/runs")
+async def get_crawl_runs(limit: int = Query(20, ge=1, le=200)):
+    """De actieve en wachtende run en de laatste afgeronde runs met hun tijdsverdeling"""
+    return {
+        "active": crawl_runs.active.as_dict() if crawl_runs.active else None,
+        "queued": crawl_runs.queued.as_dict() if crawl_runs.queued else None,
+        "runs": await crawl_runs.history(limit)
+    }
+
+@app.get("/api/admin/runs/{run_id}")
+async def get_crawl_run(run_id: str):
+    """Eén crawl run (actief, wachtend of afgerond)"""
+    run = await crawl_runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Crawl run niet gevonden")
+    return run
 
 @app.get("/admin/municipalities", response_model=List[Municipality])
 async def get_municipalities_config():
     """Krijg de configuratie van alle gemeenten"""
-    db = await get_db()
-    try:
+    async with read_db() as db:
         async with db.execute('SELECT * FROM municipalities') as cursor:
             rows = await cursor.fetchall()
             result = []
@@ -937,11 +1029,10 @@ async def get_municipalities_config():
                     "enabled": bool(row[6]),
                     "last_scraped": row[7],
                     "success_rate": row[8],
-                    "last_success": row[9]
+                    "last_success": row[9],
+                    "vacancy_keywords": row[10]
                 })
             return result
-    finally:
-        await db.close()
 
 @app.put("/admin/municipalities/{municipality_id}")
 async def update_municipality_config(municipality_id: int, config: Municipality):
@@ -950,7 +1041,8 @@ async def update_municipality_config(municipality_id: int, config: Municipality)
     try:
         await db.execute('''
             UPDATE municipalities 
-            SET name = ?, latitude = ?, longitude = ?, website = ?, vacancy_url = ?, enabled = ?
+            SET name = ?, latitude = ?, longitude = ?, website = ?, vacancy_url = ?, enabled = ?,
+                vacancy_keywords = ?
             WHERE id = ?
         ''', (
             config.name,
@@ -959,9 +1051,11 @@ async def update_municipality_config(municipality_id: int, config: Municipality)
             config.website,
             config.vacancy_url,
             config.enabled,
+            config.vacancy_keywords,
             municipality_id
         ))
         await db.commit()
+        response_cache.invalidate()
         return {"status": "success"}
     except Exception as e:
         logger.error(f"Fout bij updaten gemeente: {e}")
@@ -969,18 +1063,42 @@ async def update_municipality_config(municipality_id: int, config: Municipality)
     finally:
         await db.close()
 
+@app.get("/api/admin/metrics")
+async def get_metrics():
+    """Tellers van de response cache, de database lees-pool en de progress stream"""
+    return {
+        "response_cache": response_cache.stats.as_dict(),
+        "read_pool": read_pool_stats(),
+        "progress_stream": progress_events.stats.as_dict()
+    }
+
+@app.get("/api/admin/events")
+async def progress_stream():
+    """
+    Server-Sent Events met de crawl voortgang: eerst een snapshot, daarna
+    alleen events als er iets verandert (progress deltas en per gemeente
+    een municipality event)
+    """
+    return StreamingResponse(
+        progress_events.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Voeg deze nieuwe endpoint toe voor de voortgang
 @app.get("/api/progress")
 async def get_progress():
-    """Haal de huidige scraping voortgang op"""
-    return scraping_progress 
+    """Haal de voortgang van de actieve (of laatste) crawl run op"""
+    run = crawl_runs.current
+    if run is None:
+        return {"total": 0, "current": 0, "status": "idle"}
+    return {**run.progress, "run_id": run.id, "status": run.status} 
 
 @app.get("/api/vacancies/{vacancy_id}")
 async def get_vacancy(vacancy_id: int):
     """Haal een specifieke vacature op"""
     try:
-        db = await get_db()
-        async with db.execute(
+        async with read_db() as db, db.execute(
             "SELECT * FROM vacancies WHERE id = ?", 
             (vacancy_id,)
         ) as cursor:
@@ -996,16 +1114,12 @@ async def get_vacancy(vacancy_id: int):
     except Exception as e:
         logger.error(f"Error fetching vacancy {vacancy_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'db' in locals():
-            await db.close()
 
 @app.get("/api/municipalities/{municipality_id}")
 async def get_municipality(municipality_id: str):
     """Haal een specifieke gemeente op"""
     try:
-        db = await get_db()
-        async with db.execute(
+        async with read_db() as db, db.execute(
             "SELECT * FROM municipalities WHERE id = ?", 
             (municipality_id,)
         ) as cursor:
@@ -1021,6 +1135,3 @@ async def get_municipality(municipality_id: str):
     except Exception as e:
         logger.error(f"Error fetching municipality {municipality_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'db' in locals():
-            await db.close() 
\ No newline at end of file
@@ -0,0 +1,479 @@
+"""
+Versioned schema migraties voor de SQLite database.
+
+`create_base_tables` (via `init_db`) maakt de basis tabellen aan; alles
+wat daarna aan het schema verandert staat hier als genummerde migratie. De
+huidige versie staat in `PRAGMA user_version`; bij startup worden alleen de
+ontbrekende migraties uitgevoerd, elk in een eigen transactie, en daarna
+draait ANALYZE zodat de query planner de nieuwe indexes ook kiest.
+
+De query plans worden ook gecontroleerd door tests/test_migrations.py.
+
+Controleren dat de hot queries (app/queries.py) geen full table scan doen:
+
+    python -m app.migrations --check                 # vanuit de backend directory
+    python -m app.migrations --check --db /pad/naar/scraper.db
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+from typing import Awaitable, Callable, List, Tuple
+
+import aiosqlite
+
+from app.database import DB_PATH, apply_pragmas
+from app.db_writer import vacancy_key
+from app.queries import HOT_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_column(db, table: str, column: str, definition: str):
+    """Voeg een kolom toe aan een bestaande tabel als die nog ontbreekt"""
+    async with db.execute(f'PRAGMA table_info({table})') as cursor:
+        columns = [row[1] for row in await cursor.fetchall()]
+    if column not in columns:
+        await db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+async def create_base_tables(db):
+    """De basis tabellen van de eerste versie; alles daarna is een migratie hieronder"""
+    # Maak municipalities tabel
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS municipalities (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        latitude REAL,
+        longitude REAL,
+        website TEXT,
+        vacancy_url TEXT,
+        enabled INTEGER DEFAULT 1,
+        last_scraped TIMESTAMP,
+        success_rate REAL DEFAULT 0,
+        last_success TIMESTAMP
+    )
+    ''')
+
+    # Komma-gescheiden keywords die de standaard vacature keywords vervangen
+    await ensure_column(db, 'municipalities', 'vacancy_keywords', 'TEXT')
+
+    # Maak vacancies tabel
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS vacancies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        municipality_id TEXT NOT NULL,
+        description TEXT,
+        function_category TEXT,
+        education_level TEXT,
+        url TEXT,
+        publication_date TIMESTAMP,
+        found_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (municipality_id) REFERENCES municipalities (id)
+    )
+    ''')
+
+    # Maak scrape_results tabel
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS scrape_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        municipality_id TEXT NOT NULL,
+        success INTEGER NOT NULL,
+        error_message TEXT,
+        urls_found INTEGER DEFAULT 0,
+        scrape_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Maak http_cache tabel (ETag / Last-Modified per URL voor conditional requests)
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS http_cache (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        content_length INTEGER DEFAULT 0,
+        fetch_seconds REAL DEFAULT 0,
+        content_hash TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    await ensure_column(db, 'http_cache', 'content_hash', 'TEXT')
+
+
+async def _table_columns(db, table: str) -> List[str]:
+    async with db.execute(f'PRAGMA table_info({table})') as cursor:
+        return [row[1] for row in await cursor.fetchall()]
+
+
+async def _fix_scrape_results(db):
+    """
+    De oude scrape_results tabel had municipality_name (NOT NULL) en
+    last_scraped, terwijl de code municipality_id en scrape_date gebruikt;
+    daardoor faalde elke insert. Bouw de tabel opnieuw op en neem bestaande
+    rijen mee waar de gemeente te herleiden is.
+    """
+    columns = await _table_columns(db, 'scrape_results')
+    if 'municipality_id' in columns and 'scrape_date' in columns:
+        return
+    await db.execute('''
+        CREATE TABLE scrape_results_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            municipality_id TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            error_message TEXT,
+            urls_found INTEGER DEFAULT 0,
+            scrape_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    await db.execute('''
+        INSERT INTO scrape_results_new (id, municipality_id, success, error_message, urls_found, scrape_date)
+        SELECT sr.id, m.id, sr.success, sr.error_message, CAST(sr.urls_found AS INTEGER), sr.last_scraped
+        FROM scrape_results sr
+        JOIN municipalities m ON m.name = sr.municipality_name
+    ''')
+    await db.execute('DROP TABLE scrape_results')
+    await db.execute('ALTER TABLE scrape_results_new RENAME TO scrape_results')
+
+
+async def _hot_query_indexes(db):
+    """Indexes voor de queries in app/queries.py"""
+    # /api/vacancies: JOIN + ORDER BY found_date DESC zonder sort stap
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_found_date ON vacancies (found_date DESC, id DESC)')
+    # Vacatures per gemeente (opslaan, filteren, verwijderen van een gemeente)
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_municipality ON vacancies (municipality_id)')
+    # /api/logs (ORDER BY scrape_date DESC LIMIT) en /api/stats (datum venster, covering op success)
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_scrape_results_date ON scrape_results (scrape_date, success)')
+    # success_rate aggregatie per gemeente in save_scrape_result (covering)
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_scrape_results_municipality ON scrape_results (municipality_id, success)')
+    # /api/stats: COUNT/MAX(last_scraped) over de gemeenten uit de index
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_municipalities_last_scraped ON municipalities (last_scraped)')
+
+
+async def _vacancy_natural_key(db):
+    """
+    Natuurlijke sleutel (municipality_id, url_key) voor vacatures, met
+    first_seen/last_seen. Tot nu toe voegde elke crawl elke link opnieuw toe
+    (INSERT OR REPLACE op alleen een autoincrement id), dus bestaande
+    duplicaten worden eerst samengevoegd: de oudste rij blijft staan met de
+    titel van de nieuwste en het volledige first_seen/last_seen bereik.
+    """
+    columns = await _table_columns(db, 'vacancies')
+    for column in ('url_key', 'first_seen', 'last_seen'):
+        if column not in columns:
+            # ALTER TABLE ADD COLUMN staat geen CURRENT_TIMESTAMP default toe
+            await db.execute(f'ALTER TABLE vacancies ADD COLUMN {column} {"TEXT" if column == "url_key" else "TIMESTAMP"}')
+    await db.execute('''
+        UPDATE vacancies
+        SET first_seen = COALESCE(first_seen, found_date),
+            last_seen = COALESCE(last_seen, found_date)
+    ''')
+
+    async with db.execute('SELECT id, url FROM vacancies WHERE url_key IS NULL AND url IS NOT NULL') as cursor:
+        rows = await cursor.fetchall()
+    await db.executemany('UPDATE vacancies SET url_key = ? WHERE id = ?', [(vacancy_key(url), id) for id, url in rows])
+
+    keepers = '''
+        SELECT MIN(id) FROM vacancies
+        WHERE url_key IS NOT NULL
+        GROUP BY municipality_id, url_key
+    '''
+    await db.execute(f'''
+        UPDATE vacancies
+        SET title = (
+                SELECT d.title FROM vacancies d
+                WHERE d.municipality_id = vacancies.municipality_id AND d.url_key = vacancies.url_key
+                ORDER BY d.id DESC LIMIT 1
+            ),
+            first_seen = (
+                SELECT MIN(d.first_seen) FROM vacancies d
+                WHERE d.municipality_id = vacancies.municipality_id AND d.url_key = vacancies.url_key
+            ),
+            last_seen = (
+                SELECT MAX(d.last_seen) FROM vacancies d
+                WHERE d.municipality_id = vacancies.municipality_id AND d.url_key = vacancies.url_key
+            )
+        WHERE id IN ({keepers} HAVING COUNT(*) > 1)
+    ''')
+    cursor = await db.execute(f'DELETE FROM vacancies WHERE url_key IS NOT NULL AND id NOT IN ({keepers})')
+    if cursor.rowcount:
+        logger.info(f"{cursor.rowcount} dubbele vacatures samengevoegd")
+
+    await db.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_vacancies_natural_key ON vacancies (municipality_id, url_key)')
+    # De unieke index begint met municipality_id en maakt de losse index overbodig
+    await db.execute('DROP INDEX IF EXISTS idx_vacancies_municipality')
+
+
+async def _vacancy_filter_indexes(db):
+    """Indexes voor de gefilterde, keyset-gepagineerde /api/vacancies"""
+    # Elk filter gevolgd door de sorteervolgorde, zodat een gefilterde pagina
+    # direct vanaf de cursor gelezen wordt zonder sort stap
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vacancies_municipality_found
+        ON vacancies (municipality_id, found_date DESC, id DESC)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vacancies_category_found
+        ON vacancies (function_category, found_date DESC, id DESC)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_vacancies_education_found
+        ON vacancies (education_level, found_date DESC, id DESC)
+    ''')
+
+
+async def _vacancy_export_index(db):
+    """Index voor de (incrementele) export op last_seen"""
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_last_seen ON vacancies (last_seen, id)')
+
+
+async def _precomputed_stats(db):
+    """
+    Voorberekende statistieken: per gemeente (municipality_stats) en één
+    globale rij (global_stats) voor /api/stats. Triggers houden de tellers bij
+    tijdens de writes van de crawl, zodat /api/stats één rij leest en
+    save_scrape_result de success_rate niet meer uit de hele historie haalt.
+    """
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS municipality_stats (
+            municipality_id TEXT PRIMARY KEY,
+            vacancy_count INTEGER NOT NULL DEFAULT 0,
+            scrape_count INTEGER NOT NULL DEFAULT 0,
+            success_count INTEGER NOT NULL DEFAULT 0,
+            last_scrape_date TIMESTAMP
+        )
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS global_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_municipalities INTEGER NOT NULL DEFAULT 0,
+            scraped_municipalities INTEGER NOT NULL DEFAULT 0,
+            last_scrape_time TIMESTAMP,
+            total_vacancies INTEGER NOT NULL DEFAULT 0,
+            success_count INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Eenmalig vullen uit de bestaande data. success_count/error_count tellen
+    # voortaan per crawl run; hier starten ze met de resultaten van het laatste etmaal
+    await db.execute('''
+        INSERT OR REPLACE INTO municipality_stats
+            (municipality_id, vacancy_count, scrape_count, success_count, last_scrape_date)
+        SELECT municipality_id, SUM(vacancies), SUM(scrapes), SUM(successes), MAX(last_scrape_date)
+        FROM (
+            SELECT municipality_id, COUNT(*) AS vacancies, 0 AS scrapes, 0 AS successes, NULL AS last_scrape_date
+            FROM vacancies GROUP BY municipality_id
+            UNION ALL
+            SELECT municipality_id, 0, COUNT(*), SUM(CASE WHEN success THEN 1 ELSE 0 END), MAX(scrape_date)
+            FROM scrape_results GROUP BY municipality_id
+        )
+        GROUP BY municipality_id
+    ''')
+    await db.execute('''
+        INSERT OR REPLACE INTO global_stats
+            (id, total_municipalities, scraped_municipalities, last_scrape_time,
+             total_vacancies, success_count, error_count)
+        SELECT 1,
+               (SELECT COUNT(*) FROM municipalities),
+               (SELECT COUNT(last_scraped) FROM municipalities),
+               (SELECT MAX(last_scraped) FROM municipalities),
+               (SELECT COUNT(*) FROM vacancies),
+               (SELECT COUNT(*) FROM scrape_results WHERE success AND scrape_date >= datetime('now', '-1 day')),
+               (SELECT COUNT(*) FROM scrape_results WHERE NOT success AND scrape_date >= datetime('now', '-1 day'))
+    ''')
+
+    # Vacatures: een upsert die een bestaande rij bijwerkt telt niet mee
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_vacancies_stats_insert AFTER INSERT ON vacancies
+        BEGIN
+            INSERT INTO municipality_stats (municipality_id, vacancy_count) VALUES (NEW.municipality_id, 1)
+            ON CONFLICT (municipality_id) DO UPDATE SET vacancy_count = vacancy_count + 1;
+            UPDATE global_stats SET total_vacancies = total_vacancies + 1 WHERE id = 1;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_vacancies_stats_delete AFTER DELETE ON vacancies
+        BEGIN
+            UPDATE municipality_stats SET vacancy_count = vacancy_count - 1 WHERE municipality_id = OLD.municipality_id;
+            UPDATE global_stats SET total_vacancies = total_vacancies - 1 WHERE id = 1;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_scrape_results_stats_insert AFTER INSERT ON scrape_results
+        BEGIN
+            INSERT INTO municipality_stats (municipality_id, scrape_count, success_count, last_scrape_date)
+            VALUES (NEW.municipality_id, 1, CASE WHEN NEW.success THEN 1 ELSE 0 END, NEW.scrape_date)
+            ON CONFLICT (municipality_id) DO UPDATE SET
+                scrape_count = scrape_count + 1,
+                success_count = success_count + excluded.success_count,
+                last_scrape_date = excluded.last_scrape_date;
+            UPDATE global_stats
+            SET success_count = success_count + (CASE WHEN NEW.success THEN 1 ELSE 0 END),
+                error_count = error_count + (CASE WHEN NEW.success THEN 0 ELSE 1 END)
+            WHERE id = 1;
+        END
+    ''')
+    # Gemeenten: de crawl zet alleen last_scraped; toevoegen en vervangen van
+    # gemeenten telt REFRESH_MUNICIPALITY_TOTALS_SQL opnieuw
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_municipalities_last_scraped AFTER UPDATE OF last_scraped ON municipalities
+        WHEN NEW.last_scraped IS NOT NULL
+        BEGIN
+            UPDATE global_stats
+            SET scraped_municipalities = scraped_municipalities + (OLD.last_scraped IS NULL),
+                last_scrape_time = MAX(COALESCE(last_scrape_time, ''), NEW.last_scraped),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+    ''')
+    # De success_rate aggregatie per gemeente was de enige gebruiker van deze index
+    await db.execute('DROP INDEX IF EXISTS idx_scrape_results_municipality')
+
+
+async def _crawl_runs(db):
+    """Afgeronde crawl runs met hun tijdsverdeling (zie app/runs.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_runs (
+            id TEXT PRIMARY KEY,
+            trigger TEXT,
+            status TEXT NOT NULL,
+            created_at TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            error TEXT,
+            total INTEGER DEFAULT 0,
+            successful INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            vacancies_found INTEGER DEFAULT 0,
+            queue_wait_seconds REAL,
+            fetch_seconds REAL,
+            parse_seconds REAL,
+            write_seconds REAL,
+            stats TEXT
+        )
+    ''')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_crawl_runs_started ON crawl_runs (started_at)')
+
+
+async def _import_state(db):
+    """Hash en mtime van geïmporteerde bestanden (zie app/csv_import.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS import_state (
+            source TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            mtime REAL,
+            size INTEGER,
+            rows INTEGER,
+            imported_at TIMESTAMP
+        )
+    ''')
+
+
+async def _vacancy_details(db):
+    """detail_fetched_at: wanneer de detailpagina van een vacature het laatst opgehaald is (zie app/details.py)"""
+    if 'detail_fetched_at' not in await _table_columns(db, 'vacancies'):
+        await db.execute('ALTER TABLE vacancies ADD COLUMN detail_fetched_at TIMESTAMP')
+
+
+# (versie, omschrijving, migratie); versies alleen toevoegen, nooit hernummeren
+MIGRATIONS: List[Tuple[int, str, Callable[..., Awaitable[None]]]] = [
+    (1, "scrape_results met municipality_id en scrape_date", _fix_scrape_results),
+    (2, "indexes voor de hot queries", _hot_query_indexes),
+    (3, "natuurlijke sleutel en first_seen/last_seen voor vacatures", _vacancy_natural_key),
+    (4, "indexes voor gefilterde vacature pagina's", _vacancy_filter_indexes),
+    (5, "index voor de vacature export", _vacancy_export_index),
+    (6, "voorberekende statistieken per gemeente en globaal", _precomputed_stats),
+    (7, "crawl_runs tabel", _crawl_runs),
+    (8, "import_state tabel voor de incrementele CSV import", _import_state),
+    (9, "detail_fetched_at voor de detailpagina's van vacatures", _vacancy_details),
+]
+
+
+async def schema_version(db) -> int:
+    async with db.execute('PRAGMA user_version') as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def migrate(db) -> int:
+    """Voer de ontbrekende migraties uit; geeft het aantal uitgevoerde migraties terug"""
+    current = await schema_version(db)
+    applied = 0
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            await db.execute('BEGIN')
+            await migration(db)
+            await db.execute(f'PRAGMA user_version = {version}')
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Migratie {version} ({description}) mislukt: {str(e)}")
+            raise
+        logger.info(f"Migratie {version} uitgevoerd: {description}")
+        applied += 1
+
+    if applied:
+        await db.execute('ANALYZE')
+        await db.commit()
+    return applied
+
+
+# Een plan regel als "SCAN vacancies" (zonder index) is een full table scan;
+# "SCAN ... USING (COVERING) INDEX" loopt een index af en is wel in orde
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+_TEMP_SORT = re.compile(r'^USE TEMP B-TREE FOR (ORDER BY|GROUP BY)')
+
+
+async def explain(db, sql: str, params=()) -> List[str]:
+    """De regels van EXPLAIN QUERY PLAN voor een query"""
+    async with db.execute(f'EXPLAIN QUERY PLAN {sql}', params) as cursor:
+        return [row[3] for row in await cursor.fetchall()]
+
+
+async def check_query_plans(db) -> List[str]:
+    """Geef een probleem per hot query die een full scan of een losse sort stap nodig heeft"""
+    problems = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        for detail in await explain(db, sql, params):
+            if _FULL_SCAN.match(detail) or _TEMP_SORT.match(detail):
+                problems.append(f"{name}: {detail}")
+    return problems
+
+
+async def _main(args) -> int:
+    if not os.path.exists(args.db):
+        print(f"Database {args.db} bestaat niet; start de backend eerst zodat de tabellen aangemaakt worden")
+        return 2
+    db = await aiosqlite.connect(args.db)
+    try:
+        await apply_pragmas(db)
+        applied = await migrate(db)
+        print(f"Schema versie {await schema_version(db)} ({applied} migraties uitgevoerd)")
+        if not args.check:
+            return 0
+        for name, (sql, params) in HOT_QUERIES.items():
+            print(f"{name}:")
+            for detail in await explain(db, sql, params):
+                print(f"    {detail}")
+        problems = await check_query_plans(db)
+        for problem in problems:
+            print(f"PROBLEEM  {problem}")
+        return 1 if problems else 0
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH, help="pad naar de SQLite database")
+    parser.add_argument("--check", action="store_true", help="controleer de query plans van de hot queries")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,208 @@
 """
-Dit bestand bevat alle Nederlandse gemeenten met hun basis informatie.
+Register van alle gemeenten, gebouwd uit één bron: data/municipalities.csv.
+
+Kolommen: gemeente_code (CBS code, bv. GM0363, ook het id in de database),
+gemeente_naam, latitude, longitude, website, vacancy_url en aliases
+(puntkomma-gescheiden, bv. "Den Haag" voor 's-Gravenhage).
+
+Het register wordt bij het importeren van deze module één keer opgebouwd,
+met indexen op id, CBS nummer en genormaliseerde naam/alias, zodat elke
+lookup O(1) is. Verandert het bestand, dan wordt (hoogstens elke
+MUNICIPALITY_RELOAD_SECONDS) een nieuw register opgebouwd en in één keer
+omgewisseld; lezers zien altijd óf het oude óf het nieuwe register.
 """
+import csv
+import io
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.config import MUNICIPALITY_RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), 'data', 'municipalities.csv')
+
+
+def normalize_name(name: str) -> str:
+    """Naam voor lookups: zonder accenten, hoofdletters en leestekens ("'s-Gravenhage" -> "s gravenhage")"""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def cbs_number(code: Union[str, int]) -> Optional[int]:
+    """CBS gemeentenummer uit "GM0363", "0363" of 363"""
+    if isinstance(code, int):
+        return code
+    match = re.fullmatch(r'(?:GM)?(\d{1,4})', code.strip().upper())
+    return int(match.group(1)) if match else None
+
+
+@dataclass(frozen=True)
+class MunicipalityInfo:
+    """Eén gemeente uit het register"""
+    id: str
+    name: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    website: Optional[str] = None
+    vacancy_url: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def cbs_code(self) -> Optional[int]:
+        return cbs_number(self.id)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "website": self.website,
+            "vacancy_url": self.vacancy_url,
+            "aliases": list(self.aliases),
+        }
+
+
+def parse_municipalities(content: bytes) -> List[MunicipalityInfo]:
+    """Lees de gemeenten uit de CSV; ValueError bij een ongeldige rij"""
+    municipalities = []
+    reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig')))
+    for line, row in enumerate(reader, start=2):
+        try:
+            name = row['gemeente_naam'].strip()
+            municipalities.append(MunicipalityInfo(
+                id=row['gemeente_code'].strip().upper(),
+                name=name,
+                latitude=float(row['latitude']) if row.get('latitude') else None,
+                longitude=float(row['longitude']) if row.get('longitude') else None,
+                # Zonder website in de CSV: de gebruikelijke www.<naam>.nl
+                website=row.get('website') or f"https://www.{name.lower().replace(' ', '')}.nl",
+                vacancy_url=row.get('vacancy_url') or None,
+                aliases=tuple(alias.strip() for alias in (row.get('aliases') or '').split(';') if alias.strip()),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"ongeldige rij {line} in gemeenten CSV: {e}")
+    return municipalities
+
+
+@dataclass
+class _Index:
+    """Onveranderlijke snapshot van het register met de lookup tabellen"""
+    municipalities: Tuple[MunicipalityInfo, ...] = ()
+    by_id: Dict[str, MunicipalityInfo] = field(default_factory=dict)
+    by_number: Dict[int, MunicipalityInfo] = field(default_factory=dict)
+    by_name: Dict[str, MunicipalityInfo] = field(default_factory=dict)
 
-MUNICIPALITIES = [
-    # A
-    {"id": 1, "name": "Aa en Hunze", "latitude": 53.0100, "longitude": 6.7500, "website": "https://www.aaenhunze.nl", "vacancy_url": "https://www.werkeninnoordoostoverijssel.nl/vacatures/gemeente-aa-en-hunze"},
-    {"id": 2, "name": "Aalsmeer", "latitude": 52.2667, "longitude": 4.7500, "website": "https://www.aalsmeer.nl", "vacancy_url": "https://www.werkenbijaalsmeer.nl/"},
-    {"id": 3, "name": "Aalten", "latitude": 51.9167, "longitude": 6.5833, "website": "https://www.aalten.nl", "vacancy_url": "https://www.werkeningelderland.nl/organisatie/gemeente-aalten"},
-    {"id": 4, "name": "Achtkarspelen", "latitude": 53.2167, "longitude": 6.1333, "website": "https://www.achtkarspelen.nl", "vacancy_url": "https://www.werkeninfriesland.nl/organisaties/11/gemeente-achtkarspelen"},
-    {"id": 5, "name": "Alblasserdam", "latitude": 51.8667, "longitude": 4.6667, "website": "https://www.alblasserdam.nl", "vacancy_url": "https://www.werkenbijdrechtsteden.nl/"},
-    {"id": 6, "name": "Albrandswaard", "latitude": 51.8667, "longitude": 4.4000, "website": "https://www.albrandswaard.nl", "vacancy_url": "https://www.werkenvooralbrandswaard.nl/"},
-    {"id": 7, "name": "Alkmaar", "latitude": 52.6333, "longitude": 4.7500, "website": "https://www.alkmaar.nl", "vacancy_url": "https://www.werkeninnoordhollandnoord.nl/"},
-    {"id": 8, "name": "Almelo", "latitude": 52.3500, "longitude": 6.6667, "website": "https://www.almelo.nl", "vacancy_url": "https://www.werkenintwente.nl/vacatures/gemeente-almelo"},
-    {"id": 9, "name": "Almere", "latitude": 52.3667, "longitude": 5.2167, "website": "https://www.almere.nl", "vacancy_url": "https://www.werkenbijalmere.nl/"},
-    {"id": 10, "name": "Alphen aan den Rijn", "latitude": 52.1333, "longitude": 4.6667, "website": "https://www.alphenaandenrijn.nl", "vacancy_url": "https://www.werkenbijalphen.nl/"},
-    
-    # B
-    {"id": 11, "name": "Bergen (NH)", "latitude": 52.6667, "longitude": 4.7000, "website": "https://www.bergen-nh.nl", "vacancy_url": "https://www.werkenbijbuch.nl/"},
-    {"id": 12, "name": "Bergen op Zoom", "latitude": 51.5000, "longitude": 4.3000, "website": "https://www.bergenopzoom.nl", "vacancy_url": "https://www.werkeninwestbrabant.nl/"},
-    {"id": 13, "name": "Berkelland", "latitude": 52.1167, "longitude": 6.5167, "website": "https://www.berkelland.nl", "vacancy_url": "https://www.werkeningelderland.nl/organisatie/gemeente-berkelland"},
-    {"id": 14, "name": "Bernheze", "latitude": 51.6833, "longitude": 5.5167, "website": "https://www.bernheze.org", "vacancy_url": "https://www.werkenbijbernheze.nl/"},
-    {"id": 15, "name": "Best", "latitude": 51.5167, "longitude": 5.4000, "website": "https://www.gemeentebest.nl", "vacancy_url": "https://www.werkenbijbest.nl/"},
-    
-    # D
-    {"id": 16, "name": "Delft", "latitude": 52.0167, "longitude": 4.3500, "website": "https://www.delft.nl", "vacancy_url": "https://www.werkenvoordelft.nl/"},
-    {"id": 17, "name": "Den Haag", "latitude": 52.0833, "longitude": 4.3000, "website": "https://www.denhaag.nl", "vacancy_url": "https://www.werkenbijdenhaag.nl/"},
-    {"id": 18, "name": "Den Helder", "latitude": 52.9500, "longitude": 4.7500, "website": "https://www.denhelder.nl", "vacancy_url": "https://www.werkeninnoordhollandnoord.nl/"},
-    
-    # E
-    {"id": 19, "name": "Ede", "latitude": 52.0500, "longitude": 5.6667, "website": "https://www.ede.nl", "vacancy_url": "https://www.werkenbijede.nl/"},
-    {"id": 20, "name": "Eindhoven", "latitude": 51.4333, "longitude": 5.4833, "website": "https://www.eindhoven.nl", "vacancy_url": "https://www.werkenvooreindhoven.nl/"},
-    
-    # G
-    {"id": 21, "name": "Groningen", "latitude": 53.2167, "longitude": 6.5667, "website": "https://gemeente.groningen.nl", "vacancy_url": "https://www.werkenbijgemeentegroningen.nl/"},
-    
-    # H
-    {"id": 22, "name": "Haarlem", "latitude": 52.3833, "longitude": 4.6333, "website": "https://www.haarlem.nl", "vacancy_url": "https://www.werkenbijhaarlem.nl/"},
-    {"id": 23, "name": "Haarlemmermeer", "latitude": 52.3000, "longitude": 4.7000, "website": "https://www.haarlemmermeer.nl", "vacancy_url": "https://www.werkenbijhaarlemmermeer.nl/"},
-    
-    # L
-    {"id": 24, "name": "Leiden", "latitude": 52.1667, "longitude": 4.4833, "website": "https://www.leiden.nl", "vacancy_url": "https://www.werkenbijleiden.nl/"},
-    {"id": 25, "name": "Leeuwarden", "latitude": 53.2000, "longitude": 5.7833, "website": "https://www.leeuwarden.nl", "vacancy_url": "https://www.werkenbijleeuwarden.nl/"},
-    
-    # M
-    {"id": 26, "name": "Maastricht", "latitude": 50.8500, "longitude": 5.6833, "website": "https://www.maastricht.nl", "vacancy_url": "https://www.werkenbijgemeentemaastricht.nl/"},
-    
-    # N
-    {"id": 27, "name": "Nijmegen", "latitude": 51.8333, "longitude": 5.8667, "website": "https://www.nijmegen.nl", "vacancy_url": "https://www.werkenbijnijmegen.nl/"},
-    
-    # R
-    {"id": 28, "name": "Rotterdam", "latitude": 51.9167, "longitude": 4.5000, "website": "https://www.rotterdam.nl", "vacancy_url": "https://www.werkenbijdegemeenterotterdam.nl/"},
-    
-    # T
-    {"id": 29, "name": "Tilburg", "latitude": 51.5500, "longitude": 5.0833, "website": "https://www.tilburg.nl", "vacancy_url": "https://www.werkeninmiddenbrabant.nl/"},
-    
-    # U
-    {"id": 30, "name": "Utrecht", "latitude": 52.0833, "longitude": 5.1167, "website": "https://www.utrecht.nl", "vacancy_url": "https://www.werkenbijutrecht.nl/"},
-    
-    # Z
-    {"id": 31, "name": "Zwolle", "latitude": 52.5167, "longitude": 6.1000, "website": "https://www.zwolle.nl", "vacancy_url": "https://www.werkenbijzwolle.nl/"},
-]
-
-def get_all_municipalities():
+    @classmethod
+    def build(cls, municipalities: List[MunicipalityInfo]) -> "_Index":
+        index = cls(municipalities=tuple(municipalities))
+        for municipality in municipalities:
+            if municipality.id in index.by_id:
+                raise ValueError(f"dubbele gemeente_code {municipality.id}")
+            index.by_id[municipality.id] = municipality
+            if municipality.cbs_code is not None:
+                index.by_number[municipality.cbs_code] = municipality
+            for name in (municipality.name, *municipality.aliases):
+                key = normalize_name(name)
+                other = index.by_name.get(key)
+                if other is not None and other is not municipality:
+                    raise ValueError(f"naam {name!r} hoort bij zowel {other.id} als {municipality.id}")
+                index.by_name[key] = municipality
+        return index
+
+
+class MunicipalityRegistry:
+    """Gemeenten met O(1) lookups; herlaadt zichzelf als het CSV bestand verandert"""
+
+    def __init__(self, path: str = CSV_PATH, reload_seconds: float = MUNICIPALITY_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._index = _Index()
+        self._signature: Optional[Tuple[float, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Bouw het register opnieuw op als het bestand gewijzigd is (of met
+        force=True). Een ongeldig bestand laat het huidige register staan.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                logger.error(f"Gemeenten CSV niet leesbaar: {str(e)}")
+                return False
+            signature = (stat.st_mtime, stat.st_size)
+            if not force and signature == self._signature:
+                return False
+            try:
+                with open(self.path, 'rb') as f:
+                    index = _Index.build(parse_municipalities(f.read()))
+            except ValueError as e:
+                logger.error(f"Gemeenten CSV niet geladen, vorige versie blijft actief: {str(e)}")
+                self._signature = signature
+                return False
+            # Eén referentie omzetten: lezers zien het oude of het nieuwe register
+            self._index = index
+            self._signature = signature
+            logger.info(f"Gemeenten register geladen: {len(index.municipalities)} gemeenten")
+            return True
+
+    def _current(self) -> _Index:
+        if self.reload_seconds >= 0 and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload()
+        return self._index
+
+    def all(self) -> Tuple[MunicipalityInfo, ...]:
+        return self._current().municipalities
+
+    def by_id(self, municipality_id: str) -> Optional[MunicipalityInfo]:
+        return self._current().by_id.get(municipality_id.strip().upper())
+
+    def by_cbs_code(self, code: Union[str, int]) -> Optional[MunicipalityInfo]:
+        number = cbs_number(code)
+        return self._current().by_number.get(number) if number is not None else None
+
+    def by_name(self, name: str) -> Optional[MunicipalityInfo]:
+        """Op naam of alias, ongevoelig voor hoofdletters, accenten en leestekens"""
+        return self._current().by_name.get(normalize_name(name))
+
+    def lookup(self, key: Union[str, int]) -> Optional[MunicipalityInfo]:
+        """Op id, CBS nummer, naam of alias"""
+        if isinstance(key, int):
+            return self.by_cbs_code(key)
+        return self.by_id(key) or self.by_cbs_code(key) or self.by_name(key)
+
+    def __len__(self) -> int:
+        return len(self._current().municipalities)
+
+
+registry = MunicipalityRegistry()
+
+
+def get_all_municipalities() -> List[Dict[str, Any]]:
     """Haal alle gemeenten op"""
-    return MUNICIPALITIES
+    return [municipality.as_dict() for municipality in registry.all()]
+
+
+def get_municipality_by_id(id: Union[str, int]) -> Optional[Dict[str, Any]]:
+    """Haal een specifieke gemeente op basis van ID (GM code of CBS nummer)"""
+    municipality = registry.by_id(id) if isinstance(id, str) else None
+    municipality = municipality or registry.by_cbs_code(id)
+    return municipality.as_dict() if municipality else None
 
-def get_municipality_by_id(id: int):
-    """Haal een specifieke gemeente op basis van ID"""
-    return next((m for m in MUNICIPALITIES if m["id"] == id), None)
 
-def get_municipality_by_name(name: str):
-    """Haal een specifieke gemeente op basis van naam"""
-    return next((m for m in MUNICIPALITIES if m["name"].lower() == name.lower()), None) 
\ No newline at end of file
+def get_municipality_by_name(name: str) -> Optional[Dict[str, Any]]:
+    """Haal een specifieke gemeente op basis van naam of alias"""
+    municipality = registry.by_name(name)
+    return municipality.as_dict() if municipality else None
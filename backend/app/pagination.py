@@ -0,0 +1,202 @@
+"""
+Paginering van vacaturelijsten.
+
+Grote gemeenten en regionale vacaturesites verdelen hun vacatures over
+meerdere pagina's; alleen de eerste pagina ophalen mist de rest. Herkend
+worden:
+
+- `<link rel="next">` en `<a rel="next">`
+- genummerde paginering en "volgende" links (`?page=2`, `/pagina/3`, `?start=20`)
+- "meer laden" knoppen met een `data-*` URL, en JSON listing endpoints
+  (een `next`/`next_page` URL in het JSON antwoord)
+
+De detectie draait in de parse pool (zie extraction.process_page). Een
+ListingCrawl volgt de gevonden pagina's per golf tegelijk, binnen een budget
+van PAGINATION_MAX_PAGES pagina's en PAGINATION_MAX_BYTES bytes per
+vacaturepagina, en haalt een pagina nooit twee keer op.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from app.config import PAGINATION_MAX_BYTES, PAGINATION_MAX_PAGES
+from app.crawler import normalize_url
+
+# Query parameters en pad segmenten die een paginanummer of offset bevatten
+_PAGE_PARAM = re.compile(
+    r'[?&](?:page|p|pagina|paged|pg|pagenumber|start|offset|skip|from)=\d+|/(?:page|pagina|p)/\d+/?(?:$|[?#])',
+    re.IGNORECASE,
+)
+# Zonder "p": bij WordPress is ?p=123 de permalink van een bericht, geen paginanummer
+_PAGE_QUERY_KEYS = {"page", "pagina", "paged", "pg", "pagenumber", "start", "offset", "skip", "from"}
+_PAGE_PATH = re.compile(r'/(?:page|pagina|p)/\d+$', re.IGNORECASE)
+_NEXT_TEXTS = {"volgende", "volgende pagina", "next", "next page", "meer", "meer vacatures", ">", "›", "»", ">>"}
+_REL_NEXT = re.compile(r'<(?:a|link)\b[^>]*\brel\s*=\s*["\']?next\b[^>]*>', re.IGNORECASE)
+_HREF = re.compile(r'\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+_DATA_URL = re.compile(
+    r'\bdata-(?:next|next-url|next-page|load-more|load-more-url|more-url|url|href|endpoint|source)'
+    r'\s*=\s*(?:"([^"]+)"|\'([^\']+)\')',
+    re.IGNORECASE,
+)
+_JSON_ENDPOINT = re.compile(r'\.json\b|/api/|/wp-json/|[?&]format=json', re.IGNORECASE)
+_JSON_NEXT_KEYS = ("next", "next_page", "nextPage", "next_page_url", "nextPageUrl", "next_url", "nextUrl")
+
+
+def _same_site(url: str, current_url: str) -> bool:
+    return (urlsplit(url).hostname or "").removeprefix("www.") == (urlsplit(current_url).hostname or "").removeprefix("www.")
+
+
+def _listing_key(url: str) -> str:
+    """normalize_url zonder paginanummer of offset: alle pagina's van een lijst geven dezelfde key"""
+    parts = urlsplit(normalize_url(url))
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in _PAGE_QUERY_KEYS]
+    path = _PAGE_PATH.sub("", parts.path) or "/"
+    return urlunsplit((parts.scheme, parts.netloc, path, urlencode(query), ""))
+
+
+def _candidate(href: Optional[str], current_url: str) -> Optional[str]:
+    """Absolute URL van een pagina op dezelfde site, None voor fragmenten, javascript: en andere sites"""
+    if not href:
+        return None
+    href = href.strip()
+    if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+        return None
+    url = urljoin(current_url, href).split("#", 1)[0]
+    if not url.startswith(("http://", "https://")) or not _same_site(url, current_url):
+        return None
+    return url
+
+
+def find_next_pages(html: str, current_url: str, links: List[tuple]) -> List[str]:
+    """
+    URLs van vervolgpagina's van een HTML vacaturelijst, in documentvolgorde.
+    `links` zijn de (href, tekst) tuples die de parser al uit de pagina haalde.
+    """
+    found: List[str] = []
+
+    for tag in _REL_NEXT.findall(html):
+        match = _HREF.search(tag)
+        if match:
+            found.append(_candidate(next(group for group in match.groups() if group is not None), current_url))
+
+    for href, text in links:
+        text = " ".join(text.split()).lower()
+        # Een link naar pagina 1 is (meestal) de huidige pagina
+        if ((text.isdigit() and int(text) > 1) or text in _NEXT_TEXTS) and _PAGE_PARAM.search(href):
+            found.append(_candidate(href, current_url))
+
+    for match in _DATA_URL.finditer(html):
+        value = match.group(1) or match.group(2)
+        if _PAGE_PARAM.search(value) or _JSON_ENDPOINT.search(value):
+            found.append(_candidate(value, current_url))
+
+    current = normalize_url(current_url)
+    unique = {}
+    for url in found:
+        if url and normalize_url(url) != current:
+            unique.setdefault(normalize_url(url), url)
+    return list(unique.values())
+
+
+def find_json_next_pages(data: Any, current_url: str) -> List[str]:
+    """De volgende pagina van een JSON listing (`next`, `links.next`, ...)"""
+    candidates = []
+    for container in (data, data.get("links") if isinstance(data, dict) else None,
+                      data.get("meta") if isinstance(data, dict) else None):
+        if not isinstance(container, dict):
+            continue
+        for key in _JSON_NEXT_KEYS:
+            value = container.get(key)
+            if isinstance(value, dict):
+                value = value.get("href") or value.get("url")
+            if isinstance(value, str):
+                candidates.append(_candidate(value, current_url))
+    return [url for url in dict.fromkeys(candidates) if url and normalize_url(url) != normalize_url(current_url)]
+
+
+@dataclass
+class ListingCrawl:
+    """
+    Budget en bezochte pagina's voor het volgen van de paginering van één
+    vacaturepagina. `first` is het resultaat van de eerste pagina.
+    """
+    url: str
+    first: dict
+    max_pages: int = PAGINATION_MAX_PAGES
+    max_bytes: int = PAGINATION_MAX_BYTES
+    pages: int = 1
+    bytes: int = 0
+    over_budget: int = 0
+    failed: int = 0
+    visited: Set[str] = field(default_factory=set)
+    vacancy_links: Dict[str, dict] = field(default_factory=dict)
+    # Tekst-fallback van extract_vacancy_links op de eerste pagina (url = de pagina zelf)
+    text_matches: List[dict] = field(default_factory=list)
+    _frontier: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.visited.add(normalize_url(self.url))
+        self._listing = _listing_key(self.url)
+        self._add(self.first, first=True)
+
+    def _add(self, page: dict, first: bool = False):
+        self.bytes += page.get("bytes", 0)
+        current_url = page.get("current_url")
+        if current_url:
+            # Na een redirect is de uiteindelijke URL ook bezocht
+            self.visited.add(normalize_url(current_url))
+        next_pages = {normalize_url(url): url for url in page.get("next_pages", [])}
+        for key, url in next_pages.items():
+            if key not in self.visited:
+                self.visited.add(key)
+                self._frontier.append(url)
+        page_key = normalize_url(current_url or self.url)
+        for vacancy in page.get("vacancy_links", []):
+            key = normalize_url(vacancy['url'])
+            if first and key == page_key:
+                # Vacatures als tekst op de eerste pagina zelf: blijven, zoals zonder paginering
+                self.text_matches.append(vacancy)
+                continue
+            # Links naar pagina's van de lijst zelf ("1", "2", "Volgende") zijn geen vacatures
+            if key in self.visited or _listing_key(vacancy['url']) == self._listing:
+                continue
+            self.vacancy_links.setdefault(key, vacancy)
+
+    def next_batch(self) -> List[str]:
+        """De volgende golf pagina's die binnen het budget nog opgehaald mogen worden"""
+        if self.bytes >= self.max_bytes:
+            self.over_budget += len(self._frontier)
+            self._frontier = []
+        room = max(self.max_pages - self.pages, 0)
+        batch, rest = self._frontier[:room], self._frontier[room:]
+        self.over_budget += len(rest)
+        self._frontier = []
+        self.pages += len(batch)
+        return batch
+
+    def add(self, page: Any):
+        """Verwerk het resultaat (of de exception) van een vervolgpagina"""
+        if isinstance(page, BaseException):
+            self.failed += 1
+            return
+        self._add(page)
+
+    def result(self) -> dict:
+        """Het samengevoegde resultaat, in de vorm van fetch_vacancy_page"""
+        return {
+            **self.first,
+            # Een link die pas later als vervolgpagina herkend werd telt ook niet mee
+            "vacancy_links": self.text_matches + [
+                vacancy for key, vacancy in self.vacancy_links.items() if key not in self.visited
+            ],
+            "pages_fetched": self.pages,
+            "bytes": self.bytes,
+            "pagination": {
+                "pages": self.pages,
+                "bytes": self.bytes,
+                "failed": self.failed,
+                "over_budget": self.over_budget,
+            },
+        }
@@ -0,0 +1,270 @@
+"""
+Verwisselbare HTML parser backends.
+
+Voor het vinden van vacature links is alleen `<a href>` met de linktekst nodig;
+daarvoor hoeft geen volledige boom opgebouwd te worden. De backends:
+
+- `stream`: SAX-achtige parser op basis van de standaard library `html.parser`,
+  zonder boom; altijd beschikbaar en de terugval van `auto` als lxml en
+  selectolax ontbreken (sneller en zuiniger dan BeautifulSoup, trager dan de
+  C parsers)
+- `html.parser`: BeautifulSoup met `html.parser` (het oude gedrag)
+- `lxml`: SAX target op de C parser van lxml (als lxml geïnstalleerd is)
+- `selectolax`: de lexbor (of modest) parser van selectolax (als geïnstalleerd)
+
+`auto` kiest de snelste backend die beschikbaar is.
+"""
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from app.config import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        # Oudere selectolax versies hebben alleen de modest backend
+        from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+# Tekst binnen deze tags is geen zichtbare pagina-inhoud
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+Link = Tuple[str, str]  # (href, linktekst)
+
+
+class ParserBackend:
+    """Basisklasse: een backend haalt links en zichtbare tekst uit HTML"""
+    name = ""
+
+    def extract_links(self, html: str) -> List[Link]:
+        """Alle `<a href>` links als (href, tekst) tuples, in documentvolgorde"""
+        raise NotImplementedError
+
+    def extract_strings(self, html: str) -> List[str]:
+        """Alle niet-lege, gestripte tekstfragmenten van de pagina"""
+        raise NotImplementedError
+
+
+class _LinkCollector:
+    """
+    Gedeelde SAX-logica: houdt bij of we in een `<a href>` zitten en verzamelt
+    de tekst. Wordt gebruikt door de stream en lxml backends.
+    """
+
+    def __init__(self, collect_strings: bool = False):
+        self.collect_strings = collect_strings
+        self.links: List[Link] = []
+        self.strings: List[str] = []
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+        self._pending: List[str] = []
+        self._skip_depth = 0
+
+    def _flush(self):
+        # Parsers leveren tekst soms in stukken aan (bijv. rond entities);
+        # een tekstfragment loopt tot de volgende tag, net als in BeautifulSoup
+        if not self._pending:
+            return
+        data = "".join(self._pending).strip()
+        self._pending = []
+        if not data:
+            return
+        if self.collect_strings:
+            self.strings.append(data)
+        elif self._href is not None:
+            self._text.append(data)
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]):
+        self._flush()
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "a" and not self.collect_strings:
+            # <a> kan niet genest worden: een nieuwe <a> sluit een open link
+            # impliciet af, net als in html.parser (BeautifulSoup) en lxml
+            self._close_link()
+            href = attrs.get("href")
+            if href is not None:
+                self._href = href
+                self._text = []
+
+    def end(self, tag: str):
+        self._flush()
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "a":
+            self._close_link()
+
+    def _close_link(self):
+        if self._href is not None:
+            self.links.append((self._href, "".join(self._text)))
+            self._href = None
+
+    def data(self, data: str):
+        if not self._skip_depth and (self.collect_strings or self._href is not None):
+            self._pending.append(data)
+
+    def close(self):
+        self._flush()
+        # Een niet afgesloten <a> aan het eind van het document telt nog mee
+        self._close_link()
+        return self
+
+
+class _StdlibSaxParser(HTMLParser):
+    def __init__(self, collector: _LinkCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        # <a href="..."/> heeft geen tekst; wel meetellen, net als BeautifulSoup
+        self.collector.start(tag, dict(attrs))
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+class StreamBackend(ParserBackend):
+    """SAX-achtige parser op de standaard library, zonder boom"""
+    name = "stream"
+
+    def _run(self, html: str, collect_strings: bool) -> _LinkCollector:
+        collector = _LinkCollector(collect_strings)
+        parser = _StdlibSaxParser(collector)
+        parser.feed(html)
+        parser.close()
+        return collector.close()
+
+    def extract_links(self, html: str) -> List[Link]:
+        return self._run(html, False).links
+
+    def extract_strings(self, html: str) -> List[str]:
+        return self._run(html, True).strings
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """BeautifulSoup met html.parser (of een andere bs4 feature)"""
+
+    def __init__(self, features: str = "html.parser"):
+        self.features = features
+        self.name = features
+
+    def extract_links(self, html: str) -> List[Link]:
+        soup = BeautifulSoup(html, self.features)
+        return [(link["href"], link.get_text(strip=True)) for link in soup.find_all("a", href=True)]
+
+    def extract_strings(self, html: str) -> List[str]:
+        return list(BeautifulSoup(html, self.features).stripped_strings)
+
+
+class LxmlBackend(ParserBackend):
+    """SAX target op de libxml2 HTML parser"""
+    name = "lxml"
+
+    def _run(self, html: str, collect_strings: bool) -> _LinkCollector:
+        collector = _LinkCollector(collect_strings)
+        parser = etree.HTMLParser(target=collector)
+        parser.feed(html)
+        return parser.close()
+
+    def extract_links(self, html: str) -> List[Link]:
+        if not html:
+            return []
+        return self._run(html, False).links
+
+    def extract_strings(self, html: str) -> List[str]:
+        if not html:
+            return []
+        return self._run(html, True).strings
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax (lexbor/modest) parser"""
+    name = "selectolax"
+
+    def extract_links(self, html: str) -> List[Link]:
+        tree = SelectolaxHTMLParser(html)
+        return [
+            (node.attributes.get("href") or "", node.text(strip=True))
+            for node in tree.css("a[href]")
+        ]
+
+    def extract_strings(self, html: str) -> List[str]:
+        tree = SelectolaxHTMLParser(html)
+        tree.strip_tags(list(SKIP_TEXT_TAGS))
+        if tree.root is None:
+            return []
+        strings = []
+        for node in tree.root.traverse(include_text=True):
+            if node.tag == "-text":
+                text = node.text_content.strip()
+                if text:
+                    strings.append(text)
+        return strings
+
+
+def available_backends() -> Dict[str, ParserBackend]:
+    """Alle backends die in deze omgeving gebruikt kunnen worden"""
+    backends: Dict[str, ParserBackend] = {
+        "stream": StreamBackend(),
+        "html.parser": BeautifulSoupBackend("html.parser"),
+    }
+    if LXML_AVAILABLE:
+        backends["lxml"] = LxmlBackend()
+    if SELECTOLAX_AVAILABLE:
+        backends["selectolax"] = SelectolaxBackend()
+    return backends
+
+
+_parser: Optional[ParserBackend] = None
+
+
+def get_parser(name: Optional[str] = None) -> ParserBackend:
+    """
+    Geef de parser backend terug. Zonder naam wordt HTML_PARSER uit de
+    configuratie gebruikt; `auto` kiest selectolax, lxml of stream (in die volgorde).
+    """
+    global _parser
+    if name is None and _parser is not None:
+        return _parser
+
+    requested = name or HTML_PARSER
+    backends = available_backends()
+    if requested == "auto":
+        backend = backends.get("selectolax") or backends.get("lxml") or backends["stream"]
+    elif requested in backends:
+        backend = backends[requested]
+    else:
+        logger.warning(f"HTML parser '{requested}' niet beschikbaar, gebruik 'stream'")
+        backend = backends["stream"]
+
+    if name is None:
+        _parser = backend
+        logger.info(f"HTML parser backend: {backend.name}")
+    return backend
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """BeautifulSoup boom voor code die echt een boom nodig heeft; gebruikt lxml als dat kan"""
+    return BeautifulSoup(html, "lxml" if LXML_AVAILABLE else "html.parser")
@@ -0,0 +1,216 @@
+"""
+Beleefdheid per host: rate limiting, concurrency limiet, Retry-After en robots.txt.
+
+Veel gemeenten verwijzen naar dezelfde regionale vacaturesite. Door per host
+(na normalisatie en na redirects) een token bucket en een semaphore bij te
+houden kan de globale concurrency omhoog zonder dat één host overbelast raakt.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from app.config import (
+    HOST_BURST,
+    HOST_CONCURRENCY,
+    HOST_MAX_RETRY_AFTER,
+    HOST_RATE_LIMIT,
+    HOST_THROTTLE_BACKOFF,
+    RESPECT_ROBOTS_TXT,
+    USER_AGENT,
+)
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def host_key(url: str) -> str:
+    """Normaliseer de host van een URL (lowercase, zonder 'www.')"""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse een Retry-After header (seconden of HTTP datum) naar seconden"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """Eenvoudige token bucket; wachtende requests worden op volgorde bediend"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def set_rate(self, rate: float, capacity: Optional[int] = None):
+        self.rate = max(rate, 1e-6)
+        if capacity is not None:
+            self.capacity = max(capacity, 1)
+            self.tokens = min(self.tokens, self.capacity)
+
+    async def acquire(self) -> float:
+        """Wacht tot er een token is; geeft de wachttijd in seconden terug"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+@dataclass
+class HostState:
+    bucket: TokenBucket
+    semaphore: asyncio.Semaphore
+    paused_until: float = 0.0
+    crawl_delay: Optional[float] = None
+    robots_checked: bool = False
+    robots_lock: Optional[asyncio.Lock] = None
+
+
+@dataclass
+class PolitenessStats:
+    """Tellers voor de politeness laag"""
+    hosts: int = 0
+    throttled_responses: int = 0
+    wait_seconds: float = 0.0
+    robots_crawl_delays: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hosts": self.hosts,
+            "throttled_responses": self.throttled_responses,
+            "wait_seconds": round(self.wait_seconds, 2),
+            "robots_crawl_delays": self.robots_crawl_delays,
+        }
+
+
+class HostLimiter:
+    """
+    Per-host rate limiter.
+
+    `fetch_text` wordt gebruikt om robots.txt op te halen en moet de body als
+    string teruggeven (of None als robots.txt niet beschikbaar is).
+    """
+
+    def __init__(
+        self,
+        fetch_text: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+        rate: float = HOST_RATE_LIMIT,
+        burst: int = HOST_BURST,
+        concurrency: int = HOST_CONCURRENCY,
+    ):
+        self.fetch_text = fetch_text
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = max(1, concurrency)
+        self.stats = PolitenessStats()
+        self._hosts: Dict[str, HostState] = {}
+        # Hosts die via een redirect bij een andere host uitkomen delen diens state
+        self._aliases: Dict[str, str] = {}
+
+    def resolve(self, url: str) -> str:
+        key = host_key(url)
+        return self._aliases.get(key, key)
+
+    def _state(self, key: str) -> HostState:
+        state = self._hosts.get(key)
+        if state is None:
+            state = HostState(
+                bucket=TokenBucket(self.rate, self.burst),
+                semaphore=asyncio.Semaphore(self.concurrency),
+                robots_lock=asyncio.Lock(),
+            )
+            self._hosts[key] = state
+            self.stats.hosts += 1
+        return state
+
+    async def _check_robots(self, state: HostState, url: str):
+        if state.robots_checked or not RESPECT_ROBOTS_TXT or self.fetch_text is None:
+            return
+        async with state.robots_lock:
+            if state.robots_checked:
+                return
+            parts = urlsplit(url)
+            robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+            try:
+                body = await self.fetch_text(robots_url)
+            except Exception as e:
+                logger.debug(f"Kon robots.txt niet ophalen ({robots_url}): {str(e)}")
+                body = None
+            if body:
+                parser = RobotFileParser()
+                parser.parse(body.splitlines())
+                delay = parser.crawl_delay(USER_AGENT)
+                if delay:
+                    state.crawl_delay = float(delay)
+                    state.bucket.set_rate(min(self.rate, 1.0 / state.crawl_delay), capacity=1)
+                    self.stats.robots_crawl_delays += 1
+                    logger.info(f"Crawl-delay van {state.crawl_delay}s voor {parts.netloc} (robots.txt)")
+            state.robots_checked = True
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wacht op een vrije plek voor deze host en houd die vast tijdens het request"""
+        state = self._state(self.resolve(url))
+        await self._check_robots(state, url)
+        async with state.semaphore:
+            pause = state.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                self.stats.wait_seconds += pause
+            self.stats.wait_seconds += await state.bucket.acquire()
+            yield
+
+    def record_response(self, url: str, response) -> Optional[float]:
+        """
+        Verwerk een response: onthoud redirects naar een andere host en pauzeer
+        de host bij 429/503: zo lang als Retry-After vraagt (hoogstens
+        HOST_MAX_RETRY_AFTER), zonder bruikbare header HOST_THROTTLE_BACKOFF.
+        Geeft de wachttijd terug als opnieuw proberen zin heeft, alleen bij
+        een Retry-After binnen het maximum.
+        """
+        requested, final = host_key(url), host_key(str(response.url))
+        if final and final != requested and requested not in self._aliases:
+            self._aliases[requested] = final
+
+        if response.status_code not in THROTTLE_STATUS_CODES:
+            return None
+
+        self.stats.throttled_responses += 1
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        retry = delay is not None and delay <= HOST_MAX_RETRY_AFTER
+        # Ook zonder (of met een te lange) Retry-After de host niet direct weer belasten
+        pause = min(delay, HOST_MAX_RETRY_AFTER) if delay is not None else HOST_THROTTLE_BACKOFF
+
+        state = self._state(self.resolve(url))
+        state.paused_until = max(state.paused_until, time.monotonic() + pause)
+        logger.info(f"{response.status_code} van {final or requested}, host gepauzeerd voor {pause:.0f}s")
+        return delay if retry else None
@@ -0,0 +1,118 @@
+"""
+Server-push van de crawl voortgang naar de admin pagina (Server-Sent Events).
+
+De crawl meldt elke wijziging van `scraping_progress` en elke afgeronde
+gemeente hier; iedere verbonden client krijgt alleen de gewijzigde velden
+als event. Bij het verbinden (en na een overgelopen wachtrij) stuurt de
+server eerst een snapshot van de volledige stand, daarna alleen deltas.
+Tussen events door gaat er alleen een SSE commentaarregel als keepalive
+over de lijn, zodat proxies de verbinding open houden.
+"""
+import asyncio
+import copy
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.config import PROGRESS_KEEPALIVE_SECONDS, PROGRESS_QUEUE_SIZE
+
+# Markeringen in de wachtrij van een client
+_RESYNC = object()
+_CLOSE = object()
+_MISSING = object()
+
+
+@dataclass
+class ProgressStreamStats:
+    """Tellers van de progress stream"""
+    subscribers: int = 0
+    max_subscribers: int = 0
+    events: int = 0
+    resyncs: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "events": self.events,
+            "resyncs": self.resyncs,
+        }
+
+
+def _format_event(event_id: int, event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=str, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class ProgressBroadcaster:
+    """Verdeelt voortgangsevents over de verbonden clients"""
+
+    def __init__(self, queue_size: int = PROGRESS_QUEUE_SIZE):
+        self.queue_size = max(1, queue_size)
+        self.stats = ProgressStreamStats()
+        self._state: Dict[str, Any] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._event_id = 0
+
+    def publish_state(self, state: Dict[str, Any]):
+        """
+        Vergelijk de nieuwe voortgang met de vorige en stuur alleen de
+        gewijzigde velden (verdwenen velden als null). Geen wijziging, geen event.
+        """
+        delta = {key: value for key, value in state.items() if self._state.get(key, _MISSING) != value}
+        delta.update({key: None for key in self._state if key not in state})
+        self._state = copy.deepcopy(state)
+        if delta:
+            self.publish("progress", delta)
+
+    def publish(self, event: str, data: Any):
+        """Stuur een event naar alle clients"""
+        self._event_id += 1
+        self.stats.events += 1
+        message = (self._event_id, event, copy.deepcopy(data))
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Trage client: gooi de achterstand weg en stuur een nieuwe snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_RESYNC)
+                self.stats.resyncs += 1
+
+    def close(self):
+        """Beëindig alle open streams (bij shutdown)"""
+        for queue in self._subscribers:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(_CLOSE)
+
+    def _snapshot(self) -> bytes:
+        return _format_event(self._event_id, "snapshot", self._state)
+
+    async def stream(self, keepalive: Optional[float] = PROGRESS_KEEPALIVE_SECONDS) -> AsyncIterator[bytes]:
+        """Async generator met de SSE berichten voor één client"""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        self.stats.subscribers += 1
+        self.stats.max_subscribers = max(self.stats.max_subscribers, self.stats.subscribers)
+        try:
+            yield b"retry: 5000\n\n" + self._snapshot()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message is _CLOSE:
+                    return
+                if message is _RESYNC:
+                    yield self._snapshot()
+                    continue
+                yield _format_event(*message)
+        finally:
+            self._subscribers.discard(queue)
+            self.stats.subscribers -= 1
+
+
+progress_events = ProgressBroadcaster()
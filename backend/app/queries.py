@@ -0,0 +1,214 @@
+"""
+SQL van de veelgebruikte (hot) queries van de API en de crawl.
+
+De queries staan hier centraal zodat `python -m app.migrations --check` met
+EXPLAIN QUERY PLAN precies dezelfde SQL controleert die de handlers draaien.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Kolommen van een vacature zoals de API ze teruggeeft (in deze volgorde)
+VACANCY_COLUMNS = (
+    "id", "municipality_id", "title", "description", "function_category",
+    "education_level", "url", "publication_date", "found_date", "first_seen", "last_seen",
+    "municipality_name",
+)
+
+VACANCIES_SQL = '''
+    SELECT v.id, v.municipality_id, v.title, v.description, v.function_category,
+           v.education_level, v.url, v.publication_date, v.found_date, v.first_seen, v.last_seen,
+           m.name AS municipality_name
+    FROM vacancies v
+    JOIN municipalities m ON v.municipality_id = m.id
+    ORDER BY v.found_date DESC, v.id DESC
+'''
+
+# Keyset paginering van /api/vacancies: altijd gesorteerd op (found_date, id)
+# aflopend, met de laatste (found_date, id) van de vorige pagina als cursor
+VACANCY_PAGE_SELECT = '''
+    SELECT v.id, v.municipality_id, v.title, v.description, v.function_category,
+           v.education_level, v.url, v.publication_date, v.found_date, v.first_seen, v.last_seen,
+           m.name AS municipality_name
+    FROM vacancies v
+    JOIN municipalities m ON v.municipality_id = m.id
+'''
+
+# Filters die als gelijkheid op een kolom werken (elk met een eigen index)
+VACANCY_FILTER_COLUMNS = ("municipality_id", "function_category", "education_level")
+
+
+def encode_cursor(found_date: str, vacancy_id: int) -> str:
+    """Maak een opaque cursor van de laatste rij van een pagina"""
+    raw = json.dumps([found_date, vacancy_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Lees een cursor terug; ValueError bij een ongeldige cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        found_date, vacancy_id = json.loads(raw)
+    except Exception:
+        raise ValueError("ongeldige cursor")
+    if not isinstance(found_date, str) or not isinstance(vacancy_id, int):
+        raise ValueError("ongeldige cursor")
+    return found_date, vacancy_id
+
+
+def vacancy_page_query(
+    limit: int,
+    cursor: Optional[Tuple[str, int]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    found_from: Optional[str] = None,
+    found_before: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Bouw de SQL en parameters voor één pagina vacatures. De WHERE clause
+    bestaat alleen uit index-vriendelijke vergelijkingen, zodat de kosten per
+    pagina niet met de tabelgrootte meegroeien.
+    """
+    clauses = []
+    params: List[Any] = []
+    for column, value in (filters or {}).items():
+        if column not in VACANCY_FILTER_COLUMNS:
+            raise ValueError(f"onbekend filter: {column}")
+        if value is not None:
+            clauses.append(f"v.{column} = ?")
+            params.append(value)
+    if found_from is not None:
+        clauses.append("v.found_date >= ?")
+        params.append(found_from)
+    if found_before is not None:
+        clauses.append("v.found_date < ?")
+        params.append(found_before)
+    if cursor is not None:
+        clauses.append("(v.found_date, v.id) < (?, ?)")
+        params.extend(cursor)
+
+    sql = VACANCY_PAGE_SELECT
+    if clauses:
+        sql += "    WHERE " + " AND ".join(clauses) + "\n"
+    sql += "    ORDER BY v.found_date DESC, v.id DESC\n    LIMIT ?\n"
+    params.append(limit)
+    return sql, params
+
+
+# Export van alle vacatures, oplopend op (last_seen, id); met `since` alleen
+# de vacatures die sindsdien nog (of voor het eerst) gezien zijn
+def vacancy_export_query(since: Optional[str] = None) -> Tuple[str, List[Any]]:
+    sql = VACANCY_PAGE_SELECT
+    params: List[Any] = []
+    if since is not None:
+        sql += "    WHERE v.last_seen >= ?\n"
+        params.append(since)
+    sql += "    ORDER BY v.last_seen, v.id\n"
+    return sql, params
+
+
+# Aantal vacatures per gemeente (kaart) en de waarden voor de filters
+VACANCY_COUNTS_SQL = '''
+    SELECT municipality_id, COUNT(*) FROM vacancies GROUP BY municipality_id
+'''
+
+FUNCTION_CATEGORIES_SQL = '''
+    SELECT DISTINCT function_category FROM vacancies
+    WHERE function_category IS NOT NULL ORDER BY function_category
+'''
+
+EDUCATION_LEVELS_SQL = '''
+    SELECT DISTINCT education_level FROM vacancies
+    WHERE education_level IS NOT NULL ORDER BY education_level
+'''
+
+LOGS_SQL = '''
+    SELECT
+        sr.municipality_id,
+        m.name as municipality_name,
+        sr.success,
+        sr.error_message,
+        sr.urls_found,
+        sr.scrape_date
+    FROM scrape_results sr
+    JOIN municipalities m ON sr.municipality_id = m.id
+    ORDER BY sr.scrape_date DESC
+    LIMIT 50
+'''
+
+# /api/stats: één rij uit de voorberekende global_stats tabel (migratie 6).
+# Vacature- en resultaattellers worden door triggers bijgehouden, de
+# gemeentetellers door de last_scraped trigger en REFRESH_MUNICIPALITY_TOTALS_SQL
+GLOBAL_STATS_SQL = '''
+    SELECT total_municipalities, scraped_municipalities, last_scrape_time,
+           total_vacancies, success_count, error_count
+    FROM global_stats
+    WHERE id = 1
+'''
+
+# Na het toevoegen of vervangen van gemeenten (CSV import, bulk opslaan);
+# INSERT OR REPLACE vuurt geen DELETE trigger, dus hier opnieuw tellen
+REFRESH_MUNICIPALITY_TOTALS_SQL = '''
+    UPDATE global_stats
+    SET (total_municipalities, scraped_municipalities, last_scrape_time) = (
+            SELECT COUNT(*), COUNT(last_scraped), MAX(last_scraped) FROM municipalities
+        ),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1
+'''
+
+# Begin van een crawl run: success_count/error_count tellen per run
+RESET_RUN_COUNTS_SQL = '''
+    UPDATE global_stats
+    SET success_count = 0, error_count = 0, updated_at = CURRENT_TIMESTAMP
+    WHERE id = 1
+'''
+
+# success_rate uit de tellers in municipality_stats (bijgewerkt door de
+# trigger op scrape_results) in plaats van over de hele historie te aggregeren
+SUCCESS_RATE_SQL = '''
+    UPDATE municipalities
+    SET success_rate = (
+            SELECT success_count * 100.0 / scrape_count
+            FROM municipality_stats
+            WHERE municipality_id = ? AND scrape_count > 0
+        )
+    WHERE id = ?
+'''
+
+# Afgeronde crawl runs (app/runs.py), nieuwste eerst
+RUN_COLUMNS = (
+    "id", "trigger", "status", "created_at", "started_at", "finished_at", "error",
+    "total", "successful", "failed", "vacancies_found",
+    "queue_wait_seconds", "fetch_seconds", "parse_seconds", "write_seconds", "stats",
+)
+
+CRAWL_RUNS_SQL = f'''
+    SELECT {", ".join(RUN_COLUMNS)} FROM crawl_runs
+    ORDER BY started_at DESC
+    LIMIT ?
+'''
+
+CRAWL_RUN_SQL = f'SELECT {", ".join(RUN_COLUMNS)} FROM crawl_runs WHERE id = ?'
+
+# Naam -> (sql, voorbeeld parameters) voor de query plan check
+HOT_QUERIES = {
+    "vacancies": (VACANCIES_SQL, ()),
+    "vacancy_page": vacancy_page_query(50),
+    "vacancy_page_cursor": vacancy_page_query(50, cursor=("2024-01-01 00:00:00", 1000)),
+    "vacancy_page_municipality": vacancy_page_query(
+        50, cursor=("2024-01-01 00:00:00", 1000), filters={"municipality_id": "GM0363"}),
+    "vacancy_page_category": vacancy_page_query(50, filters={"function_category": "ICT"}),
+    "vacancy_page_education": vacancy_page_query(50, filters={"education_level": "HBO"}),
+    "vacancy_page_dates": vacancy_page_query(50, found_from="2024-01-01", found_before="2024-02-01"),
+    "vacancy_export": vacancy_export_query(),
+    "vacancy_export_since": vacancy_export_query("2024-01-01 00:00:00"),
+    "vacancy_counts": (VACANCY_COUNTS_SQL, ()),
+    "function_categories": (FUNCTION_CATEGORIES_SQL, ()),
+    "education_levels": (EDUCATION_LEVELS_SQL, ()),
+    "logs": (LOGS_SQL, ()),
+    "global_stats": (GLOBAL_STATS_SQL, ()),
+    "refresh_municipality_totals": (REFRESH_MUNICIPALITY_TOTALS_SQL, ()),
+    "success_rate": (SUCCESS_RATE_SQL, ("GM0363", "GM0363")),
+    "crawl_runs": (CRAWL_RUNS_SQL, (20,)),
+    "crawl_run": (CRAWL_RUN_SQL, ("0123456789ab",)),
+}
@@ -0,0 +1,133 @@
+"""
+In-process cache voor de JSON responses van de lees-endpoints.
+
+De data achter /api/municipalities, /api/vacancies en /api/stats verandert
+alleen als een crawl (of een admin wijziging) iets commit. De responses
+worden daarom per URL (pad + query) geserialiseerd bewaard, met een TTL als
+vangnet en een maximum aantal entries (LRU). Elke commit van de database
+writer maakt de cache leeg.
+
+Elke response krijgt een ETag (hash van de body); een client die die
+meestuurt in If-None-Match krijgt een 304 zonder body.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from app.config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+@dataclass
+class ResponseCacheStats:
+    """Tellers van de response cache"""
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Zwakke vergelijking: W/"x" en "x" zijn voor een GET gelijk
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """TTL + LRU cache van geserialiseerde JSON responses"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = ResponseCacheStats()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generation = 0
+
+    def invalidate(self):
+        """Gooi alle entries weg (na een commit met nieuwe data)"""
+        self._generation += 1
+        self._entries.clear()
+        self.stats.invalidations += 1
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, entry: CachedResponse):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def respond(self, request: Request, compute: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Geef de (gecachte) JSON response voor dit request, of een 304 als de
+        client de actuele ETag al heeft. `compute` levert de data bij een miss.
+        """
+        key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        entry = self._get(key)
+        if entry is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            generation = self._generation
+            data = await compute()
+            body = json.dumps(
+                jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+            entry = CachedResponse(body, _etag(body), time.monotonic() + self.ttl)
+            # Een invalidatie tijdens het berekenen maakt dit resultaat mogelijk verouderd
+            if generation == self._generation:
+                self._put(key, entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), entry.etag):
+            self.stats.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,212 @@
+"""
+Crawl runs: één object per run in plaats van module-level globals.
+
+Er draait hoogstens één crawl tegelijk. Een tweede start geeft een
+RunActiveError (de API maakt daar een 409 van), of wordt met queue=True
+achter de actieve run gezet. Er staat hoogstens één run in de wachtrij;
+nog een start met queue=True geeft die wachtende run terug, zodat een
+cron job die vaker start dan een crawl duurt geen stapel runs oplevert.
+
+Afgeronde runs worden met hun tijdsverdeling (wachtrij, fetch, parse,
+write) in de crawl_runs tabel bewaard en blijven zo na een herstart
+opvraagbaar.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.database import connect, read_db
+from app.progress import progress_events
+from app.queries import CRAWL_RUN_SQL, CRAWL_RUNS_SQL, RUN_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class RunActiveError(Exception):
+    """Er draait al een crawl"""
+
+    def __init__(self, run: "CrawlRun"):
+        super().__init__(f"Crawl run {run.id} is al actief")
+        self.run = run
+
+
+@dataclass
+class CrawlRun:
+    """Status, voortgang en tijdsverdeling van één crawl run"""
+    trigger: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"  # queued, running, completed, error, cancelled
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, Any] = field(default_factory=dict)
+
+    def update(self, **changes):
+        """Werk de voortgang bij en stuur de gewijzigde velden naar /api/admin/events"""
+        self.progress.update(changes)
+        self.publish()
+
+    def publish(self):
+        progress_events.publish_state({**self.progress, "run_id": self.id, "status": self.status})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "progress": self.progress,
+            "timings": self.timings,
+        }
+
+
+CrawlJob = Callable[[CrawlRun], Awaitable[None]]
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    run = dict(zip(RUN_COLUMNS, row))
+    run["stats"] = json.loads(run["stats"]) if run["stats"] else None
+    return run
+
+
+class CrawlRunManager:
+    """Start crawl runs, met hoogstens één actieve en één wachtende run"""
+
+    def __init__(self):
+        self.active: Optional[CrawlRun] = None
+        self.queued: Optional[CrawlRun] = None
+        self.last: Optional[CrawlRun] = None
+        self._queued_job: Optional[CrawlJob] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done: Dict[str, asyncio.Event] = {}
+
+    @property
+    def current(self) -> Optional[CrawlRun]:
+        """De actieve run, anders de wachtende, anders de laatst afgeronde"""
+        return self.active or self.queued or self.last
+
+    def start(self, job: CrawlJob, trigger: str, queue: bool = False) -> CrawlRun:
+        """
+        Start `job` als nieuwe run. Draait er al een run, dan volgt een
+        RunActiveError, of met queue=True een (gedeelde) wachtende run.
+        """
+        if self.active is None:
+            run = CrawlRun(trigger=trigger)
+            self._done[run.id] = asyncio.Event()
+            self._launch(run, job)
+            return run
+        if not queue:
+            raise RunActiveError(self.active)
+        if self.queued is None:
+            self.queued = CrawlRun(trigger=trigger)
+            self._queued_job = job
+            self._done[self.queued.id] = asyncio.Event()
+            logger.info(f"Crawl run {self.queued.id} ({trigger}) wacht op run {self.active.id}")
+        return self.queued
+
+    async def wait(self, run: CrawlRun) -> CrawlRun:
+        """Wacht tot een run (actief of wachtend) klaar is"""
+        done = self._done.get(run.id)
+        if done is not None:
+            await done.wait()
+        return run
+
+    def _launch(self, run: CrawlRun, job: CrawlJob):
+        self.active = run
+        run.status = "running"
+        run.started_at = datetime.now()
+        run.publish()
+        logger.info(f"Crawl run {run.id} gestart ({run.trigger})")
+        self._task = asyncio.create_task(self._execute(run, job))
+
+    async def _execute(self, run: CrawlRun, job: CrawlJob):
+        try:
+            await job(run)
+            run.status = "completed"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            run.error = "afgebroken"
+        except Exception as e:
+            logger.error(f"Crawl run {run.id} mislukt: {str(e)}")
+            run.status = "error"
+            run.error = str(e)
+        finally:
+            run.finished_at = datetime.now()
+            run.publish()
+            try:
+                await self._save(run)
+            except Exception as e:
+                logger.error(f"Kon crawl run {run.id} niet opslaan: {str(e)}")
+            self.last = run
+            self.active = None
+            self._done.pop(run.id).set()
+            logger.info(f"Crawl run {run.id} klaar: {run.status}")
+
+            if self.queued is not None and run.status != "cancelled":
+                queued, job = self.queued, self._queued_job
+                self.queued = self._queued_job = None
+                self._launch(queued, job)
+
+    async def _save(self, run: CrawlRun):
+        progress = run.progress
+        db = await connect()
+        try:
+            await db.execute(f'''
+                INSERT OR REPLACE INTO crawl_runs ({", ".join(RUN_COLUMNS)})
+                VALUES ({", ".join("?" for _ in RUN_COLUMNS)})
+            ''', (
+                run.id, run.trigger, run.status,
+                run.created_at.isoformat(sep=" "),
+                run.started_at.isoformat(sep=" ") if run.started_at else None,
+                run.finished_at.isoformat(sep=" ") if run.finished_at else None,
+                run.error,
+                progress.get("total", 0),
+                progress.get("successful", 0),
+                progress.get("failed", 0),
+                progress.get("vacancies_found", 0),
+                run.timings.get("queue_wait_seconds"),
+                run.timings.get("fetch_seconds"),
+                run.timings.get("parse_seconds"),
+                run.timings.get("write_seconds"),
+                json.dumps({"timings": run.timings, "throughput": progress.get("throughput")}, default=str),
+            ))
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def shutdown(self):
+        """Breek de actieve run af en laat de wachtende vallen (bij shutdown)"""
+        if self.queued is not None:
+            self._done.pop(self.queued.id).set()
+        self.queued = self._queued_job = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def history(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """De laatste afgeronde runs uit crawl_runs, nieuwste eerst"""
+        async with read_db() as db:
+            async with db.execute(CRAWL_RUNS_SQL, (limit,)) as cursor:
+                return [_row_to_dict(row) for row in await cursor.fetchall()]
+
+    async def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Een run: de actieve of wachtende uit het geheugen, anders uit crawl_runs"""
+        for run in (self.active, self.queued):
+            if run is not None and run.id == run_id:
+                return run.as_dict()
+        async with read_db() as db:
+            async with db.execute(CRAWL_RUN_SQL, (run_id,)) as cursor:
+                row = await cursor.fetchone()
+        return _row_to_dict(row) if row else None
+
+
+crawl_runs = CrawlRunManager()
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark van de vacature link/tekst classificatie (zie app/classifier.py).
+
+Vergelijkt de oude aanpak (`any(keyword in s.lower() for keyword in [...])`
+per link en per tekstfragment), een case-insensitive regex alternation en de
+KeywordMatcher, op de links en teksten van het parser corpus. Rapporteert de
+kosten per pagina.
+
+Gebruik (vanuit de backend directory):
+
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --corpus /pad/naar/html --rounds 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+from bench_parsers import DEFAULT_CORPUS, load_corpus, synthetic_page
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.classifier import get_matcher  # noqa: E402
+from app.extraction import VACANCY_LINK_KEYWORDS, VACANCY_TEXT_KEYWORDS  # noqa: E402
+from app.parsers import get_parser  # noqa: E402
+
+
+def classify_old(hrefs, strings):
+    found = 0
+    for href in hrefs:
+        if any(keyword in href.lower() for keyword in ['vacature', 'vacancy', 'werken-bij', 'werkenbij', 'jobs', 'careers']):
+            found += 1
+    for text in strings:
+        if any(keyword in text.lower() for keyword in ['vacature', 'vacancy', 'sollicitatie', 'werken bij']):
+            found += 1
+    return found
+
+
+LINK_REGEX = re.compile("|".join(map(re.escape, VACANCY_LINK_KEYWORDS)), re.IGNORECASE)
+TEXT_REGEX = re.compile("|".join(map(re.escape, VACANCY_TEXT_KEYWORDS)), re.IGNORECASE)
+
+
+def classify_regex(hrefs, strings):
+    found = 0
+    for href in hrefs:
+        if LINK_REGEX.search(href):
+            found += 1
+    for text in strings:
+        if TEXT_REGEX.search(text):
+            found += 1
+    return found
+
+
+def classify_matcher(hrefs, strings):
+    link_matcher = get_matcher(VACANCY_LINK_KEYWORDS)
+    text_matcher = get_matcher(VACANCY_TEXT_KEYWORDS)
+    found = 0
+    for href in hrefs:
+        if link_matcher.matches(href):
+            found += 1
+    for text in strings:
+        if text_matcher.matches(text):
+            found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory met *.html bestanden")
+    parser.add_argument("--rounds", type=int, default=20, help="aantal keer dat het corpus geclassificeerd wordt")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    if not pages:
+        print(f"Geen corpus gevonden in {args.corpus}, gebruik synthetische pagina's")
+        pages = [synthetic_page(i) for i in range(20)]
+
+    # Parsen valt buiten de meting; alleen de classificatie telt
+    html_parser = get_parser()
+    prepared = []
+    for html in pages:
+        hrefs = [href for href, _ in html_parser.extract_links(html)]
+        prepared.append((hrefs, html_parser.extract_strings(html)))
+
+    items = sum(len(h) + len(s) for h, s in prepared)
+    print(f"{len(pages)} pagina's, gemiddeld {items // len(pages)} links+teksten per pagina, {args.rounds} rondes\n")
+    print(f"{'methode':<10} {'µs/pagina':>10} {'matches':>8}")
+
+    for name, classify in (("any()", classify_old), ("regex", classify_regex), ("matcher", classify_matcher)):
+        found = 0
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for hrefs, strings in prepared:
+                found += classify(hrefs, strings)
+        elapsed = time.perf_counter() - started
+        per_page = elapsed / (args.rounds * len(prepared)) * 1e6
+        print(f"{name:<10} {per_page:>10.1f} {found // args.rounds:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark van de HTML parser backends (zie app/parsers.py).
+
+Draait elke beschikbare backend over een corpus van opgeslagen gemeentelijke
+vacaturepagina's en rapporteert pagina's per seconde en piekgeheugen. Elke
+backend draait in een eigen proces, zodat het piekgeheugen niet vermengd raakt.
+
+Gebruik (vanuit de backend directory):
+
+    python benchmarks/bench_parsers.py                    # corpus in benchmarks/corpus
+    python benchmarks/bench_parsers.py --corpus /pad/naar/html --rounds 5
+    python benchmarks/bench_parsers.py --fetch            # vul het corpus eerst vanuit municipalities.py
+
+Zonder corpus worden synthetische pagina's gegenereerd.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+def synthetic_page(index: int, links: int = 400) -> str:
+    """Een vacaturepagina-achtige pagina met navigatie, scripts en veel links"""
+    nav = "".join(f'<li><a href="/menu/{i}">Menu item {i}</a></li>' for i in range(60))
+    items = "".join(
+        f'<div class="vacancy-item"><h2><a href="/vacatures/{index}-{i}">Beleidsmedewerker &amp; adviseur {i}</a></h2>'
+        f'<div class="description"><p>Werken bij de gemeente? Solliciteer voor functie {i}.</p></div></div>'
+        for i in range(links)
+    )
+    script = "<script>window.__STATE__ = {" + ",".join(f'"k{i}": {i}' for i in range(500)) + "};</script>"
+    return (
+        f"<!DOCTYPE html><html><head><title>Vacatures {index}</title>{script}</head>"
+        f"<body><nav><ul>{nav}</ul></nav><main>{items}</main><footer>Gemeente {index}</footer></body></html>"
+    )
+
+
+def load_corpus(path: str):
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(path, "*.html"))):
+        with open(filename, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def fetch_corpus(path: str):
+    """Sla de huidige vacaturepagina's uit het gemeenten register (municipalities.csv) op in het corpus"""
+    import httpx
+    from app.config import USER_AGENT
+    from app.municipalities import registry
+
+    os.makedirs(path, exist_ok=True)
+    with httpx.Client(timeout=30.0, follow_redirects=True, headers={"User-Agent": USER_AGENT}) as client:
+        for municipality in registry.all():
+            url = municipality.vacancy_url
+            if not url:
+                continue
+            try:
+                response = client.get(url)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"  overgeslagen {municipality.name}: {e}")
+                continue
+            filename = os.path.join(path, f"{municipality.id}.html")
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(response.text)
+            print(f"  opgeslagen {municipality.name} ({len(response.text)} tekens)")
+
+
+def run_backend(name: str, pages, rounds: int, strings: bool):
+    """Draai één backend (in een apart proces) en geef de meetresultaten terug"""
+    from app.parsers import available_backends
+
+    backend = available_backends()[name]
+    backend.extract_links(pages[0])  # warm-up (imports, caches)
+
+    def parse_all() -> int:
+        found = 0
+        for html in pages:
+            found += len(backend.extract_links(html))
+            if strings:
+                backend.extract_strings(html)
+        return found
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    links = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        links += parse_all()
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Geheugen in een aparte ronde: tracemalloc vertraagt elke Python allocatie,
+    # dus tijdens de tijdmeting zou het de pure Python backends oneerlijk afremmen
+    tracemalloc.start()
+    parse_all()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "backend": name,
+        "pages": len(pages) * rounds,
+        "seconds": elapsed,
+        "links": links // rounds,
+        "python_peak_kb": python_peak // 1024,
+        "rss_growth_kb": max(rss_after - rss_before, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory met *.html bestanden")
+    parser.add_argument("--rounds", type=int, default=3, help="aantal keer dat het corpus geparsed wordt")
+    parser.add_argument("--backend", action="append", help="alleen deze backend(s) draaien")
+    parser.add_argument("--strings", action="store_true", help="ook de tekst-fallback (extract_strings) meten")
+    parser.add_argument("--fetch", action="store_true", help="corpus eerst vullen vanuit municipalities.py")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_corpus(args.corpus)
+
+    pages = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    if not pages:
+        print(f"Geen corpus gevonden in {args.corpus}, gebruik synthetische pagina's")
+        pages = [synthetic_page(i) for i in range(20)]
+
+    from app.parsers import available_backends
+    names = args.backend or list(available_backends())
+
+    total_kb = sum(len(p) for p in pages) // 1024
+    print(f"{len(pages)} pagina's ({total_kb} KB), {args.rounds} rondes\n")
+    print(f"{'backend':<12} {'pagina/s':>10} {'ms/pagina':>10} {'links':>8} {'py piek KB':>11} {'RSS+ KB':>9}")
+
+    # Elke backend in een vers proces, zodat ru_maxrss per backend klopt
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_backend, name, pages, args.rounds, args.strings).result()
+        per_second = result["pages"] / result["seconds"]
+        print(
+            f"{result['backend']:<12} {per_second:>10.1f} {1000 / per_second:>10.2f} "
+            f"{result['links']:>8} {result['python_peak_kb']:>11} {result['rss_growth_kb']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Site adapters op opgenomen feeds en pagina's (tests/fixtures/adapters).
+Draaien vanuit backend/: python -m pytest tests
+"""
+from pathlib import Path
+
+import pytest
+
+from app.adapters import adapters
+from app.adapters.amsterdam import AmsterdamAdapter
+from app.adapters.ats import (
+    GreenhouseAdapter,
+    LeverAdapter,
+    PersonioAdapter,
+    RecruiteeAdapter,
+    SmartRecruitersAdapter,
+    WorkableAdapter,
+)
+from app.adapters.regional import RegionalBoardAdapter
+
+FIXTURES = Path(__file__).parent / "fixtures" / "adapters"
+
+
+def _parse(adapter, fixture: str, url: str) -> dict:
+    return adapter.parse((FIXTURES / fixture).read_text(encoding="utf-8"), url)
+
+
+@pytest.mark.parametrize("url, name, feed_url", [
+    ("https://acme.recruitee.com/", "recruitee", "https://acme.recruitee.com/api/offers/"),
+    ("https://boards.greenhouse.io/acme", "greenhouse",
+     "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true"),
+    ("https://jobs.lever.co/acme", "lever", "https://api.lever.co/v0/postings/acme?mode=json"),
+    ("https://jobs.smartrecruiters.com/acme", "smartrecruiters",
+     "https://api.smartrecruiters.com/v1/companies/acme/postings?limit=100&offset=0"),
+    ("https://apply.workable.com/acme/", "workable", "https://apply.workable.com/api/v1/widget/accounts/acme"),
+    ("https://acme.jobs.personio.de/", "personio", "https://acme.jobs.personio.de/xml?language=nl"),
+    ("https://www.werkeningelderland.nl/organisatie/gemeente-aalten", "regional",
+     "https://www.werkeningelderland.nl/organisatie/gemeente-aalten"),
+    ("https://www.amsterdam.nl/werkenbij/", "amsterdam", "https://www.amsterdam.nl/werkenbij/"),
+])
+def test_registry_maps_host_to_adapter(url, name, feed_url):
+    adapter = adapters.for_url(url)
+    assert adapter.name == name
+    assert adapter.feed_url(url) == feed_url
+
+
+def test_registry_without_adapter():
+    assert adapters.for_url("https://www.utrecht.nl/werken-bij/") is None
+
+
+def test_recruitee():
+    page = _parse(RecruiteeAdapter(), "recruitee.json", "https://acme.recruitee.com/api/offers/")
+    assert page["vacancy_links"] == [{
+        "url": "https://acme.recruitee.com/o/medewerker-ict",
+        "title": "Medewerker ICT",
+        "description": "Je beheert de werkplekken van de gemeente.",
+        "publication_date": "2024-01-10 09:12:34",
+        "function_category": "ICT",
+        "education_level": "HBO",
+    }]
+
+
+def test_greenhouse():
+    page = _parse(GreenhouseAdapter(), "greenhouse.json",
+                  "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    assert page["vacancy_links"] == [{
+        "url": "https://boards.greenhouse.io/acme/jobs/4012345",
+        "title": "Data Engineer",
+        "description": "Bouw onze datapijplijnen.",
+        "publication_date": "2024-01-10 14:12:34",
+        "function_category": "Engineering",
+    }]
+
+
+def test_lever():
+    page = _parse(LeverAdapter(), "lever.json", "https://api.lever.co/v0/postings/acme?mode=json")
+    assert page["vacancy_links"] == [{
+        "url": "https://jobs.lever.co/acme/5c0b1d2e-aaaa-bbbb-cccc-000000000001",
+        "title": "Accountmanager",
+        "description": "Je onderhoudt de relaties met klanten.",
+        "publication_date": "2024-01-10 09:25:54",
+        "function_category": "Sales",
+    }]
+
+
+def test_smartrecruiters_paginates():
+    page = _parse(SmartRecruitersAdapter(), "smartrecruiters.json",
+                  "https://api.smartrecruiters.com/v1/companies/acme/postings?limit=1&offset=0")
+    assert page["vacancy_links"] == [{
+        "url": "https://jobs.smartrecruiters.com/acme/744000012345678",
+        "title": "Beleidsadviseur",
+        "publication_date": "2024-01-10 09:12:34",
+        "function_category": "Consulting",
+    }]
+    assert page["next_pages"] == ["https://api.smartrecruiters.com/v1/companies/acme/postings?limit=1&offset=1"]
+
+
+def test_workable():
+    page = _parse(WorkableAdapter(), "workable.json", "https://apply.workable.com/api/v1/widget/accounts/acme")
+    assert page["vacancy_links"] == [{
+        "url": "https://apply.workable.com/j/A1B2C3D4E5",
+        "title": "Marketeer",
+        "publication_date": "2024-01-10 00:00:00",
+        "function_category": "Marketing",
+        "education_level": "HBO",
+    }]
+
+
+def test_personio():
+    page = _parse(PersonioAdapter(), "personio.xml", "https://acme.jobs.personio.de/xml?language=nl")
+    assert page["vacancy_links"] == [{
+        "url": "https://acme.jobs.personio.de/job/1234567",
+        "title": "Controller",
+        "description": "Je stelt de jaarrekening op.\n\nEen cijferaar.",
+        "publication_date": "2024-01-10 09:12:34",
+        "function_category": "Financiën",
+    }]
+
+
+def test_feeds_with_details_skip_the_detail_stage():
+    complete = {adapter.name for adapter in (RecruiteeAdapter(), GreenhouseAdapter(), LeverAdapter(),
+                                             SmartRecruitersAdapter(), WorkableAdapter(), PersonioAdapter())
+                if adapter.provides_details}
+    assert complete == {"recruitee", "greenhouse", "lever", "personio"}
+
+
+def test_regional_board_json_ld():
+    url = "https://www.werkeningelderland.nl/organisatie/gemeente-aalten"
+    page = _parse(RegionalBoardAdapter(), "regional.html", url)
+    assert page["vacancy_links"] == [
+        {
+            "url": "https://www.werkeningelderland.nl/vacature/beleidsmedewerker-wonen-aalten",
+            "title": "Beleidsmedewerker wonen",
+            "description": "Je werkt aan de woonvisie.",
+            "publication_date": "2024-01-10 00:00:00",
+            "function_category": "Beleid",
+            "education_level": "HBO",
+        },
+        {"url": "https://www.werkeningelderland.nl/vacature/toezichthouder-aalten", "title": "Toezichthouder"},
+    ]
+    assert page["next_pages"] == [f"{url}?page=2"]
+
+
+def test_regional_board_links_without_json_ld():
+    page = _parse(RegionalBoardAdapter(), "regional_links.html",
+                  "https://www.werkeninfriesland.nl/organisaties/11/gemeente-achtkarspelen")
+    # Geen menu, alert, zoekpagina of andere site
+    assert page["vacancy_links"] == [
+        {"url": "https://www.werkeninfriesland.nl/vacatures/medewerker-burgerzaken", "title": "Medewerker burgerzaken"},
+        {"url": "https://www.werkeninfriesland.nl/vacatures/jurist-ro/", "title": "Jurist RO"},
+    ]
+
+
+def test_amsterdam():
+    url = "https://www.amsterdam.nl/werkenbij/vacatures/"
+    page = _parse(AmsterdamAdapter(), "amsterdam.html", url)
+    assert page["vacancy_links"] == [
+        {
+            "url": "https://www.amsterdam.nl/werkenbij/vacatures/projectleider-bruggen/",
+            "title": "Projectleider Bruggen",
+            "description": "Je leidt de renovatie van de kademuren en bruggen.",
+        },
+        {"url": "https://www.amsterdam.nl/werkenbij/vacatures/handhaver/", "title": "Handhaver Openbare Ruimte"},
+    ]
+    assert page["next_pages"] == [f"{url}?page=2"]
@@ -0,0 +1,28 @@
+"""
+Query plans van de hot queries op een verse database. Draaien vanuit
+backend/: python -m pytest tests
+"""
+import asyncio
+
+import aiosqlite
+
+from app.database import apply_pragmas
+from app.migrations import MIGRATIONS, check_query_plans, create_base_tables, migrate, schema_version
+
+
+async def _check(path: str):
+    db = await aiosqlite.connect(path)
+    try:
+        await apply_pragmas(db)
+        await create_base_tables(db)
+        await db.commit()
+        await migrate(db)
+        return await schema_version(db), await check_query_plans(db)
+    finally:
+        await db.close()
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    version, problems = asyncio.run(_check(str(tmp_path / "scraper.db")))
+    assert version == MIGRATIONS[-1][0]
+    assert problems == []
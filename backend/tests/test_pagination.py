@@ -0,0 +1,61 @@
+"""
+Paginering van een vacaturelijst: alleen echte vacatures, geen links naar
+pagina's van de lijst zelf. Draaien vanuit backend/: python -m pytest tests
+"""
+from app.extraction import process_page
+from app.pagination import ListingCrawl
+
+LISTING_URL = "https://x.nl/vacatures"
+
+PAGE_1 = b"""<html><body>
+<a href="/vacatures/beleidsmedewerker-wonen">Beleidsmedewerker wonen</a>
+<a href="/vacatures/adviseur-ruimtelijke-ordening">Adviseur ruimtelijke ordening</a>
+<a href="/vacatures?page=2">2</a>
+<a href="/vacatures?page=2">Volgende</a>
+</body></html>"""
+
+PAGE_2 = b"""<html><body>
+<a href="/vacatures/jurist-omgevingsrecht">Jurist omgevingsrecht</a>
+<a href="/vacatures?page=1">1</a>
+<a href="/vacatures?page=3">3</a>
+<a href="/vacatures?page=3">Volgende</a>
+</body></html>"""
+
+
+def _page(body: bytes, url: str) -> dict:
+    return {**process_page(body, "utf-8", url), "current_url": url, "bytes": len(body)}
+
+
+def test_two_page_listing_only_yields_vacancies():
+    crawl = ListingCrawl(LISTING_URL, _page(PAGE_1, LISTING_URL))
+    assert crawl.next_batch() == ["https://x.nl/vacatures?page=2"]
+    crawl.add(_page(PAGE_2, "https://x.nl/vacatures?page=2"))
+
+    result = crawl.result()
+    assert sorted(vacancy["url"] for vacancy in result["vacancy_links"]) == [
+        "https://x.nl/vacatures/adviseur-ruimtelijke-ordening",
+        "https://x.nl/vacatures/beleidsmedewerker-wonen",
+        "https://x.nl/vacatures/jurist-omgevingsrecht",
+    ]
+    assert crawl.next_batch() == ["https://x.nl/vacatures?page=3"]
+
+
+def test_text_fallback_on_first_page_is_kept():
+    body = b"""<html><body>
+<p>Vacature beleidsmedewerker wonen</p>
+<p>Vacature jurist omgevingsrecht</p>
+</body></html>"""
+    crawl = ListingCrawl(LISTING_URL, _page(body, LISTING_URL))
+    assert [vacancy["title"] for vacancy in crawl.result()["vacancy_links"]] == [
+        "Vacature beleidsmedewerker wonen",
+        "Vacature jurist omgevingsrecht",
+    ]
+
+
+def test_wordpress_permalink_is_not_a_page():
+    body = b"""<html><body>
+<a href="/vacatures/?p=123">Beleidsmedewerker</a>
+<a href="/vacatures/?paged=2">2</a>
+</body></html>"""
+    crawl = ListingCrawl("https://x.nl/vacatures/", _page(body, "https://x.nl/vacatures/"))
+    assert [vacancy["url"] for vacancy in crawl.result()["vacancy_links"]] == ["https://x.nl/vacatures/?p=123"]
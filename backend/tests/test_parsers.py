@@ -0,0 +1,32 @@
+"""
+Alle beschikbare parser backends geven dezelfde links. Draaien vanuit
+backend/: python -m pytest tests
+"""
+import pytest
+
+from app.parsers import available_backends
+
+UNCLOSED = (
+    '<p><a href="/vacatures/1">Eerste<a href="/vacatures/2">Tweede</a> '
+    '<a name="anker">Anker<a href="/vacatures/3">Derde</a></p>'
+    '<a href="/vacatures/4">Vierde'
+)
+
+
+@pytest.mark.parametrize("name", [name for name in available_backends() if name != "html.parser"])
+def test_new_link_closes_an_open_link(name):
+    # html.parser (BeautifulSoup) nest de tekst van volgende links in de eerste
+    assert available_backends()[name].extract_links(UNCLOSED) == [
+        ("/vacatures/1", "Eerste"),
+        ("/vacatures/2", "Tweede"),
+        ("/vacatures/3", "Derde"),
+        ("/vacatures/4", "Vierde"),
+    ]
+
+
+@pytest.mark.parametrize("name", list(available_backends()))
+def test_links_and_strings(name):
+    html = '<ul><li><a href="/a">Vacature A</a> <b>nieuw</b></li><script>var x = "<a href=/x>";</script></ul><p>Tekst</p>'
+    backend = available_backends()[name]
+    assert backend.extract_links(html) == [("/a", "Vacature A")]
+    assert backend.extract_strings(html) == ["Vacature A", "nieuw", "Tekst"]
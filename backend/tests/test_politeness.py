@@ -0,0 +1,44 @@
+"""
+Pauzeren van een host na 429/503. Draaien vanuit backend/: python -m pytest tests
+"""
+import time
+
+import httpx
+
+from app.config import HOST_MAX_RETRY_AFTER, HOST_THROTTLE_BACKOFF
+from app.politeness import HostLimiter
+
+URL = "https://x.nl/vacatures"
+
+
+def _response(status: int, retry_after: str = None) -> httpx.Response:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", URL))
+
+
+def _pause(limiter: HostLimiter) -> float:
+    return limiter._state(limiter.resolve(URL)).paused_until - time.monotonic()
+
+
+def test_retry_after_pauses_and_retries():
+    limiter = HostLimiter()
+    assert limiter.record_response(URL, _response(429, "5")) == 5.0
+    assert 4 < _pause(limiter) <= 5
+
+
+def test_missing_retry_after_pauses_without_retry():
+    limiter = HostLimiter()
+    assert limiter.record_response(URL, _response(503)) is None
+    assert HOST_THROTTLE_BACKOFF - 1 < _pause(limiter) <= HOST_THROTTLE_BACKOFF
+
+
+def test_long_retry_after_is_capped_without_retry():
+    limiter = HostLimiter()
+    assert limiter.record_response(URL, _response(429, str(int(HOST_MAX_RETRY_AFTER) * 10))) is None
+    assert HOST_MAX_RETRY_AFTER - 1 < _pause(limiter) <= HOST_MAX_RETRY_AFTER
+
+
+def test_other_status_does_not_pause():
+    limiter = HostLimiter()
+    assert limiter.record_response(URL, _response(200)) is None
+    assert _pause(limiter) <= 0
@@ -27,6 +27,19 @@ interface Municipality {
   name: string;
 }
 
+interface VacancyPage {
+  items: Vacancy[];
+  next_cursor: string | null;
+}
+
+interface VacancySummary {
+  function_categories: string[];
+  education_levels: string[];
+}
+
+const API_URL = 'http://localhost:8000/api';
+const PAGE_SIZE = 50;
+
 const VacancyList: React.FC = () => {
   const [vacancies, setVacancies] = useState<Vacancy[]>([]);
   const [municipalities, setMunicipalities] = useState<Municipality[]>([]);
@@ -35,58 +48,104 @@ const VacancyList: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('');
   const [selectedEducationLevel, setSelectedEducationLevel] = useState('');
+  const [uniqueCategories, setUniqueCategories] = useState<string[]>([]);
+  const [uniqueEducationLevels, setUniqueEducationLevels] = useState<string[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Haal één pagina vacatures op; categorie en opleidingsniveau filtert de server
+  const fetchPage = async (cursor: string | null): Promise<VacancyPage> => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor) params.set('cursor', cursor);
+    if (selectedCategory) params.set('function_category', selectedCategory);
+    if (selectedEducationLevel) params.set('education_level', selectedEducationLevel);
+
+    const response = await fetch(`${API_URL}/vacancies?${params}`);
+    if (!response.ok) {
+      throw new Error('Failed to fetch vacancies');
+    }
+    const data = await response.json();
+    return {
+      items: Array.isArray(data.items) ? data.items : [],
+      next_cursor: data.next_cursor ?? null,
+    };
+  };
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [vacanciesResponse, municipalitiesResponse] = await Promise.all([
-          fetch('http://localhost:8000/api/vacancies'),
-          fetch('http://localhost:8000/api/municipalities')
+        const [municipalitiesResponse, summaryResponse] = await Promise.all([
+          fetch(`${API_URL}/municipalities`),
+          fetch(`${API_URL}/vacancies/summary`)
         ]);
 
-        if (!vacanciesResponse.ok || !municipalitiesResponse.ok) {
+        if (!municipalitiesResponse.ok || !summaryResponse.ok) {
           throw new Error('Failed to fetch data');
         }
 
-        const vacanciesData = await vacanciesResponse.json();
         const municipalitiesData = await municipalitiesResponse.json();
-
-        if (!Array.isArray(vacanciesData)) {
-          setVacancies([]);
-        } else {
-          setVacancies(vacanciesData);
-        }
+        const summaryData: VacancySummary = await summaryResponse.json();
 
         if (!Array.isArray(municipalitiesData)) {
           setMunicipalities([]);
         } else {
           setMunicipalities(municipalitiesData);
         }
+        setUniqueCategories(summaryData.function_categories || []);
+        setUniqueEducationLevels(summaryData.education_levels || []);
       } catch (error) {
         console.error('Error fetching data:', error);
         setError(error instanceof Error ? error.message : 'An error occurred');
-        setVacancies([]);
         setMunicipalities([]);
-      } finally {
-        setLoading(false);
       }
     };
 
     fetchData();
   }, []);
 
+  // Eerste pagina opnieuw ophalen zodra een serverfilter verandert
+  useEffect(() => {
+    const fetchFirstPage = async () => {
+      setLoading(true);
+      try {
+        const page = await fetchPage(null);
+        setVacancies(page.items);
+        setNextCursor(page.next_cursor);
+      } catch (error) {
+        console.error('Error fetching data:', error);
+        setError(error instanceof Error ? error.message : 'An error occurred');
+        setVacancies([]);
+        setNextCursor(null);
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchFirstPage();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedCategory, selectedEducationLevel]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setVacancies((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching data:', error);
+      setError(error instanceof Error ? error.message : 'An error occurred');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Zoeken gebeurt op de al geladen vacatures
   const filteredVacancies = vacancies.filter((vacancy) => {
-    const matchesSearch = (vacancy.title?.toLowerCase() || '').includes(searchTerm.toLowerCase()) ||
+    return (vacancy.title?.toLowerCase() || '').includes(searchTerm.toLowerCase()) ||
       (vacancy.description?.toLowerCase() || '').includes(searchTerm.toLowerCase());
-    const matchesCategory = !selectedCategory || vacancy.function_category === selectedCategory;
-    const matchesEducation = !selectedEducationLevel || vacancy.education_level === selectedEducationLevel;
-
-    return matchesSearch && matchesCategory && matchesEducation;
   });
 
-  const uniqueCategories = Array.from(new Set(vacancies.filter(v => v.function_category).map(v => v.function_category)));
-  const uniqueEducationLevels = Array.from(new Set(vacancies.filter(v => v.education_level).map(v => v.education_level)));
-
   if (loading) {
     return (
       <Box display="flex" justifyContent="center" alignItems="center" height="100vh">
@@ -198,6 +257,14 @@ const VacancyList: React.FC = () => {
           })
         )}
       </Box>
+
+      {nextCursor && (
+        <Box display="flex" justifyContent="center" mt={3}>
+          <Button variant="outlined" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? <CircularProgress size={24} /> : 'Meer vacatures laden'}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
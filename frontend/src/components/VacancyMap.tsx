@@ -19,9 +19,11 @@ interface Vacancy {
   education_level: string;
 }
 
+const API_URL = 'http://localhost:8000/api';
+
 const VacancyMap: React.FC = () => {
   const [municipalities, setMunicipalities] = useState<Municipality[]>([]);
-  const [vacancies, setVacancies] = useState<Vacancy[]>([]);
+  const [vacancyCounts, setVacancyCounts] = useState<Record<string, number>>({});
   const [geoJsonData, setGeoJsonData] = useState<any>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -33,15 +35,16 @@ const VacancyMap: React.FC = () => {
         setError(null);
         
         const municipalitiesResponse = await fetch('http://localhost:8000/api/municipalities');
-        const vacanciesResponse = await fetch('http://localhost:8000/api/vacancies');
+        // Alleen de aantallen per gemeente; de vacatures zelf worden per popup opgehaald
+        const summaryResponse = await fetch(`${API_URL}/vacancies/summary`);
         const geoJsonResponse = await fetch('/data/gemeentekaart.geojson');
 
         if (!municipalitiesResponse.ok) {
           throw new Error(`Failed to fetch municipalities: ${municipalitiesResponse.statusText}`);
         }
 
-        if (!vacanciesResponse.ok) {
-          throw new Error(`Failed to fetch vacancies: ${vacanciesResponse.statusText}`);
+        if (!summaryResponse.ok) {
+          throw new Error(`Failed to fetch vacancies: ${summaryResponse.statusText}`);
         }
 
         if (!geoJsonResponse.ok) {
@@ -49,19 +52,19 @@ const VacancyMap: React.FC = () => {
         }
 
         const municipalitiesData = await municipalitiesResponse.json();
-        const vacanciesData = await vacanciesResponse.json();
+        const summaryData = await summaryResponse.json();
         const geoJsonData = await geoJsonResponse.json();
 
         if (!Array.isArray(municipalitiesData)) {
           throw new Error('Invalid municipalities data format');
         }
 
-        if (!Array.isArray(vacanciesData)) {
+        if (!summaryData || typeof summaryData.counts !== 'object') {
           throw new Error('Invalid vacancies data format');
         }
 
         setMunicipalities(municipalitiesData);
-        setVacancies(vacanciesData);
+        setVacancyCounts(summaryData.counts);
         setGeoJsonData(geoJsonData);
       } catch (error) {
         console.error('Error fetching data:', error);
@@ -74,16 +77,26 @@ const VacancyMap: React.FC = () => {
     fetchData();
   }, []);
 
-  const getMunicipalityVacancies = (statcode: string) => {
-    return vacancies.filter((vacancy) => vacancy.municipality_id === statcode);
+  const getVacancyCount = (statcode: string) => {
+    return vacancyCounts[statcode] || 0;
+  };
+
+  const fetchLatestVacancies = async (statcode: string): Promise<Vacancy[]> => {
+    const params = new URLSearchParams({ municipality_id: statcode, limit: '3' });
+    const response = await fetch(`${API_URL}/vacancies?${params}`);
+    if (!response.ok) {
+      return [];
+    }
+    const data = await response.json();
+    return Array.isArray(data.items) ? data.items : [];
   };
 
   const style = (feature: any) => {
     const municipalityId = feature.properties.statcode;
-    const municipalityVacancies = getMunicipalityVacancies(municipalityId);
+    const vacancyCount = getVacancyCount(municipalityId);
     
     return {
-      fillColor: municipalityVacancies.length > 0 ? '#4CAF50' : '#ccc',
+      fillColor: vacancyCount > 0 ? '#4CAF50' : '#ccc',
       weight: 1,
       opacity: 1,
       color: '#666',
@@ -93,7 +106,19 @@ const VacancyMap: React.FC = () => {
 
   const onEachFeature = (feature: any, layer: any) => {
     const municipalityId = feature.properties.statcode;
-    const municipalityVacancies = getMunicipalityVacancies(municipalityId);
+    const vacancyCount = getVacancyCount(municipalityId);
+    
+    const popupContent = (vacancies: Vacancy[]) => `
+      <div>
+        <h3>${feature.properties.statnaam}</h3>
+        <p>Aantal vacatures: ${vacancyCount}</p>
+        ${vacancies.map((vacancy: Vacancy) => `
+          <div>
+            <a href="/vacancy/${vacancy.id}">${vacancy.title}</a>
+          </div>
+        `).join('')}
+      </div>
+    `;
     
     layer.on({
       mouseover: (e: any) => {
@@ -109,20 +134,17 @@ const VacancyMap: React.FC = () => {
           fillOpacity: 0.7,
           weight: 1
         });
+      },
+      popupopen: async (e: any) => {
+        // De nieuwste drie vacatures pas ophalen als de popup geopend wordt
+        if (vacancyCount > 0) {
+          const vacancies = await fetchLatestVacancies(municipalityId);
+          e.popup.setContent(popupContent(vacancies));
+        }
       }
     });
 
-    layer.bindPopup(`
-      <div>
-        <h3>${feature.properties.statnaam}</h3>
-        <p>Aantal vacatures: ${municipalityVacancies.length}</p>
-        ${municipalityVacancies.slice(0, 3).map((vacancy: Vacancy) => `
-          <div>
-            <a href="/vacancy/${vacancy.id}">${vacancy.title}</a>
-          </div>
-        `).join('')}
-      </div>
-    `);
+    layer.bindPopup(popupContent([]));
   };
 
   if (loading) {